@@ -1,46 +1,76 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import Awaitable, Callable, Sequence
 
-from backend.areas.config import all_areas
-from backend.models.area_import import AreaImport as AreaImportModel
-from backend.database.session import get_db
-from backend.crud.area_import import list_latest_area_imports, list_stable_area_imports
-from backend.schemas.area_import import AreaImport as AreaImportSchema
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.area_import import (
+    LATEST_AREA_IMPORTS_SNAPSHOT,
+    STABLE_AREA_IMPORTS_SNAPSHOT,
+    AreaImport as AreaImportModel,
+)
+from backend.database.session import get_async_db
+from backend.crud.area_import import (
+    area_imports_etag,
+    get_area_imports_snapshot,
+    list_latest_area_imports,
+    list_stable_area_imports,
+)
+from backend.schemas.area_import import (
+    AreaImport as AreaImportSchema,
+    serialize_area_imports,
+)
 
 router = APIRouter()
 
+# browsers and proxies can store the response, but they must revalidate it with ETag
+AREA_IMPORTS_CACHE_CONTROL = 'no-cache'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is None:
+        return False
+
+    request_etags = [value.strip().removeprefix('W/') for value in if_none_match.split(',')]
+    return '*' in request_etags or etag in request_etags
 
-def convert_to_area_import_schema(db_area_import: AreaImportModel) -> AreaImportSchema:
-    return AreaImportSchema(
-        id=db_area_import.id,
-        name=all_areas[db_area_import.teryt].name,
-        teryt=db_area_import.teryt,
-        start_at=db_area_import.start_at,
-        end_at=db_area_import.end_at,
-        result_status=db_area_import.result_status,
-        building_count=db_area_import.building_count,
-        has_building_type=db_area_import.has_building_type,
-        has_building_levels=db_area_import.has_building_levels,
-        has_building_levels_undg=db_area_import.has_building_levels_undg,
-        data_check_has_expected_tags=db_area_import.data_check_has_expected_tags,  # noqa
-        data_check_expected_tags=db_area_import.data_check_expected_tags,
-        data_check_result_tags=db_area_import.data_check_result_tags,
-    )
 
+async def area_imports_response(
+    request: Request,
+    db: AsyncSession,
+    snapshot_name: str,
+    list_area_imports: Callable[[AsyncSession], Awaitable[Sequence[AreaImportModel]]],
+) -> Response:
+    """
+    Serve serialized snapshot refreshed by the import,
+    area imports are queried only if snapshot doesn't exist yet.
+    """
+    if snapshot := await get_area_imports_snapshot(db, snapshot_name):
+        payload, etag = snapshot.payload, snapshot.etag
+    else:
+        payload = serialize_area_imports(await list_area_imports(db))
+        etag = area_imports_etag(payload)
 
-@router.get('/latest')
-async def get_latest_area_imports(db: Session = Depends(get_db)) -> list[AreaImportSchema]:
-    db_latest_area_imports = await list_latest_area_imports(db)
-    return [
-        convert_to_area_import_schema(db_area_import)
-        for db_area_import in db_latest_area_imports  # noqa
-    ]
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': AREA_IMPORTS_CACHE_CONTROL}
+    if etag_matches(request, headers['ETag']):
+        return Response(status_code=304, headers=headers)
 
+    return Response(payload, media_type='application/json', headers=headers)
 
-@router.get('/stable')
-async def get_stable_area_imports(db: Session = Depends(get_db)) -> list[AreaImportSchema]:
-    db_stable_area_imports = await list_stable_area_imports(db)
-    return [
-        convert_to_area_import_schema(db_area_import)
-        for db_area_import in db_stable_area_imports  # noqa
-    ]
+
+@router.get('/latest', response_model=list[AreaImportSchema])
+async def get_latest_area_imports(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    return await area_imports_response(
+        request, db, LATEST_AREA_IMPORTS_SNAPSHOT, list_latest_area_imports
+    )
+
+
+@router.get('/stable', response_model=list[AreaImportSchema])
+async def get_stable_area_imports(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    return await area_imports_response(
+        request, db, STABLE_AREA_IMPORTS_SNAPSHOT, list_stable_area_imports
+    )
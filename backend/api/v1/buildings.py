@@ -1,18 +1,143 @@
-from typing import Any, Dict
+import gzip
+import json
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import Annotated, Any, AsyncIterator, Dict, List, Tuple
 
-from backend.api.v1.deps import Location
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api.v1.deps import BoundingBox, Location, Tile
+from backend.areas.finder import area_finder
+from backend.core.cache import point_cache, point_key, point_scope, tile_cache
+from backend.core.config import settings
 from backend.crud import building
-from backend.database.session import get_db
+from backend.database.session import get_async_db
+from backend.exceptions import AreaDataNotFound, AreaNotFound
+from backend.schemas.building import Point
+
 
+GEOJSON_MEDIA_TYPE = 'application/geo+json'
+MVT_MEDIA_TYPE = 'application/vnd.mapbox-vector-tile'
 
 router = APIRouter()
 
 
-@router.get('/')
+@router.get('/', response_class=Response)
 async def get_building_at(
-    location: Location = Depends(Location), db: Session = Depends(get_db)
-) -> Dict[str, Any]:
-    return await building.get_building_at(db, location.lat, location.lon)
+    location: Location = Depends(Location), db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    """
+    FeatureCollection is serialized by database and sent as it is.
+    Results (also without building) are cached per area until the area is imported again.
+    Points outside known areas are not cached, because they can't be invalidated.
+    """
+    key = point_key(location.lat, location.lon)
+    if (cached := point_cache.get(key)) is not None:
+        return Response(cached[1], media_type=GEOJSON_MEDIA_TYPE)
+
+    try:
+        # exact geometry test is CPU-bound, so it's kept off the event loop
+        teryt = await run_in_threadpool(area_finder.area_at, location.lat, location.lon)
+    except (AreaDataNotFound, AreaNotFound):
+        teryt = None
+
+    generation = point_cache.generation()
+    result, building_teryt = await building.get_building_at(db, location.lat, location.lon)
+    if teryt:
+        # building at the border can be imported by the neighbouring area
+        teryts = (teryt, building_teryt) if building_teryt not in (None, teryt) else (teryt,)
+        point_cache.set(
+            key, (teryts, result), generation, {point_scope(value_teryt) for value_teryt in teryts}
+        )
+
+    return Response(result, media_type=GEOJSON_MEDIA_TYPE)
+
+
+@router.get('/cache')
+async def get_cache_stats() -> Dict[str, Any]:
+    return {'points': point_cache.stats(), 'tiles': tile_cache.stats()}
+
+
+@router.post('/batch', response_class=Response)
+async def get_buildings_at(
+    points: Annotated[
+        List[Point], Body(min_length=1, max_length=settings.BUILDINGS_BATCH_MAX_POINTS)
+    ],
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """
+    Find buildings for many points at once.
+    Feature id is the index of the point in the request, points without building are skipped.
+    """
+    result = await building.get_buildings_at(db, [(point.lat, point.lon) for point in points])
+    return Response(result, media_type=GEOJSON_MEDIA_TYPE)
+
+
+async def stream_feature_collection(
+    features: AsyncIterator[Tuple[int, str]], limit: int
+) -> AsyncIterator[str]:
+    """
+    Write FeatureCollection in chunks, one feature at a time.
+    If the limit is reached, id of the last feature is returned as next_after,
+    it should be used as after parameter to get the next page.
+    """
+    yield '{"type":"FeatureCollection","features":['
+    count = 0
+    last_id = None
+    async for last_id, feature in features:
+        yield feature if count == 0 else f',{feature}'
+        count += 1
+
+    next_after = last_id if count == limit else None
+    yield f'],"next_after":{json.dumps(next_after)}}}'
+
+
+@router.get('/bbox')
+async def get_buildings_in_bbox(
+    bbox: BoundingBox = Depends(BoundingBox),
+    after: int | None = Query(default=None, ge=0),
+    limit: int = Query(
+        default=settings.BUILDINGS_BBOX_MAX_FEATURES, gt=0, le=settings.BUILDINGS_BBOX_MAX_FEATURES
+    ),
+    db: AsyncSession = Depends(get_async_db),
+) -> StreamingResponse:
+    """
+    Buildings which intersect bounding box, paginated by building id.
+    """
+    features = building.iter_buildings_in_bbox(
+        db, bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat, after, limit
+    )
+    return StreamingResponse(
+        stream_feature_collection(features, limit), media_type=GEOJSON_MEDIA_TYPE
+    )
+
+
+@router.get('/tiles/{z}/{x}/{y}.mvt')
+async def get_buildings_tile(
+    request: Request, tile: Tile = Depends(Tile), db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    """
+    Buildings as Mapbox Vector Tile (layer: buildings), tags are feature attributes.
+    Tiles are cached gzip compressed until buildings of any area in the tile are changed.
+    """
+    key = (tile.z, tile.x, tile.y)
+    compressed_tile = tile_cache.get(key)
+    if compressed_tile is None:
+        generation = tile_cache.generation()
+        mvt_tile = await building.get_buildings_tile(db, tile.z, tile.x, tile.y)
+        compressed_tile = await run_in_threadpool(gzip.compress, mvt_tile)
+        tile_cache.set(key, compressed_tile, generation)
+
+    # body depends on Accept-Encoding, so shared caches must not mix both variants
+    headers = {'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+        return Response(compressed_tile, media_type=MVT_MEDIA_TYPE, headers=headers)
+
+    return Response(
+        await run_in_threadpool(gzip.decompress, compressed_tile),
+        media_type=MVT_MEDIA_TYPE,
+        headers=headers,
+    )
@@ -1,4 +1,6 @@
-from fastapi import Query
+from fastapi import HTTPException, Path, Query
+
+from backend.core.config import settings
 
 
 class Location:
@@ -9,3 +11,37 @@ class Location:
     ):
         self.lat = lat
         self.lon = lon
+
+
+class BoundingBox:
+    def __init__(
+        self,
+        minlon: float = Query(ge=-180, le=180),
+        minlat: float = Query(ge=-90, le=90),
+        maxlon: float = Query(ge=-180, le=180),
+        maxlat: float = Query(ge=-90, le=90),
+    ):
+        if minlon >= maxlon or minlat >= maxlat:
+            raise HTTPException(
+                status_code=422, detail='Minimum coordinates must be less than maximum'
+            )
+
+        self.min_lon = minlon
+        self.min_lat = minlat
+        self.max_lon = maxlon
+        self.max_lat = maxlat
+
+
+class Tile:
+    def __init__(
+        self,
+        z: int = Path(ge=settings.BUILDINGS_TILE_MIN_ZOOM, le=settings.BUILDINGS_TILE_MAX_ZOOM),
+        x: int = Path(ge=0),
+        y: int = Path(ge=0),
+    ):
+        if x >= 2**z or y >= 2**z:
+            raise HTTPException(status_code=422, detail='Tile coordinates out of range for zoom')
+
+        self.z = z
+        self.x = x
+        self.y = y
@@ -0,0 +1,155 @@
+import hashlib
+import json
+
+from array import array
+from typing import Any, Dict, Hashable, Iterator, List, Set, Tuple
+
+Tags = Dict[str, Any]
+
+
+class BuildingBatch:
+    """
+    Columnar container of parsed buildings: WKB of all buildings in one buffer with offsets
+    and index to shared tag sets. Buildings of an area repeat a small number of tag sets,
+    so it keeps only a few Python objects instead of tuple, bytes and dict per building.
+    Tag sets are shared between buildings, so they must not be modified.
+    """
+
+    __slots__ = (
+        '_wkb',
+        '_offsets',
+        '_tag_set_ids',
+        '_tag_sets',
+        '_tag_set_positions',
+        '_tag_set_positions_by_id',
+    )
+
+    def __init__(self) -> None:
+        self._wkb = bytearray()
+        self._offsets = array('Q', [0])
+        self._tag_set_ids = array('I')
+        self._tag_sets: List[Tags] = []
+        self._tag_set_positions: Dict[Hashable, int] = {}
+        # shared tag dicts (e.g. from osm_tags_converter) are found without building the key,
+        # stored tag sets are alive, so their ids can't be reused
+        self._tag_set_positions_by_id: Dict[int, int] = {}
+
+    @staticmethod
+    def _tag_set_key(tags: Tags) -> Hashable:
+        return tuple(sorted(tags.items()))
+
+    def _tag_set_id(self, tags: Tags) -> int:
+        tag_set_id = self._tag_set_positions_by_id.get(id(tags))
+        if tag_set_id is None:
+            key = self._tag_set_key(tags)
+            tag_set_id = self._tag_set_positions.get(key)
+            if tag_set_id is None:
+                tag_set_id = len(self._tag_sets)
+                self._tag_sets.append(tags)
+                self._tag_set_positions[key] = tag_set_id
+                self._tag_set_positions_by_id[id(tags)] = tag_set_id
+
+        return tag_set_id
+
+    def append(self, wkb: bytes, tags: Tags) -> None:
+        tag_set_id = self._tag_set_id(tags)
+        self._wkb += wkb
+        self._offsets.append(len(self._wkb))
+        self._tag_set_ids.append(tag_set_id)
+
+    @staticmethod
+    def wkb_key(wkb: bytes) -> bytes:
+        """
+        :return: stable key of geometry, e.g. to find the same building in overlapping data
+        """
+        return hashlib.blake2b(wkb, digest_size=16).digest()
+
+    def extend(self, other: 'BuildingBatch', wkb_keys: Set[bytes] | None = None) -> None:
+        """
+        Append all buildings of the other batch, buffers are copied at once
+        and only tag set indexes are remapped.
+
+        :param wkb_keys: keys of already appended geometries, buildings of the other batch
+        with these keys are skipped and keys of appended buildings are added to the set
+        """
+        if wkb_keys is not None:
+            other_keys = set()
+            for wkb, tags in other:
+                if (key := self.wkb_key(wkb)) not in wkb_keys:
+                    other_keys.add(key)
+                    self.append(wkb, tags)
+
+            wkb_keys |= other_keys
+            return
+
+        tag_set_ids = [self._tag_set_id(tags) for tags in other._tag_sets]
+        wkb_offset = len(self._wkb)
+
+        self._wkb += other._wkb
+        self._offsets.extend(wkb_offset + offset for offset in other._offsets[1:])
+        self._tag_set_ids.extend(tag_set_ids[tag_set_id] for tag_set_id in other._tag_set_ids)
+
+    def content_hash(self) -> str:
+        """
+        Hash of buildings in their order, buffers are hashed at once without copying.
+        :return: SHA-256 hex digest
+        """
+        content_hash = hashlib.sha256()
+        content_hash.update(self._wkb)
+        content_hash.update(self._offsets)
+        content_hash.update(self._tag_set_ids)
+        content_hash.update(json.dumps(self._tag_sets, sort_keys=True, default=str).encode('utf-8'))
+        return content_hash.hexdigest()
+
+    def __getstate__(self) -> Tuple[bytearray, array, array, List[Tags]]:
+        # ids of tag sets are valid only in the current process
+        return self._wkb, self._offsets, self._tag_set_ids, self._tag_sets
+
+    def __setstate__(self, state: Tuple[bytearray, array, array, List[Tags]]) -> None:
+        self._wkb, self._offsets, self._tag_set_ids, self._tag_sets = state
+        self._tag_set_positions = {
+            self._tag_set_key(tags): position for position, tags in enumerate(self._tag_sets)
+        }
+        self._tag_set_positions_by_id = {
+            id(tags): position for position, tags in enumerate(self._tag_sets)
+        }
+
+    @property
+    def tag_sets(self) -> List[Tags]:
+        """
+        :return: distinct tag sets of buildings
+        """
+        return self._tag_sets
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: size of the columnar buffers (without tag sets)
+        """
+        return (
+            len(self._wkb)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._tag_set_ids.itemsize * len(self._tag_set_ids)
+        )
+
+    def wkb(self, index: int) -> bytes:
+        return bytes(self._wkb[self._offsets[index] : self._offsets[index + 1]])
+
+    def tags(self, index: int) -> Tags:
+        return self._tag_sets[self._tag_set_ids[index]]
+
+    def wkbs(self) -> Iterator[bytes]:
+        wkb_view = memoryview(self._wkb)
+        for start, end in zip(self._offsets, self._offsets[1:]):
+            yield bytes(wkb_view[start:end])
+
+    def __iter__(self) -> Iterator[Tuple[bytes, Tags]]:
+        tag_sets = self._tag_sets
+        for wkb, tag_set_id in zip(self.wkbs(), self._tag_set_ids):
+            yield wkb, tag_sets[tag_set_id]
+
+    def __len__(self) -> int:
+        return len(self._tag_set_ids)
+
+    def __bool__(self) -> bool:
+        return len(self._tag_set_ids) > 0
@@ -14,6 +14,12 @@ from backend.areas.parsers import (
 )
 
 AreaParser = TypeVar('AreaParser', bound=BaseAreaParser)
+# Degrees (~5.5 km of latitude) of BBOX tiles downloaded in parallel for the biggest cities
+CITY_TILE_SIZE = 0.05
+# Features per page within every tile, so a dense tile isn't truncated by the server limit
+CITY_PAGE_SIZE = 1000
+# sortBy is set only for services which are known to expose ID_BUDYNKU (see tests data),
+# other ones keep their own order of features
 all_counties: Dict[str, AreaParser] = {
     # 02 – "dolnośląskie"
     '0201': GeoportalAreaParser(
@@ -84,7 +90,9 @@ all_counties: Dict[str, AreaParser] = {
         custom_crs=2176,
     ),
     '0262': WebEwidAreaParser(name='miasto Legnica', base_url='https://wms.legnica.eu/iip/ows'),
-    '0264': WroclawAreaParser(name='miasto Wrocław', url_code=''),
+    '0264': WroclawAreaParser(
+        name='miasto Wrocław', url_code='', tile_size=CITY_TILE_SIZE, page_size=CITY_PAGE_SIZE
+    ),
     '0265': WebEwidAreaParser(name='miasto Wałbrzych', url_code='walbrzych-wms'),
     # 04 – "kujawsko-pomorskie"
     '0401': Geoportal2AreaParser(
@@ -119,6 +127,8 @@ all_counties: Dict[str, AreaParser] = {
         gml_prefix='WMS',
         gml_geometry_key='MSGEOMETRY',
         custom_crs=2177,
+        tile_size=CITY_TILE_SIZE,
+        page_size=CITY_PAGE_SIZE,
     ),
     '0462': GeoportalAreaParser(
         name='miasto Grudziądz',
@@ -299,7 +309,13 @@ all_counties: Dict[str, AreaParser] = {
         name='miasto Radom', base_url='https://ikerg.modgik.radom.pl/radom-egib'
     ),
     '1464': Geoportal2AreaParser(name='miasto Siedlce', url_code='siedlce'),
-    '1465': WarszawaAreaParser(name='miasto Warszawa', url_code=''),
+    '1465': WarszawaAreaParser(
+        name='miasto Warszawa',
+        url_code='',
+        tile_size=CITY_TILE_SIZE,
+        page_size=CITY_PAGE_SIZE,
+        page_sort_by='ID_BUDYNKU',
+    ),
     # 16 – "opolskie"
     '1601': GIPortalAreaParser(name='brzeski', base_url='https://imapa.brzeg-powiat.pl/brzeg-egib'),
     '1602': GIPortalAreaParser(
@@ -465,6 +481,8 @@ all_counties: Dict[str, AreaParser] = {
         gml_prefix='gmgml',
         gml_geometry_key='geom',
         custom_crs=2177,
+        tile_size=CITY_TILE_SIZE,
+        page_size=CITY_PAGE_SIZE,
     ),
     '2465': WebEwidAreaParser(
         name='miasto Dąbrowa Górnicza', base_url='https://geoportal-wms.dg.pl/iip/ows'
@@ -481,6 +499,9 @@ all_counties: Dict[str, AreaParser] = {
         gml_prefix='wms_egib_gugik',
         gml_geometry_key='SHAPE',
         custom_crs=2177,
+        tile_size=CITY_TILE_SIZE,
+        page_size=CITY_PAGE_SIZE,
+        page_sort_by='ID_BUDYNKU',
     ),
     '2470': GIPortalAreaParser(
         name='miasto Mysłowice', base_url='https://wms.myslowice.pl/myslowice-egib'
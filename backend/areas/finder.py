@@ -1,74 +1,176 @@
 import json
-import pickle
+import math
+import os
 
-from dataclasses import dataclass
-from typing import Any, Dict, List
+from collections.abc import Mapping
+from typing import Any, Dict, List, Tuple
 
-from osgeo import ogr, osr  # noqa
+import numpy as np
 
+from osgeo import ogr
+
+from backend.areas.gml import rings_to_geometry
+from backend.areas.projections import get_spatial_reference
+from backend.areas.store import AreaStore
 from backend.core.config import settings
 from backend.core.logger import default_logger
-from backend.exceptions import AreaDataNotFound, AreaNotFound
+from backend.exceptions import AreaDataNotFound, AreaNotFound, AreaStoreError
 
 MAX_TILE_ZOOM = 11
 TERYT_KEY = 'JPT_KOD_JE'
+# Degrees (~100 m) of simplification of area boundaries used to check imported data
+AREA_CHECK_SIMPLIFY_TOLERANCE = 0.001
+
+
+def envelope_grid(
+    envelope: Tuple[float, float, float, float], tile_size: float
+) -> List[Tuple[float, float, float, float]]:
+    """
+    :param envelope: min_x, max_x, min_y, max_y
+    :param tile_size: width and height of tile, tiles at the max edges are cut to the envelope
+    :return: envelopes of tiles, row by row
+    """
+    min_x, max_x, min_y, max_y = envelope
+    columns = max(math.ceil((max_x - min_x) / tile_size), 1)
+    rows = max(math.ceil((max_y - min_y) / tile_size), 1)
+    return [
+        (
+            min_x + column * tile_size,
+            min(min_x + (column + 1) * tile_size, max_x),
+            min_y + row * tile_size,
+            min(min_y + (row + 1) * tile_size, max_y),
+        )
+        for row in range(rows)
+        for column in range(columns)
+    ]
 
 
-@dataclass(frozen=True)
-class AreaGeometry:
+def envelope_to_geometry(envelope: Tuple[float, float, float, float]) -> ogr.Geometry:
+    min_x, max_x, min_y, max_y = envelope
+    ring = np.array(
+        [[min_x, min_y], [max_x, min_y], [max_x, max_y], [min_x, max_y], [min_x, min_y]]
+    )
+    return rings_to_geometry([ring])
+
+
+class AreaEnvelopeIndex:
     """
-    Wrapper class for OGR Geometry to handle serialization properly.
+    Bounding box index of areas, used to run exact geometry tests only for a few candidates.
+    There are only hundreds of areas, so vectorised scan of envelopes array
+    is as fast as R-tree lookup and it doesn't need any extra dependency.
     """
 
-    geom: ogr.Geometry
+    def __init__(self, teryts: List[str], envelopes: np.ndarray) -> None:
+        """
+        :param envelopes: array with row for every teryt and columns: min_x, max_x, min_y, max_y
+        – the same order as ogr.Geometry.GetEnvelope()
+        """
+        self._teryts = teryts
+        self._positions = {teryt: i for i, teryt in enumerate(self._teryts)}
+        self._envelopes = envelopes
+
+    @classmethod
+    def from_geometries(cls, geometries: Mapping[str, ogr.Geometry]) -> 'AreaEnvelopeIndex':
+        if isinstance(geometries, AreaStore):
+            return cls(geometries.teryts, geometries.envelopes)
+
+        envelopes = np.array([geom.GetEnvelope() for geom in geometries.values()], np.float64)
+        return cls(list(geometries.keys()), envelopes.reshape(-1, 4))
 
-    # __getstate__ and __setstate__ are not needed at all, but without them
-    # GDAL prints errors on deserialization
-    # 'ERROR 1: Empty geometries cannot be constructed'
-    def __getstate__(self) -> Dict[str, Any]:
-        return {'geom': self.geom.ExportToWkb()}
+    def candidates_at(self, x: float, y: float) -> List[str]:
+        """
+        :return: teryt ids of areas which envelope contains the point, in the areas order
+        """
+        envelopes = self._envelopes
+        mask = (
+            (envelopes[:, 0] <= x)
+            & (x <= envelopes[:, 1])
+            & (envelopes[:, 2] <= y)
+            & (y <= envelopes[:, 3])
+        )
+        return [self._teryts[i] for i in np.flatnonzero(mask)]
+
+    def envelope(self, teryt: str) -> Tuple[float, float, float, float] | None:
+        """
+        :return: min_x, max_x, min_y, max_y of area or None if area is not in the index
+        """
+        position = self._positions.get(teryt)
+        if position is None:
+            return None
 
-    def __setstate__(self, state: Dict[str, Any]) -> None:
-        object.__setattr__(self, 'geom', ogr.CreateGeometryFromWkb(state['geom']))
+        return tuple(float(value) for value in self._envelopes[position])
+
+    def envelope_contains(self, teryt: str, envelope: Tuple[float, float, float, float]) -> bool:
+        """
+        :param envelope: min_x, max_x, min_y, max_y e.g. from ogr.Geometry.GetEnvelope()
+        :return: True if envelope of area contains the given envelope, False also if area
+        is not in the index
+        """
+        position = self._positions.get(teryt)
+        if position is None:
+            return False
+
+        min_x, max_x, min_y, max_y = self._envelopes[position]
+        return (
+            min_x <= envelope[0]
+            and envelope[1] <= max_x
+            and min_y <= envelope[2]
+            and envelope[3] <= max_y
+        )
 
 
 class AreaFinder:
     def __init__(self) -> None:
-        self._county_geoms: Dict[str, AreaGeometry] = {}
-        self._commune_geoms: Dict[str, AreaGeometry] = {}
+        self._county_geoms: Mapping[str, ogr.Geometry] = {}
+        self._commune_geoms: Mapping[str, ogr.Geometry] = {}
         self._county_communes: Dict[str, List[str]] = {}
+        self._county_index = AreaEnvelopeIndex.from_geometries({})
+        self._commune_index = AreaEnvelopeIndex.from_geometries({})
+        self._simplified_geoms: Dict[str, ogr.Geometry] = {}
 
     def load_data(self) -> None:
-        def _load(area_type, cache_file, data_file):
-            default_logger.info(f'Loading {area_type} geometries...')
-            try:
-                with open(cache_file, 'rb') as f:
-                    return pickle.load(f)
-            except FileNotFoundError:
-                default_logger.info(f'Cache file with {area_type} geometries not found.')
-            except (pickle.PickleError, ModuleNotFoundError, TypeError, AttributeError):
-                default_logger.exception(f'Cache file with {area_type} geometries is damaged.')
-
-            default_logger.info(f'Generating {area_type} geometries using GeoJSON {data_file}')
-            geojson = json.load(open(data_file, 'r'))
-            return self.parse_area_geojson_to_area_geoms(geojson)
-
-        self._county_geoms.update(
-            _load(
-                'counties', settings.COUNTIES_GEOM_CACHE_FILENAME, settings.COUNTIES_DATA_FILENAME
-            )
+        self._county_geoms = self.load_area_store(
+            'counties', settings.COUNTIES_GEOM_CACHE_FILENAME, settings.COUNTIES_DATA_FILENAME
         )
-        self._commune_geoms.update(
-            _load(
-                'communes', settings.COMMUNES_GEOM_CACHE_FILENAME, settings.COMMUNES_DATA_FILENAME
-            )
+        self._commune_geoms = self.load_area_store(
+            'communes', settings.COMMUNES_GEOM_CACHE_FILENAME, settings.COMMUNES_DATA_FILENAME
         )
-        self.save_data()
         self.generate_county_communes()
+        self._county_index = AreaEnvelopeIndex.from_geometries(self._county_geoms)
+        self._commune_index = AreaEnvelopeIndex.from_geometries(self._commune_geoms)
+        self._simplified_geoms = {}
         default_logger.info(f'Completed loading {len(self._county_geoms)} counties geometries.')
         default_logger.info(f'Completed loading {len(self._commune_geoms)} communes geometries.')
 
+    def load_area_store(self, area_type: str, store_file: str, data_file: str) -> AreaStore:
+        """
+        Open memory-mapped area store, it's generated from GeoJSON if it's missing or damaged.
+        """
+        default_logger.info(f'Loading {area_type} geometries...')
+        try:
+            return AreaStore.open(store_file)
+        except FileNotFoundError:
+            default_logger.info(f'Cache file with {area_type} geometries not found.')
+        except AreaStoreError:
+            default_logger.exception(f'Cache file with {area_type} geometries is damaged.')
+
+        default_logger.info(f'Generating {area_type} geometries using GeoJSON {data_file}')
+        with open(data_file, 'r') as f:
+            store_data = AreaStore.dumps(self.parse_area_geojson_to_area_geoms(json.load(f)))
+
+        default_logger.info(f'Saving {area_type} geometries to cache file.')
+        try:
+            # replaced atomically, file can be already mapped by other process
+            with open(f'{store_file}.{os.getpid()}.tmp', 'wb') as f:
+                f.write(store_data)
+            os.replace(f.name, store_file)
+            return AreaStore.open(store_file)
+        except IOError:
+            default_logger.exception(f'Error at saving {area_type} geometries to cache file.')
+            return AreaStore(store_data)
+
     def generate_county_communes(self):
+        self._county_communes = {}
         for commune_teryt in self._commune_geoms.keys():
             county_teryt = commune_teryt[:4]
             if county_teryt not in self._county_communes:
@@ -76,16 +178,6 @@ class AreaFinder:
 
             self._county_communes[county_teryt].append(commune_teryt)
 
-    def save_data(self) -> None:
-        default_logger.info('Saving areas geometries to cache file.')
-        try:
-            with open(settings.COUNTIES_GEOM_CACHE_FILENAME, 'wb') as f:
-                pickle.dump(self._county_geoms, f)
-            with open(settings.COMMUNES_GEOM_CACHE_FILENAME, 'wb') as f:
-                pickle.dump(self._commune_geoms, f)
-        except (IOError, pickle.PickleError):
-            default_logger.exception('Error at serializing areas geometries to cache file.')
-
     def area_at(self, lat: float, lon: float) -> str:
         """
         :param lat: latitude
@@ -98,14 +190,12 @@ class AreaFinder:
             raise AreaDataNotFound()
 
         pt = ogr.Geometry(ogr.wkbPoint)
-        sr = osr.SpatialReference()
-        sr.SetWellKnownGeogCS('WGS84')
-        pt.AssignSpatialReference(sr)
+        pt.AssignSpatialReference(get_spatial_reference(4326))
         pt.SetPoint_2D(0, lon, lat)
 
         county_teryt = None
-        for teryt, county_geom in self._county_geoms.items():
-            if pt.Within(county_geom.geom):
+        for teryt in self._county_index.candidates_at(lon, lat):
+            if pt.Within(self._county_geoms[teryt]):
                 county_teryt = teryt
                 break
 
@@ -114,52 +204,92 @@ class AreaFinder:
 
         elif county_teryt in self._county_communes:
             # point might be in a commune which is also in a county
-            for commune_teryt in self._county_communes.get(county_teryt):
-                if pt.Within(self._commune_geoms[commune_teryt].geom):
+            for commune_teryt in self._commune_index.candidates_at(lon, lat):
+                if commune_teryt[:4] != county_teryt:
+                    continue
+
+                if pt.Within(self._commune_geoms[commune_teryt]):
                     return commune_teryt
 
             return county_teryt
 
         raise AreaNotFound(f'Not found area at: {lat} {lon}')
 
-    def geometry_in_area(self, geometry, teryt) -> bool:
-        area: AreaGeometry = self._county_geoms.get(teryt) or self._commune_geoms.get(teryt)
+    def area_envelope(self, teryt: str) -> Tuple[float, float, float, float] | None:
+        """
+        :return: lon/lat envelope of county or commune, None if area is unknown
+        """
+        return self._county_index.envelope(teryt) or self._commune_index.envelope(teryt)
 
-        if area is None:
+    def area_tiles(self, teryt: str, tile_size: float) -> List[Tuple[float, float, float, float]]:
+        """
+        Split lon/lat envelope of area into grid, tiles which don't intersect area are skipped.
+        :param tile_size: size of tile in degrees
+        :return: lon/lat envelopes of tiles
+        :raises AreaDataNotFound – if area is unknown
+        """
+        if teryt in self._county_geoms:
+            area = self._county_geoms[teryt]
+        elif teryt in self._commune_geoms:
+            area = self._commune_geoms[teryt]
+        else:
             raise AreaDataNotFound
 
-        return geometry.Within(area.geom)
+        return [
+            tile
+            for tile in envelope_grid(self.area_envelope(teryt), tile_size)
+            if envelope_to_geometry(tile).Intersects(area)
+        ]
 
-    @staticmethod
-    def find_properties_in_building_data_at(
-        lat: float, lon: float, building_data: list[tuple[ogr.Geometry, dict]]
-    ) -> dict | None:
-        point = ogr.Geometry(ogr.wkbPoint)
-        point.AddPoint(lon, lat)
+    def geometry_in_area(self, geometry, teryt) -> bool:
+        """
+        Check of imported data, e.g. for misprojected data. Boundaries have thousands
+        of vertices, so exact test uses simplified boundary, which is not precise
+        for geometries closer than AREA_CHECK_SIMPLIFY_TOLERANCE to the border.
+        """
+        if teryt in self._county_geoms:
+            area, index = self._county_geoms[teryt], self._county_index
+        elif teryt in self._commune_geoms:
+            area, index = self._commune_geoms[teryt], self._commune_index
+        else:
+            raise AreaDataNotFound
 
-        for geom, raw_properties in building_data:
-            if geom.Contains(point):
-                return raw_properties
+        # Cheap rejection e.g. for misprojected data, before exact test
+        if not index.envelope_contains(teryt, geometry.GetEnvelope()):
+            return False
 
-        return None
+        if (simplified_area := self._simplified_geoms.get(teryt)) is None:
+            simplified_area = area.SimplifyPreserveTopology(AREA_CHECK_SIMPLIFY_TOLERANCE)
+            self._simplified_geoms[teryt] = simplified_area
+
+        return geometry.Within(simplified_area)
+
+    @staticmethod
+    def building_contains_point(geometry: ogr.Geometry, point: ogr.Geometry) -> bool:
+        """
+        Envelope is compared first, so exact (GEOS) test runs only for a few buildings
+        """
+        min_x, max_x, min_y, max_y = geometry.GetEnvelope()
+        x, y = point.GetX(), point.GetY()
+        return min_x <= x <= max_x and min_y <= y <= max_y and geometry.Contains(point)
 
     @staticmethod
     def parse_area_geojson_to_area_geoms(
         geojson: Dict[str, Any], teryt_key: str = TERYT_KEY
-    ) -> Dict[str, AreaGeometry]:
+    ) -> Dict[str, ogr.Geometry]:
         """
         :param geojson: features where each one is different areas
         cooridnates should be in WGS84 projection (EPSG:4326)
         :param teryt_key: key name in feature properties which contains unique
         teryt value for area.
         :return: dict where key is area id (teryt)
-        and value is parsed as AreaGeometry (with GDAL ogr Geometry)
+        and value is parsed GDAL ogr Geometry
         """
         areas = {}
         for feature in geojson['features']:
             teryt = feature['properties'][teryt_key]
             geometry: ogr.Geometry = ogr.CreateGeometryFromJson(json.dumps(feature['geometry']))
-            areas[teryt] = AreaGeometry(geometry)
+            areas[teryt] = geometry
 
         return areas
 
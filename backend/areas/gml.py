@@ -0,0 +1,138 @@
+import re
+import struct
+from typing import List
+
+import numpy as np
+from lxml import etree
+from osgeo import ogr
+
+GML_POLYGON_BOUNDARIES = ('exterior', 'interior')
+DEFAULT_SRS_DIMENSION = 2
+# numberReturned and numberMatched attributes of wfs:FeatureCollection are declared
+# at the beginning of the document
+NUMBER_RETURNED_HEADER_SIZE = 4096
+NUMBER_RETURNED_PATTERN = re.compile(rb'\snumberReturned\s*=\s*["\'](\d+)["\']')
+NUMBER_MATCHED_PATTERN = re.compile(rb'\snumberMatched\s*=\s*["\'](\d+)["\']')
+
+PolygonRings = List[np.ndarray]
+
+
+def _local_name(element: etree.Element) -> str:
+    return etree.QName(element).localname
+
+
+def _srs_dimension(element: etree.Element) -> int:
+    """
+    srsDimension can be declared at coordinates element or at any parent geometry element.
+    """
+    while element is not None:
+        if (srs_dimension := element.get('srsDimension')) is not None:
+            return int(srs_dimension)
+        element = element.getparent()
+
+    return DEFAULT_SRS_DIMENSION
+
+
+def _linear_ring_coordinates(linear_ring: etree.Element) -> np.ndarray | None:
+    """
+    :return: 2D array of (x, y) coordinates or None if ring is not built from gml:posList
+    or gml:pos elements
+    """
+    children = [child for child in linear_ring if isinstance(child.tag, str)]
+    if not children:
+        return None
+
+    if len(children) == 1 and _local_name(children[0]) == 'posList':
+        pos_list = children[0]
+        values = np.array((pos_list.text or '').split(), dtype=np.float64)
+        dimension = _srs_dimension(pos_list)
+        if not values.size or values.size % dimension:
+            return None
+
+        return values.reshape(-1, dimension)[:, :2]
+
+    if all(_local_name(child) == 'pos' for child in children):
+        points = [(child.text or '').split()[:2] for child in children]
+        if any(len(point) != 2 for point in points):
+            return None
+
+        return np.array(points, dtype=np.float64)
+
+    return None
+
+
+def gml_polygon_to_rings(polygon: etree.Element) -> PolygonRings | None:
+    """
+    Read coordinates of gml:Polygon directly from lxml element.
+
+    :return: list of 2D arrays (exterior ring first, then interior rings) or None
+    if polygon contains anything else than linear rings with gml:posList/gml:pos
+    e.g. curves, arcs or gml:coordinates – these should be parsed by GDAL.
+    """
+    rings = []
+    for boundary in polygon:
+        if not isinstance(boundary.tag, str):  # comments
+            continue
+
+        boundary_name = _local_name(boundary)
+        if boundary_name not in GML_POLYGON_BOUNDARIES:
+            continue
+
+        # exactly one exterior ring, which must be the first one
+        if (boundary_name == 'exterior') == bool(rings):
+            return None
+
+        linear_rings = [child for child in boundary if isinstance(child.tag, str)]
+        if len(linear_rings) != 1 or _local_name(linear_rings[0]) != 'LinearRing':
+            return None
+
+        try:
+            coordinates = _linear_ring_coordinates(linear_rings[0])
+        except ValueError:
+            return None
+
+        if coordinates is None:
+            return None
+
+        rings.append(coordinates)
+
+    return rings or None
+
+
+def rings_to_wkb(rings: PolygonRings) -> bytes:
+    """
+    :param rings: list of 2D arrays (exterior ring first)
+    :return: little endian WKB polygon
+    """
+    wkb_parts = [struct.pack('<BII', 1, ogr.wkbPolygon, len(rings))]
+    for ring in rings:
+        wkb_parts.append(struct.pack('<I', len(ring)))
+        wkb_parts.append(np.ascontiguousarray(ring, dtype='<f8').tobytes())
+
+    return b''.join(wkb_parts)
+
+
+def rings_to_geometry(rings: PolygonRings) -> ogr.Geometry:
+    return ogr.CreateGeometryFromWkb(rings_to_wkb(rings))
+
+
+def gml_number_returned(header: bytes) -> int | None:
+    """
+    :param header: beginning of the WFS 2.0 GetFeature response
+    :return: number of features in the response or None if it's unknown
+    """
+    if (match := NUMBER_RETURNED_PATTERN.search(header)) is None:
+        return None
+
+    return int(match.group(1))
+
+
+def gml_number_matched(header: bytes) -> int | None:
+    """
+    :param header: beginning of the WFS 2.0 GetFeature response
+    :return: number of all features matching the request or None if it's unknown
+    """
+    if (match := NUMBER_MATCHED_PATTERN.search(header)) is None:
+        return None
+
+    return int(match.group(1))
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from typing import Any, List, Dict, Tuple
+from io import BytesIO
+from typing import Any, BinaryIO, Callable, Hashable, Iterator, List, Dict, Tuple
 from urllib.parse import urlparse, parse_qs, urlencode
 
+import numpy as np
 from lxml import etree
 from lxml.etree import XMLSyntaxError
 from osgeo import ogr, osr  # noqa
 from osgeo.ogr import Geometry
 
+from backend.areas.gml import PolygonRings, gml_polygon_to_rings, rings_to_geometry
+from backend.areas.projections import get_coordinate_transformation, transform_coordinates
 from backend.exceptions import InvalidKeyParserError, ParserError
 from abc import abstractmethod
 
@@ -16,6 +21,18 @@ from typing import Final
 
 DEFAULT_BUILDING: Final = 'yes'
 
+GmlSource = str | bytes | BinaryIO
+
+# Bump after changes of parsing or OSM tags mapping code, otherwise unchanged data
+# of areas would be skipped by the import and buildings would keep the old tags
+PARSER_VERSION: Final = 1
+
+# Distinguishes missing raw property from property without value
+_MISSING_PROPERTY: Final = object()
+
+# Number of polygons reprojected at once
+REPROJECTION_BATCH_SIZE: Final = 10_000
+
 # EGiB KST classification "EGB_RodzajWgKSTType"
 # XSD: http://www.gugik.gov.pl/bip/prawo/schematy-aplikacyjne
 BUILDING_KST_CODE_TYPE: Final = {
@@ -58,6 +75,8 @@ def merge_url_query_params(url: str, additional_params: dict) -> str:
 class BaseAreaParser:
     DEFAULT_SRS_NAME: str = 'EPSG:4326'
     DEFAULT_FULL_SRS_NAME: str = 'urn:ogc:def:crs:EPSG:4326'
+    # Raw properties (besides building type) used by parse_properties_to_osm_tags
+    TAG_PROPERTY_KEYS: Tuple[str, ...] = ('KONDYGNACJE_NADZIEMNE', 'KONDYGNACJE_PODZIEMNE')
 
     def __init__(
         self,
@@ -70,7 +89,22 @@ class BaseAreaParser:
         gml_member_prefix: str = 'wfs',
         gml_geometry_key: str = 'msGeometry',
         gml_building_type_key: str = 'RODZAJ',
+        page_size: int | None = None,
+        page_sort_by: str | None = None,
+        tile_size: float | None = None,
     ):
+        """
+        :param page_size: number of features per WFS 2.0 GetFeature page (count/startIndex),
+        None downloads all features in one request
+        :param page_sort_by: unique property used to sort features between pages, so no feature
+        is skipped or repeated, it must be exposed by the service (unknown sortBy is an error),
+        None keeps the server order
+        :param tile_size: size in degrees of BBOX tiles downloaded in parallel instead of
+        the whole area, for the biggest areas, every tile is paged with page_size
+        """
+        if tile_size is not None and page_size is None:
+            raise ValueError('page_size is required with tile_size')
+
         self.name = name
         self.url_code = url_code
         self.base_url = base_url
@@ -80,19 +114,61 @@ class BaseAreaParser:
         self.gml_member_prefix = gml_member_prefix
         self.gml_geometry_key = gml_geometry_key
         self.gml_building_type_key = gml_building_type_key
+        self.page_size = page_size
+        self.page_sort_by = page_sort_by
+        self.tile_size = tile_size
 
     @abstractmethod
     def build_buildings_url(self) -> str:
         pass
 
+    def fingerprint(self) -> str:
+        """
+        :return: SHA-256 hex digest of parser version, parser configuration
+        and OSM tags mapping, which together with downloaded data determine imported buildings
+        """
+        parser_config = {
+            'version': PARSER_VERSION,
+            'parser': type(self).__name__,
+            'attributes': vars(self),
+            'tag_property_keys': self.TAG_PROPERTY_KEYS,
+            'building_kst_code_type': BUILDING_KST_CODE_TYPE,
+            'kst_name_code': KST_NAME_CODE,
+        }
+        return hashlib.sha256(
+            json.dumps(parser_config, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+    def build_buildings_page_url(self, start_index: int, url: str | None = None) -> str:
+        """
+        :param start_index: index of the first feature of the page (WFS 2.0 paging)
+        :param url: URL of paged features e.g. of the BBOX tile, all features by default
+        """
+        page_params: Dict[str, Any] = {'count': self.page_size, 'startIndex': start_index}
+        if self.page_sort_by is not None:
+            page_params['sortBy'] = self.page_sort_by
+
+        return merge_url_query_params(url or self.build_buildings_url(), page_params)
+
+    def build_buildings_bbox_url(self, envelope: Tuple[float, float, float, float]) -> str:
+        """
+        :param envelope: lon/lat min_x, max_x, min_y, max_y of the tile
+        """
+        min_x, max_x, min_y, max_y = envelope
+        # EPSG:4326 URN has latitude first
+        return merge_url_query_params(
+            self.build_buildings_url(),
+            {'BBOX': f'{min_y},{min_x},{max_y},{max_x},{self.DEFAULT_FULL_SRS_NAME}'},
+        )
+
     @abstractmethod
     def parse_properties_to_osm_tags(self, properties: Dict[str, Any]) -> Dict[str, Any]:
         pass
 
-    def parse_gml_to_geojson(self, gml_content: str) -> dict[str, Any]:
+    def parse_gml_to_geojson(self, gml_content: GmlSource) -> dict[str, Any]:
         features: List[Dict[str, Any]] = []
 
-        geoms_and_props = self.parse_gml_to_geometries_and_properties(gml_content)
+        geoms_and_props = self.iter_gml_geometries_and_properties(gml_content)
         for geometry, properties in geoms_and_props:
             geojson_str_geometry: str = geometry.ExportToJson()
             features.append(
@@ -106,73 +182,192 @@ class BaseAreaParser:
         return {'type': 'FeatureCollection', 'features': features}
 
     def parse_gml_to_geometries_and_properties(
-        self, gml_content: str
+        self, gml_content: GmlSource
     ) -> List[Tuple[Geometry, Dict[str, Any]]]:
-        geometries_and_properties: List[Tuple[Geometry, Dict[str, Any]]] = []
+        return list(self.iter_gml_geometries_and_properties(gml_content))
 
+    def iter_gml_geometries_and_properties(
+        self, gml_content: GmlSource
+    ) -> Iterator[Tuple[Geometry, Dict[str, Any]]]:
+        """
+        Stream GML members one by one using iterparse, so the whole document tree
+        is never kept in memory. Each processed member is cleared from the tree.
+
+        :param gml_content: GML as text, bytes or binary file-like object
+        :return: generator of (geometry, properties) tuples, one per polygon
+        """
+        if isinstance(gml_content, str):
+            gml_content = gml_content.encode('utf-8')
+        if isinstance(gml_content, bytes):
+            gml_content = BytesIO(gml_content)
+
+        nsmap: Dict[str, str] = {}
+        member_tag = None
+        has_root = False
+        batch: List[Tuple[PolygonRings | Geometry, Dict[str, Any]]] = []
         try:
-            parser = etree.XMLParser(recover=True)
-            root = etree.fromstring(bytes(gml_content, encoding='utf-8'), parser)
+            for event, element in etree.iterparse(
+                gml_content, events=('start-ns', 'end'), recover=True, huge_tree=True
+            ):
+                if event == 'start-ns':
+                    prefix, uri = element
+                    nsmap.setdefault(prefix, uri)
+                    continue
+
+                if not has_root:
+                    has_root = True
+                    if self.gml_member_prefix not in nsmap:
+                        raise ParserError(f'Cannot parse {self.gml_member_prefix} members')
+                    member_tag = f'{{{nsmap[self.gml_member_prefix]}}}member'
+
+                if element.tag != member_tag:
+                    continue
+
+                batch.extend(self._parse_gml_member(element, nsmap))
+
+                # free memory of already processed members
+                element.clear(keep_tail=True)
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+                if len(batch) >= REPROJECTION_BATCH_SIZE:
+                    yield from self._process_batch(batch)
+                    batch = []
+
         except XMLSyntaxError:
             raise ParserError('Cannot parse root of GML content')
 
-        if root is None:
+        if not has_root:
             raise ParserError('GML root not found')
 
-        try:
-            members = root.findall(f'.//{self.gml_member_prefix}:member', namespaces=root.nsmap)
-        except (KeyError, SyntaxError):
-            raise ParserError(f'Cannot parse {self.gml_member_prefix} members')
+        yield from self._process_batch(batch)
 
-        for member in members:
-            building_member = member.getchildren()[0]  # get <prefix> member
+    def _parse_gml_member(
+        self, member: etree.Element, nsmap: Dict[str, str]
+    ) -> List[Tuple[PolygonRings | Geometry, Dict[str, Any]]]:
+        """
+        :return: list of polygons with member properties. Polygon is represented as rings
+        coordinates (not reprojected yet) or as GDAL geometry for GML which can't be read
+        directly.
+        """
+        building_member = member.getchildren()[0]  # get <prefix> member
 
-            geometries = []
-            properties = {}
-            for child in building_member.getchildren():
-                if not child.tag.startswith('{' + str(root.nsmap.get(self.gml_prefix))):
-                    continue
+        geometries = []
+        properties = {}
+        for child in building_member.getchildren():
+            if not child.tag.startswith('{' + str(nsmap.get(self.gml_prefix))):
+                continue
+
+            clean_tag = child.tag.replace(nsmap.get(self.gml_prefix), '')[2:]
+            if clean_tag == self.gml_geometry_key:
+                # 1 building member object (multisurface), can contain multiple polygons
+                polygons = building_member.findall('.//gml:Polygon', namespaces=nsmap)
 
-                clean_tag = child.tag.replace(root.nsmap.get(self.gml_prefix), '')[2:]
-                if clean_tag == self.gml_geometry_key:
-                    # 1 building member object (multisurface), can contain multiple polygons
-                    polygons = building_member.findall('.//gml:Polygon', namespaces=root.nsmap)
+                for polygon in polygons:
+                    if rings := gml_polygon_to_rings(polygon):
+                        geometries.append(rings)
+                    else:
+                        geometries.append(self.gml_polygon_to_geometry(polygon))
 
-                    for polygon in polygons:
-                        gml_geom = etree.tostring(polygon).decode('utf-8')
-                        geometry: ogr.Geometry = ogr.CreateGeometryFromGML(gml_geom)
-                        geometry.FlattenTo2D()  # some areas return 3 dimension coords e.g. Katowice
+            else:
+                properties[clean_tag] = child.text
+
+        # ignoring duplicated building_id etc.
+        return [(geometry, properties) for geometry in geometries]
+
+    def _process_batch(
+        self, batch: List[Tuple[PolygonRings | Geometry, Dict[str, Any]]]
+    ) -> Iterator[Tuple[Geometry, Dict[str, Any]]]:
+        polygons_rings = [rings for rings, _ in batch if isinstance(rings, list)]
+        geometries = iter(self.polygons_rings_to_geometries(polygons_rings))
+
+        for rings_or_geometry, properties in batch:
+            if isinstance(rings_or_geometry, list):
+                yield next(geometries), properties
+            else:
+                yield rings_or_geometry, properties
+
+    def polygons_rings_to_geometries(self, polygons_rings: List[PolygonRings]) -> List[Geometry]:
+        """
+        Reproject and fix lat lon order of many polygons at once.
+        All vertices are stored in one array, so it needs only one transformation call
+        and one comparison for all polygons instead of doing it polygon by polygon.
+        """
+        if not polygons_rings:
+            return []
 
-                        # Reproject to 4326
-                        if self.custom_crs and self.custom_crs != 4326:
-                            source = osr.SpatialReference()
-                            source.ImportFromEPSG(self.custom_crs)
-                            target = osr.SpatialReference()
-                            target.SetWellKnownGeogCS('WGS84')
-                            transform = osr.CoordinateTransformation(source, target)
-                            geometry.Transform(transform)
+        rings = [ring for polygon_rings in polygons_rings for ring in polygon_rings]
+        coordinates = np.concatenate(rings)
 
-                        # fix incorrect lat lon order
-                        point = geometry.GetGeometryRef(0).GetPoint(0)
-                        if point[0] > point[1]:
-                            self.swap_geometry_coordinates(geometry)
+        # Reproject to 4326
+        if self.custom_crs and self.custom_crs != 4326:
+            transform = get_coordinate_transformation(self.custom_crs)
+            coordinates = transform_coordinates(coordinates, transform)
 
-                        geometries.append(geometry)
+        # fix incorrect lat lon order, checked using first point of each polygon
+        polygon_sizes = np.array(
+            [sum(len(ring) for ring in polygon_rings) for polygon_rings in polygons_rings]
+        )
+        polygon_starts = np.concatenate(([0], np.cumsum(polygon_sizes)[:-1]))
+        first_points = coordinates[polygon_starts]
+        swap = np.repeat(first_points[:, 0] > first_points[:, 1], polygon_sizes)
+        coordinates[swap] = coordinates[swap][:, ::-1]
+
+        ring_ends = np.cumsum([len(ring) for ring in rings])[:-1]
+        rings_iter = iter(np.split(coordinates, ring_ends))
+        return [
+            rings_to_geometry([next(rings_iter) for _ in polygon_rings])
+            for polygon_rings in polygons_rings
+        ]
+
+    def gml_polygon_to_geometry(self, polygon: etree.Element) -> Geometry:
+        """
+        GDAL fallback for GML geometries which can't be read directly
+        e.g. curves, arcs or gml:coordinates
+        """
+        gml_geom = etree.tostring(polygon).decode('utf-8')
+        geometry: ogr.Geometry = ogr.CreateGeometryFromGML(gml_geom)
+        geometry.FlattenTo2D()  # some areas return 3 dimension coords e.g. Katowice
 
-                else:
-                    properties[clean_tag] = child.text
+        # Reproject to 4326
+        if self.custom_crs and self.custom_crs != 4326:
+            geometry.Transform(get_coordinate_transformation(self.custom_crs))
 
-            for geometry in geometries:
-                # ignoring duplicated building_id etc.
-                geometries_and_properties.append((geometry, properties))
+        # fix incorrect lat lon order
+        point = geometry.GetGeometryRef(0).GetPoint(0)
+        if point[0] > point[1]:
+            self.swap_geometry_coordinates(geometry)
 
-        return geometries_and_properties
+        return geometry
 
     def replace_properties_with_osm_tags(self, geojson: Dict[str, Any]) -> None:
+        to_osm_tags = self.osm_tags_converter()
         for index, feature in enumerate(geojson['features']):
-            properties = feature['properties']
-            tags = self.parse_properties_to_osm_tags(properties)
-            geojson['features'][index]['properties'] = self.clean_tags(tags)
+            geojson['features'][index]['properties'] = to_osm_tags(feature['properties'])
+
+    def osm_tags_converter(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Raw properties repeat a lot (a few building types and numbers of levels),
+        so clean OSM tags are computed once per distinct relevant properties.
+
+        :return: function which converts raw properties to clean OSM tags,
+        returned tags are shared between buildings, so they must not be modified
+        """
+        tags_by_key: Dict[Hashable, Dict[str, Any]] = {}
+        # values of raw properties which affect OSM tags
+        keys = (self.gml_building_type_key, *self.TAG_PROPERTY_KEYS)
+        defaults = (_MISSING_PROPERTY,) * len(keys)
+
+        def to_osm_tags(properties: Dict[str, Any]) -> Dict[str, Any]:
+            key = tuple(map(properties.get, keys, defaults))
+            tags = tags_by_key.get(key)
+            if tags is None:
+                tags = self.clean_tags(self.parse_properties_to_osm_tags(properties))
+                tags_by_key[key] = tags
+
+            return tags
+
+        return to_osm_tags
 
     @staticmethod
     def clean_tags(osm_tags: Dict[str, Any]) -> Dict[str, Any]:
@@ -207,14 +402,7 @@ class BaseAreaParser:
         :return: x, y
         """
 
-        source = osr.SpatialReference()
-        source.ImportFromEPSG(4326)
-
-        target = osr.SpatialReference()
-        target.ImportFromEPSG(dest_epsg)
-
-        # Create a coordinate transformation
-        transform = osr.CoordinateTransformation(source, target)
+        transform = get_coordinate_transformation(4326, dest_epsg)
 
         # Transform the point
         point = ogr.Geometry(ogr.wkbPoint)
@@ -226,12 +414,7 @@ class BaseAreaParser:
 
     @staticmethod
     def swap_geometry_coordinates(geometry: Geometry) -> None:
-        source = osr.SpatialReference()
-        source.ImportFromEPSG(4326)
-        target = osr.SpatialReference()
-        target.ImportFromEPSG(4326)
-        target.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
-        transform = osr.CoordinateTransformation(source, target)
+        transform = get_coordinate_transformation(4326, 4326, osr.OAMS_TRADITIONAL_GIS_ORDER)
         geometry.Transform(transform)
 
 
@@ -469,6 +652,8 @@ class WroclawAreaParser(BaseAreaParser):
 
 
 class ChorzowAreaParser(BaseAreaParser):
+    TAG_PROPERTY_KEYS = ('KONDYGN',)
+
     def __init__(self, *args, **kwargs):
         kwargs['custom_crs'] = 2177
         kwargs['gml_geometry_key'] = 'the_geom'
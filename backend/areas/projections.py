@@ -0,0 +1,68 @@
+import threading
+from typing import Any, Dict, Hashable
+
+import numpy as np
+from osgeo import osr
+
+# GDAL spatial references and transformations are not thread-safe, and the API process
+# runs many threads (threadpool and notifications listener), so they are cached per thread
+_thread_local = threading.local()
+
+
+def _thread_cache() -> Dict[Hashable, Any]:
+    if not hasattr(_thread_local, 'cache'):
+        _thread_local.cache = {}
+
+    return _thread_local.cache
+
+
+def get_spatial_reference(
+    epsg: int, axis_mapping_strategy: int = osr.OAMS_AUTHORITY_COMPLIANT
+) -> osr.SpatialReference:
+    cache = _thread_cache()
+    key = ('spatial_reference', epsg, axis_mapping_strategy)
+    if (spatial_reference := cache.get(key)) is None:
+        spatial_reference = osr.SpatialReference()
+        spatial_reference.ImportFromEPSG(epsg)
+        spatial_reference.SetAxisMappingStrategy(axis_mapping_strategy)
+        cache[key] = spatial_reference
+
+    return spatial_reference
+
+
+def get_coordinate_transformation(
+    source_epsg: int,
+    target_epsg: int = 4326,
+    target_axis_mapping_strategy: int = osr.OAMS_AUTHORITY_COMPLIANT,
+) -> osr.CoordinateTransformation:
+    """
+    Coordinate transformations are cached per thread and shared by all parsers,
+    because creating PROJ pipeline for every polygon is expensive.
+    Transformations are not thread-safe, so every thread creates its own ones.
+
+    :param source_epsg: source projection EPSG code e.g. 2180
+    :param target_epsg: target projection EPSG code, default WGS84
+    :param target_axis_mapping_strategy: osr.OAMS_* value for the target projection,
+    source projection always uses the authority compliant axis order
+    """
+    cache = _thread_cache()
+    key = ('coordinate_transformation', source_epsg, target_epsg, target_axis_mapping_strategy)
+    if (transformation := cache.get(key)) is None:
+        transformation = osr.CoordinateTransformation(
+            get_spatial_reference(source_epsg),
+            get_spatial_reference(target_epsg, target_axis_mapping_strategy),
+        )
+        cache[key] = transformation
+
+    return transformation
+
+
+def transform_coordinates(
+    coordinates: np.ndarray, transform: osr.CoordinateTransformation
+) -> np.ndarray:
+    """
+    :param coordinates: 2D array of (x, y) points
+    :return: new 2D array of transformed (x, y) points
+    """
+    # older GDAL bindings accept only sequence of tuples/lists, not numpy arrays
+    return np.array(transform.TransformPoints(coordinates.tolist()), dtype=np.float64)[:, :2]
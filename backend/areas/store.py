@@ -0,0 +1,118 @@
+import mmap
+import os
+import struct
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from osgeo import ogr
+
+from backend.exceptions import AreaStoreError
+
+# File layout (little endian):
+#   header: magic, version, number of areas
+#   index: teryt, offset and length of WKB for every area
+#   envelopes: min_x, max_x, min_y, max_y (float64) for every area
+#   WKB blob
+STORE_MAGIC = b'EGIBAREA'
+STORE_VERSION = 1
+HEADER_FORMAT = '<8sII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+INDEX_DTYPE = np.dtype([('teryt', 'S8'), ('offset', '<u8'), ('length', '<u8')])
+ENVELOPE_DTYPE = np.dtype('<f8')
+
+
+class AreaStore(Mapping):
+    """
+    Read-only mapping teryt -> ogr.Geometry backed by the binary area store file.
+    File is memory-mapped, so pages are shared between processes, and geometries
+    are created from WKB lazily on first use.
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        """
+        :raises AreaStoreError – if buffer doesn't contain valid area store
+        """
+        try:
+            magic, version, count = struct.unpack_from(HEADER_FORMAT, buffer, 0)
+            if magic != STORE_MAGIC or version != STORE_VERSION:
+                raise AreaStoreError('Invalid area store header')
+
+            index = np.frombuffer(buffer, INDEX_DTYPE, count, HEADER_SIZE)
+            envelopes = np.frombuffer(
+                buffer, ENVELOPE_DTYPE, count * 4, HEADER_SIZE + index.nbytes
+            ).reshape(-1, 4)
+        except (struct.error, ValueError) as e:
+            raise AreaStoreError('Invalid area store size') from e
+
+        if count and int((index['offset'] + index['length']).max()) > len(buffer):
+            raise AreaStoreError('Invalid area store size')
+
+        self._buffer = buffer
+        self._index = index
+        self._positions = {
+            teryt.decode('ascii'): position for position, teryt in enumerate(index['teryt'])
+        }
+        self._geometries: Dict[str, ogr.Geometry] = {}
+        self.envelopes = envelopes
+
+    @classmethod
+    def open(cls, filename: str) -> 'AreaStore':
+        """
+        :raises FileNotFoundError, AreaStoreError
+        """
+        with open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise AreaStoreError('Empty area store file')
+
+            # mapping stays valid after closing the file
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def dumps(geometries: Dict[str, ogr.Geometry]) -> bytes:
+        teryts = list(geometries.keys())
+        wkbs = [geometries[teryt].ExportToWkb(ogr.wkbNDR) for teryt in teryts]
+
+        index = np.zeros(len(teryts), INDEX_DTYPE)
+        index['teryt'] = [teryt.encode('ascii') for teryt in teryts]
+        index['length'] = [len(wkb) for wkb in wkbs]
+        envelopes = np.array(
+            [geometries[teryt].GetEnvelope() for teryt in teryts], ENVELOPE_DTYPE
+        ).reshape(-1, 4)
+
+        blob_offset = HEADER_SIZE + index.nbytes + envelopes.nbytes
+        index['offset'] = blob_offset + np.cumsum(index['length']) - index['length']
+
+        return b''.join(
+            [
+                struct.pack(HEADER_FORMAT, STORE_MAGIC, STORE_VERSION, len(teryts)),
+                index.tobytes(),
+                envelopes.tobytes(),
+                *wkbs,
+            ]
+        )
+
+    @property
+    def teryts(self) -> List[str]:
+        return list(self._positions.keys())
+
+    def __getitem__(self, teryt: str) -> ogr.Geometry:
+        if (geometry := self._geometries.get(teryt)) is not None:
+            return geometry
+
+        position = self._positions[teryt]
+        offset, length = int(self._index['offset'][position]), int(self._index['length'][position])
+        geometry = ogr.CreateGeometryFromWkb(bytes(self._buffer[offset : offset + length]))
+        self._geometries[teryt] = geometry
+        return geometry
+
+    def __contains__(self, teryt: object) -> bool:
+        return teryt in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
@@ -0,0 +1,58 @@
+"""
+Load test of point lookup endpoint of running API with concurrent requests,
+e.g. to compare latency percentiles of sync and async database sessions.
+
+Usage: python -m backend.benchmarks.api_latency -u http://localhost:8000 -n 2000 -c 50
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from httpx import AsyncClient, Limits
+
+from backend.benchmarks.area_finder import random_points
+from backend.core.config import settings
+
+
+async def measure(url: str, points: np.ndarray, concurrency: int) -> np.ndarray:
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = Limits(max_connections=concurrency)
+
+    async with AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+
+        async def request(lat: float, lon: float) -> float:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(
+                    f'{settings.API_V1_STR}/buildings/', params={'lat': lat, 'lon': lon}
+                )
+                response.raise_for_status()
+                return time.perf_counter() - start
+
+        return np.array(await asyncio.gather(*(request(lat, lon) for lat, lon in points)))
+
+
+def main(url: str, requests_count: int, concurrency: int) -> None:
+    points = random_points(requests_count)
+
+    start = time.perf_counter()
+    latencies = asyncio.run(measure(url, points, concurrency)) * 1000
+    total = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f'Requests: {requests_count}, concurrency: {concurrency}')
+    print(f'Throughput: {requests_count / total:.0f} requests/s')
+    print(f'Latency p50: {p50:.1f}ms p95: {p95:.1f}ms p99: {p99:.1f}ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-u', '--url', default='http://localhost:8000')
+    parser.add_argument('-n', '--requests', type=int, default=1000)
+    parser.add_argument('-c', '--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    main(args.url, args.requests, args.concurrency)
@@ -0,0 +1,73 @@
+"""
+Benchmark of AreaFinder.area_at throughput with envelope index compared to
+exact tests of every county geometry, using random points inside Poland bounding box.
+
+Usage: python -m backend.benchmarks.area_finder -n 1000
+"""
+
+import argparse
+import timeit
+
+from unittest.mock import patch
+
+import numpy as np
+
+from backend.areas.finder import area_finder
+from backend.exceptions import AreaNotFound
+
+# lat/lon bounding box of Poland
+POLAND_BBOX = (49.0, 14.1, 54.9, 24.2)
+
+
+def random_points(count: int, seed: int = 0) -> np.ndarray:
+    min_lat, min_lon, max_lat, max_lon = POLAND_BBOX
+    rng = np.random.default_rng(seed)
+    return np.column_stack(
+        (rng.uniform(min_lat, max_lat, count), rng.uniform(min_lon, max_lon, count))
+    )
+
+
+def main(points_count: int, repeat: int) -> None:
+    area_finder.load_data()
+    points = random_points(points_count)
+
+    def find_areas():
+        for lat, lon in points:
+            try:
+                area_finder.area_at(lat, lon)
+            except AreaNotFound:
+                pass
+
+    indexed = min(timeit.repeat(find_areas, number=1, repeat=repeat))
+
+    def all_teryts(index):
+        teryts = list(index._teryts)
+        return lambda x, y: teryts
+
+    with (
+        patch.object(
+            area_finder._county_index,
+            'candidates_at',
+            all_teryts(area_finder._county_index),
+        ),
+        patch.object(
+            area_finder._commune_index,
+            'candidates_at',
+            all_teryts(area_finder._commune_index),
+        ),
+    ):
+        linear = min(timeit.repeat(find_areas, number=1, repeat=repeat))
+
+    print(f'Points: {points_count}')
+    print(f'Without index: {linear:.3f}s ({points_count / linear:.0f} points/s)')
+    print(f'Envelope index: {indexed:.3f}s ({points_count / indexed:.0f} points/s)')
+    print(f'Speedup: {linear / indexed:.2f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--points', type=int, default=1000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    main(args.points, args.repeat)
@@ -0,0 +1,28 @@
+import re
+from os import path
+
+from backend.core.config import settings
+
+TEST_DATA_DIR = path.join(settings.APP_DIR, 'tests', 'data')
+
+MEMBER_PATTERN = re.compile(r'<wfs:member>.*?</wfs:member>', re.DOTALL)
+
+
+def load_test_gml(subdir: str, filename: str) -> str:
+    with open(path.join(TEST_DATA_DIR, subdir, filename), 'r') as f:
+        return f.read()
+
+
+def scale_gml_members(gml_content: str, count: int) -> bytes:
+    """
+    Build a bigger GML document by repeating all wfs:member elements of the test data.
+    :return: GML as bytes, like it is read from the downloaded file
+    """
+    members = MEMBER_PATTERN.findall(gml_content)
+    if not members:
+        raise ValueError('No wfs:member found in GML content')
+
+    head = gml_content[: gml_content.index(members[0])]
+    tail = gml_content[gml_content.rindex(members[-1]) + len(members[-1]) :]
+    body = ''.join(members[i % len(members)] for i in range(count))
+    return (head + body + tail).encode('utf-8')
@@ -0,0 +1,40 @@
+"""
+Benchmark of parsing projected (EPSG:2180) GML with batch reprojection of directly read
+coordinates compared to GDAL GML parser with reprojection polygon by polygon.
+
+Usage: python -m backend.benchmarks.parsing -n 5000
+"""
+
+import argparse
+import timeit
+
+from unittest.mock import patch
+
+from backend.areas.parsers import GeoportalAreaParser
+from backend.benchmarks.gml import load_test_gml, scale_gml_members
+
+
+def main(buildings: int, repeat: int) -> None:
+    gml = scale_gml_members(load_test_gml('geoportal', 'gml_building_2180_crs.xml'), buildings)
+    parser = GeoportalAreaParser('benchmark')
+
+    def parse():
+        parser.parse_gml_to_geometries_and_properties(gml)
+
+    batch = min(timeit.repeat(parse, number=1, repeat=repeat))
+    with patch('backend.areas.parsers.gml_polygon_to_rings', return_value=None):
+        per_polygon = min(timeit.repeat(parse, number=1, repeat=repeat))
+
+    print(f'Buildings: {buildings}')
+    print(f'GDAL, per polygon: {per_polygon:.3f}s ({buildings / per_polygon:.0f} buildings/s)')
+    print(f'Direct, batch:     {batch:.3f}s ({buildings / batch:.0f} buildings/s)')
+    print(f'Speedup: {per_polygon / batch:.2f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--buildings', type=int, default=5000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    main(args.buildings, args.repeat)
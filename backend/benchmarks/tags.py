@@ -0,0 +1,60 @@
+"""
+Benchmark of converting raw properties to clean OSM tags for every building compared to
+memoised conversion once per distinct relevant properties, with memory of the result.
+
+Usage: python -m backend.benchmarks.tags -n 100000
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+from typing import Any, Callable, Dict, List
+
+from backend.areas.parsers import WarszawaAreaParser
+from backend.benchmarks.gml import load_test_gml, scale_gml_members
+
+
+def traced_memory(func: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        result = func()  # noqa: F841 – keep result alive while measuring
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def main(buildings: int, repeat: int) -> None:
+    gml = scale_gml_members(load_test_gml('warszawa', 'gml_multiple_polygons.xml'), buildings)
+    parser = WarszawaAreaParser('benchmark')
+    properties: List[Dict[str, Any]] = [
+        # copy, so every building has own properties like in parsed data
+        dict(raw_properties)
+        for _, raw_properties in parser.iter_gml_geometries_and_properties(gml)
+    ]
+
+    def convert_every():
+        return [parser.clean_tags(parser.parse_properties_to_osm_tags(p)) for p in properties]
+
+    def convert_memoised():
+        to_osm_tags = parser.osm_tags_converter()
+        return [to_osm_tags(p) for p in properties]
+
+    every = min(timeit.repeat(convert_every, number=1, repeat=repeat))
+    memoised = min(timeit.repeat(convert_memoised, number=1, repeat=repeat))
+    every_memory = traced_memory(convert_every)
+    memoised_memory = traced_memory(convert_memoised)
+
+    print(f'Buildings: {len(properties)}')
+    print(f'Every building: {every:.3f}s, {every_memory / 1024**2:.1f} MiB')
+    print(f'Memoised:       {memoised:.3f}s, {memoised_memory / 1024**2:.1f} MiB')
+    print(f'Speedup: {every / memoised:.2f}x, memory: {every_memory / memoised_memory:.2f}x less')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--buildings', type=int, default=100000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    main(args.buildings, args.repeat)
@@ -0,0 +1,60 @@
+"""
+Microbenchmark of parsing projected (EPSG:2180) GML with and without
+the coordinate transformation cache. Batch reprojection needs one transformation
+per batch, so polygons are parsed by GDAL fallback, which reprojects polygon by polygon.
+
+Usage: python -m backend.benchmarks.transformations -n 5000
+"""
+
+import argparse
+import timeit
+
+from unittest.mock import patch
+
+from osgeo import osr
+
+from backend.areas.parsers import GeoportalAreaParser
+from backend.benchmarks.gml import load_test_gml, scale_gml_members
+
+
+def uncached_coordinate_transformation(
+    source_epsg: int,
+    target_epsg: int = 4326,
+    target_axis_mapping_strategy: int = osr.OAMS_AUTHORITY_COMPLIANT,
+) -> osr.CoordinateTransformation:
+    source = osr.SpatialReference()
+    source.ImportFromEPSG(source_epsg)
+    target = osr.SpatialReference()
+    target.ImportFromEPSG(target_epsg)
+    target.SetAxisMappingStrategy(target_axis_mapping_strategy)
+    return osr.CoordinateTransformation(source, target)
+
+
+def main(buildings: int, repeat: int) -> None:
+    gml = scale_gml_members(load_test_gml('geoportal', 'gml_building_2180_crs.xml'), buildings)
+    parser = GeoportalAreaParser('benchmark')
+
+    def parse():
+        parser.parse_gml_to_geometries_and_properties(gml)
+
+    with patch('backend.areas.parsers.gml_polygon_to_rings', return_value=None):
+        cached = min(timeit.repeat(parse, number=1, repeat=repeat))
+        with patch(
+            'backend.areas.parsers.get_coordinate_transformation',
+            side_effect=uncached_coordinate_transformation,
+        ):
+            uncached = min(timeit.repeat(parse, number=1, repeat=repeat))
+
+    print(f'Buildings: {buildings}')
+    print(f'Without cache: {uncached:.3f}s ({buildings / uncached:.0f} buildings/s)')
+    print(f'With cache:    {cached:.3f}s ({buildings / cached:.0f} buildings/s)')
+    print(f'Speedup: {uncached / cached:.2f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--buildings', type=int, default=5000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    main(args.buildings, args.repeat)
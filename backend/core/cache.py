@@ -0,0 +1,183 @@
+import math
+import threading
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, Tuple, TypeVar
+
+from backend.core.config import settings
+
+Envelope = Tuple[float, float, float, float]  # min_lon, max_lon, min_lat, max_lat
+TileKey = Tuple[int, int, int]  # z, x, y
+PointKey = Tuple[int, int]  # snapped lat, snapped lon
+PointValue = Tuple[Tuple[str, ...], str]  # teryts of point area and building, FeatureCollection
+
+COUNTY_TERYT_LENGTH = 4
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Bounded in-process LRU cache with hit/miss counters.
+    Entries are invalidated from the notifications listener thread, so all operations are locked.
+
+    Invalidation can happen while a value is computed from the old data, so every invalidation
+    bumps generation and marks its scopes (e.g. areas), value computed before it isn't stored
+    if any of its scopes was invalidated. Scopes of value can be known only after it's computed.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        # generation of the last invalidation of scope and of the last clear
+        self._invalidated_at: Dict[Hashable, int] = {}
+        self._cleared_at = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+
+            return value
+
+    def generation(self) -> int:
+        """
+        It should be read before the value is computed and passed to set().
+        """
+        with self._lock:
+            return self._generation
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        generation: int | None = None,
+        scopes: Iterable[Hashable] = (None,),
+    ) -> None:
+        """
+        :param generation: generation read before the value was computed,
+        value isn't stored if any of its scopes was invalidated since then
+        :param scopes: scopes which data the value was computed from
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and (
+                self._cleared_at > generation
+                or any(self._invalidated_at.get(scope, 0) > generation for scope in scopes)
+            ):
+                return
+
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def remove_if(
+        self, predicate: Callable[[K, V], bool], scopes: Iterable[Hashable] = (None,)
+    ) -> int:
+        """
+        :param scopes: invalidated scopes, values of these scopes which are being computed
+        won't be stored
+        :return: number of removed entries
+        """
+        with self._lock:
+            self._generation += 1
+            for scope in scopes:
+                self._invalidated_at[scope] = self._generation
+
+            keys = [key for key, value in self._entries.items() if predicate(key, value)]
+            for key in keys:
+                del self._entries[key]
+
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else None,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def tile_envelope(z: int, x: int, y: int) -> Envelope:
+    """
+    :return: WGS84 envelope of the XYZ (web mercator) tile in ogr.Geometry.GetEnvelope() order
+    """
+    n = 2**z
+
+    def lat_at(tile_y: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return x / n * 360 - 180, (x + 1) / n * 360 - 180, lat_at(y + 1), lat_at(y)
+
+
+def envelopes_intersect(a: Envelope, b: Envelope) -> bool:
+    return a[0] <= b[1] and b[0] <= a[1] and a[2] <= b[3] and b[2] <= a[3]
+
+
+def invalidate_tiles(envelope: Envelope) -> int:
+    """
+    Tiles are invalidated by envelope of the changed area, because area import can add
+    buildings to tiles which didn't contain any building of that area before.
+    """
+    return tile_cache.remove_if(lambda key, _: envelopes_intersect(tile_envelope(*key), envelope))
+
+
+def point_key(lat: float, lon: float) -> PointKey:
+    """
+    Coordinates are snapped to grid, so repeated clicks at the same place share entry.
+    Areas of the point and of the found building are stored with the value,
+    so cache hit doesn't need area lookup.
+    """
+    grid = settings.BUILDINGS_POINT_CACHE_GRID
+    return round(lat / grid), round(lon / grid)
+
+
+def point_scope(teryt: str) -> str:
+    """
+    :return: invalidation scope of points, communes share it with their county
+    """
+    return teryt[:COUNTY_TERYT_LENGTH]
+
+
+def invalidate_points(teryt: str) -> int:
+    """
+    Point is cached with teryt of the most detailed area (county or commune) and with teryt
+    of the found building, which can be imported by the neighbouring area at the border,
+    so entries of area's communes or of area's county are invalidated too.
+    """
+    return point_cache.remove_if(
+        lambda _, value: any(
+            value_teryt.startswith(teryt) or teryt.startswith(value_teryt)
+            for value_teryt in value[0]
+        ),
+        scopes=(point_scope(teryt),),
+    )
+
+
+tile_cache: LRUCache[TileKey, bytes] = LRUCache(settings.BUILDINGS_TILE_CACHE_SIZE)
+point_cache: LRUCache[PointKey, PointValue] = LRUCache(settings.BUILDINGS_POINT_CACHE_SIZE)
@@ -12,6 +12,18 @@ class Settings(BaseSettings):
         environ.get('POSTGRES_HOST'),
         environ.get('POSTGRES_DB'),
     )
+    # API uses asyncio driver, import tasks use psycopg2 (DATABASE_URL) e.g. for COPY
+    ASYNC_DATABASE_URL: str = 'postgresql+asyncpg://{}:{}@{}/{}'.format(
+        environ.get('POSTGRES_USER'),
+        environ.get('POSTGRES_PASSWORD'),
+        environ.get('POSTGRES_HOST'),
+        environ.get('POSTGRES_DB'),
+    )
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_STATEMENT_CACHE_SIZE: int = 256
 
     PROJECT_ROOT_DIR: str = path.realpath(path.join(path.dirname(__file__), '..', '..'))
     APP_DIR: str = path.realpath(path.join(path.dirname(__file__), '..'))
@@ -23,9 +35,34 @@ class Settings(BaseSettings):
     CACHE_DIR: str = path.join(PROJECT_ROOT_DIR, '.cache')
 
     COUNTIES_DATA_FILENAME: str = path.join(DATA_DIR, 'counties.geojson')
-    COUNTIES_GEOM_CACHE_FILENAME: str = path.join(CACHE_DIR, '.counties_geoms.pickle')
+    COUNTIES_GEOM_CACHE_FILENAME: str = path.join(CACHE_DIR, '.counties_geoms.bin')
     COMMUNES_DATA_FILENAME: str = path.join(DATA_DIR, 'communes.geojson')
-    COMMUNES_GEOM_CACHE_FILENAME: str = path.join(CACHE_DIR, '.communes_geoms.pickle')
+    COMMUNES_GEOM_CACHE_FILENAME: str = path.join(CACHE_DIR, '.communes_geoms.bin')
+
+    # COPY is much faster than INSERT, INSERT is kept as a fallback e.g. for tests
+    BUILDINGS_COPY_LOADER: bool = True
+    # Write only changed buildings of already imported areas instead of replacing whole area
+    BUILDINGS_DIFF_IMPORT: bool = True
+
+    # Swap of area partition locks buildings table, the import doesn't wait for the lock longer
+    BUILDINGS_SWAP_LOCK_TIMEOUT_MS: int = 2000
+    BUILDINGS_SWAP_LOCK_ATTEMPTS: int = 5
+
+    BUILDINGS_BATCH_MAX_POINTS: int = 1000
+    BUILDINGS_BBOX_MAX_FEATURES: int = 10000
+
+    # Vector tiles below min zoom would contain too many buildings
+    BUILDINGS_TILE_MIN_ZOOM: int = 13
+    BUILDINGS_TILE_MAX_ZOOM: int = 20
+    BUILDINGS_TILE_CACHE_SIZE: int = 4096
+    BUILDINGS_POINT_CACHE_SIZE: int = 100000
+    # Grid in degrees, 1e-6 is ~0.1m
+    BUILDINGS_POINT_CACHE_GRID: float = 1e-6
+
+    # Concurrent requests of the paged or tiled import to the same WFS server
+    WFS_HOST_MAX_CONNECTIONS: int = 4
+    WFS_PAGE_MAX_ATTEMPTS: int = 3
+    WFS_PAGE_RETRY_DELAY: float = 5
 
     ACCESS_LOGGER: str = 'egib_access'
     DEFAULT_LOGGER: str = 'egib_default'
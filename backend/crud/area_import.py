@@ -1,20 +1,29 @@
+import hashlib
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import case, func, select, Sequence
+from sqlalchemy import Select, case, func, select, Sequence
 
-from backend.models.area_import import AreaImport
-from backend.models.area_import import ResultStatus
+from backend.models.area_import import (
+    LATEST_AREA_IMPORTS_SNAPSHOT,
+    STABLE_AREA_IMPORTS_SNAPSHOT,
+    AreaImport,
+    AreaImportsSnapshot,
+)
+from backend.models.area_import import SUCCESS_RESULT_STATUSES
+from backend.schemas.area_import import serialize_area_imports
 
 
-async def list_latest_area_imports(db: Session) -> Sequence[AreaImport]:
-    result = db.execute(
+def _latest_area_imports_query() -> Select:
+    return (
         select(AreaImport)
         .order_by(AreaImport.teryt, AreaImport.end_at.desc(), AreaImport.id.desc())
         .distinct(AreaImport.teryt)
     )
-    return result.scalars().all()
 
 
-async def list_stable_area_imports(db: Session) -> Sequence[AreaImport]:
+def _stable_area_imports_query() -> Select:
     # noinspection PyTypeChecker
     ranked_areas_subquery = select(
         AreaImport,
@@ -22,7 +31,7 @@ async def list_stable_area_imports(db: Session) -> Sequence[AreaImport]:
         .over(
             partition_by=AreaImport.teryt,
             order_by=(
-                case((AreaImport.result_status == ResultStatus.SUCCESS, 1), else_=2),
+                case((AreaImport.result_status.in_(SUCCESS_RESULT_STATUSES), 1), else_=2),
                 AreaImport.end_at.desc(),
                 AreaImport.id.desc(),
             ),
@@ -35,5 +44,62 @@ async def list_stable_area_imports(db: Session) -> Sequence[AreaImport]:
         .where(ranked_areas_subquery.c.rank == 1)
         .order_by(ranked_areas_subquery.c.teryt)
     )
-    result = db.execute(select(AreaImport).from_statement(stmt))
+    return select(AreaImport).from_statement(stmt)
+
+
+AREA_IMPORTS_SNAPSHOT_QUERIES = {
+    LATEST_AREA_IMPORTS_SNAPSHOT: _latest_area_imports_query,
+    STABLE_AREA_IMPORTS_SNAPSHOT: _stable_area_imports_query,
+}
+
+
+async def list_latest_area_imports(db: AsyncSession) -> Sequence[AreaImport]:
+    result = await db.execute(_latest_area_imports_query())
+    return result.scalars().all()
+
+
+async def list_stable_area_imports(db: AsyncSession) -> Sequence[AreaImport]:
+    result = await db.execute(_stable_area_imports_query())
     return result.scalars().all()
+
+
+def get_latest_successful_area_import(db: Session, teryt: str) -> AreaImport | None:
+    result = db.execute(
+        select(AreaImport)
+        .where(
+            AreaImport.teryt == teryt,
+            AreaImport.result_status.in_(SUCCESS_RESULT_STATUSES),
+        )
+        .order_by(AreaImport.end_at.desc(), AreaImport.id.desc())
+        .limit(1)
+    )
+    return result.scalar()
+
+
+def area_imports_etag(payload: str) -> str:
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def refresh_area_imports_snapshots(db: Session) -> None:
+    """
+    Serialize latest and stable area imports once after import,
+    instead of querying whole imports history on every status page load.
+    """
+    for name, query in AREA_IMPORTS_SNAPSHOT_QUERIES.items():
+        payload = serialize_area_imports(db.execute(query()).scalars().all())
+        values = {'name': name, 'payload': payload, 'etag': area_imports_etag(payload)}
+        stmt = insert(AreaImportsSnapshot).values(values)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[AreaImportsSnapshot.name],
+                set_={
+                    'payload': stmt.excluded.payload,
+                    'etag': stmt.excluded.etag,
+                    'updated_at': func.now(),
+                },
+            )
+        )
+
+
+async def get_area_imports_snapshot(db: AsyncSession, name: str) -> AreaImportsSnapshot | None:
+    return await db.get(AreaImportsSnapshot, name)
@@ -1,31 +1,591 @@
-from typing import Any, Dict
+import csv
+import json
+import struct
 
-from sqlalchemy import select
+from collections import defaultdict
+from dataclasses import dataclass
+from hashlib import blake2b
+from io import StringIO
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Tuple
+
+from psycopg2.errors import LockNotAvailable
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Float,
+    LargeBinary,
+    Select,
+    Text,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    insert,
+    literal_column,
+    select,
+    table,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
 from sqlalchemy.orm import Session
 
-from backend.models.building import Building
+from backend.core.config import settings
+from backend.database.notifications import AREA_BUILDINGS_CHANNEL
+from backend.models.building import BUILDINGS_DEFAULT_PARTITION, Building
+
+BuildingRow = Tuple[bytes, Dict[str, Any], str]  # little endian WKB, tags, teryt
+
+EWKB_SRID_FLAG = 0x20000000
+BUILDINGS_SRID = 4326
+WEB_MERCATOR_SRID = 3857
+
+BUILDINGS_TILE_LAYER = 'buildings'
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+
+@dataclass
+class BuildingsChangeCount:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+
+def _building_at(lat: Any, lon: Any) -> Select:
+    """
+    :param lat: latitude value or column
+    :param lon: longitude value or column
+    :return: query of single building (geometry, tags, teryt) which contains the point
+    """
+    point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), BUILDINGS_SRID)
+    return (
+        select(Building.geometry, Building.tags, Building.teryt)
+        .where(func.ST_Contains(Building.geometry, point))
+        .limit(1)
+    )
+
+
+def _feature_collection_text(feature: Any, *order_by: Any) -> Any:
+    """
+    :param feature: json expression of a single feature
+    :return: aggregate expression of the whole FeatureCollection serialized by PostgreSQL as text,
+    so it can be sent without decoding and encoding in Python
+    """
+    features = func.json_agg(aggregate_order_by(feature, *order_by) if order_by else feature)
+    # fmt: off
+    return cast(
+        func.json_build_object(
+            'type', 'FeatureCollection',
+            'features', func.coalesce(features, literal_column("'[]'::json"))
+        ),
+        Text,
+    )
+    #  fmt: on
+
+
+async def get_building_at(db: AsyncSession, lat: float, lon: float) -> Tuple[str, str | None]:
+    """
+    :return: FeatureCollection (JSON text) with single building or without features
+    and teryt of the area which the building was imported from
+    """
+    building_at = _building_at(lat, lon).subquery()
+    # fmt: off
+    feature = func.json_build_object(
+        'type', 'Feature',
+        'geometry', building_at.c.geometry,
+        'properties', building_at.c.tags
+    )
+    #  fmt: on
+
+    query = select(_feature_collection_text(feature), func.max(building_at.c.teryt)).select_from(
+        building_at
+    )
+    feature_collection, teryt = (await db.execute(query)).one()
+    return feature_collection, teryt
+
+
+async def get_buildings_at(db: AsyncSession, points: List[Tuple[float, float]]) -> str:
+    """
+    Find buildings for many points with single query, building for every point
+    is found with GiST index using lateral join.
+    :param points: list of (lat, lon)
+    :return: FeatureCollection (JSON text), where feature id is index of the point
+    which is within building
+    """
+    lats, lons = zip(*points) if points else ((), ())
+    points_table = (
+        func.unnest(
+            bindparam('lats', list(lats), ARRAY(Float)),
+            bindparam('lons', list(lons), ARRAY(Float)),
+        )
+        .table_valued('lat', 'lon', with_ordinality='ordinality')
+        .render_derived(name='points')
+    )
+    building_at = _building_at(points_table.c.lat, points_table.c.lon).lateral('building_at')
+    point_index = points_table.c.ordinality - 1
+
+    # fmt: off
+    feature = func.json_build_object(
+        'type', 'Feature',
+        'id', point_index,
+        'geometry', building_at.c.geometry,
+        'properties', building_at.c.tags
+    )
+    #  fmt: on
+    query = (
+        select(_feature_collection_text(feature, point_index))
+        .select_from(points_table)
+        .join(building_at, true())
+    )
+
+    return (await db.execute(query)).scalar_one()
 
 
-async def get_building_at(db: Session, lat: float, lon: float) -> Dict[str, Any]:
+async def iter_buildings_in_bbox(
+    db: AsyncSession,
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    after_id: int | None = None,
+    limit: int | None = None,
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Stream buildings which intersect the bounding box using server-side cursor,
+    ordered by id, so next page can be requested with the last id (keyset pagination).
+    :return: iterator of (building id, GeoJSON feature as text)
+    """
+    envelope = func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, BUILDINGS_SRID)
     # fmt: off
     query = (
         select(
-            func.json_build_object(
-                'type', 'Feature',
-                'geometry', Building.geometry,
-                'properties', Building.tags
+            Building.id,
+            cast(
+                func.json_build_object(
+                    'type', 'Feature',
+                    'id', Building.id,
+                    'geometry', Building.geometry,
+                    'properties', Building.tags
+                ),
+                Text,
             )
         )
-        .where(
-            func.ST_Contains(Building.geometry, func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326))
-        )
-        .limit(1)
+        .where(func.ST_Intersects(Building.geometry, envelope))
+        .order_by(Building.id)
+        .limit(limit)
     )
     #  fmt: on
+    if after_id is not None:
+        query = query.where(Building.id > after_id)
+
+    result = await db.stream(query, execution_options={'yield_per': 1000})
+    try:
+        async for row in result.tuples():
+            yield row
+    finally:
+        await result.close()
+
+
+async def get_buildings_tile(db: AsyncSession, z: int, x: int, y: int) -> bytes:
+    """
+    Encode buildings which intersect XYZ tile as Mapbox Vector Tile,
+    building id is feature id and tags are feature attributes.
+    :return: MVT (not compressed), empty for tile without buildings
+    """
+    envelope = func.ST_TileEnvelope(z, x, y)
+    tile_buildings = (
+        select(
+            func.ST_AsMVTGeom(
+                func.ST_Transform(Building.geometry, WEB_MERCATOR_SRID),
+                envelope,
+                TILE_EXTENT,
+                TILE_BUFFER,
+            ).label('geom'),
+            Building.id,
+            cast(Building.tags, JSONB).label('tags'),
+        )
+        .where(func.ST_Intersects(Building.geometry, func.ST_Transform(envelope, BUILDINGS_SRID)))
+        .subquery('tile_buildings')
+    )
+    query = select(
+        func.ST_AsMVT(
+            tile_buildings.table_valued(), BUILDINGS_TILE_LAYER, TILE_EXTENT, 'geom', 'id'
+        )
+    )
+
+    return bytes((await db.execute(query)).scalar() or b'')
+
+
+def notify_area_buildings_changed(db: Session, teryt: str) -> None:
+    """
+    Notification is delivered on commit, so listeners never see uncommitted buildings.
+    """
+    db.execute(select(func.pg_notify(AREA_BUILDINGS_CHANNEL, teryt)))
+
+
+def wkb_to_hex_ewkb(wkb: bytes, srid: int = BUILDINGS_SRID) -> str:
+    """
+    Add SRID to the little endian WKB, so PostGIS can read geometry directly from COPY input.
+    """
+    (geometry_type,) = struct.unpack_from('<I', wkb, 1)
+    return (wkb[:1] + struct.pack('<II', geometry_type | EWKB_SRID_FLAG, srid) + wkb[5:]).hex()
+
+
+def building_content_hash(wkb: bytes, tags: Dict[str, Any]) -> bytes:
+    """
+    Stable hash of the building data, which is used to find changed buildings between imports.
+    :param wkb: little endian WKB, which is already normalised by parser (2D, fixed byte order)
+    """
+    content_hash = blake2b(wkb, digest_size=16)
+    content_hash.update(json.dumps(tags, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    return content_hash.digest()
+
+
+def _buildings_to_csv_lines(buildings: Iterable[BuildingRow]) -> Iterator[str]:
+    buffer = StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    for wkb, tags, teryt in buildings:
+        content_hash = building_content_hash(wkb, tags)
+        writer.writerow((wkb_to_hex_ewkb(wkb), json.dumps(tags), teryt, f'\\x{content_hash.hex()}'))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class _IteratorFile:
+    """
+    Minimal read-only file-like object over string chunks, used as COPY input,
+    so all rows never have to be kept in memory at once.
+    """
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._buffer = ''
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+
+        if size < 0:
+            size = len(self._buffer)
+
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readline(self, size: int = -1) -> str:
+        return self.read(size)
+
+
+def copy_buildings(
+    db: Session, buildings: Iterable[BuildingRow], table_name: str = Building.__tablename__
+) -> int:
+    """
+    Bulk load buildings with COPY FROM STDIN in the current session transaction.
+    Geometries are sent as hex EWKB, which PostGIS reads without parsing WKT.
+    :return: number of loaded buildings
+    """
+    columns = ', '.join(
+        column.name
+        for column in (Building.geometry, Building.tags, Building.teryt, Building.content_hash)
+    )
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f'COPY {_quote(db, table_name)} ({columns}) FROM STDIN WITH (FORMAT csv)',
+            _IteratorFile(_buildings_to_csv_lines(buildings)),
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def insert_buildings(
+    db: Session, buildings: Iterable[BuildingRow], table_name: str = Building.__tablename__
+) -> int:
+    """
+    Slower alternative of copy_buildings, which uses plain INSERT statements.
+    :return: number of loaded buildings
+    """
+    buildings_table = table(
+        table_name,
+        column('geometry'),
+        column('tags', JSON),
+        column('teryt'),
+        column('content_hash', LargeBinary),
+    )
+    buildings_data = [
+        {
+            'wkb': wkb,
+            'tags': tags,
+            'teryt': teryt,
+            'content_hash': building_content_hash(wkb, tags),
+        }
+        for wkb, tags, teryt in buildings
+    ]
+    if buildings_data:
+        db.execute(
+            insert(buildings_table).values(
+                geometry=func.ST_GeomFromWKB(bindparam('wkb'), BUILDINGS_SRID),
+            ),
+            buildings_data,
+        )
+    return len(buildings_data)
+
+
+def _quote(db: Session, identifier: str) -> str:
+    return db.get_bind().dialect.identifier_preparer.quote(identifier)
+
+
+def _area_partition_name(teryt: str) -> str:
+    return f'{Building.__tablename__}_{teryt}'
+
+
+def area_partition_exists(db: Session, teryt: str) -> bool:
+    return (
+        db.execute(
+            text('SELECT to_regclass(:partition)'),
+            {'partition': _quote(db, _area_partition_name(teryt))},
+        ).scalar()
+        is not None
+    )
+
+
+def replace_area_buildings(
+    db: Session, teryt: str, buildings: Iterable[BuildingRow], use_copy: bool = True
+) -> BuildingsChangeCount:
+    """
+    Replace all buildings of the area by swapping its partition.
+    Data is loaded and indexed in the staging table, then the old partition
+    is detached and dropped and the staging table is attached in its place,
+    so no dead tuples are left.
+
+    The staging table is logged from the start, because SET LOGGED would rewrite it
+    and write it whole to WAL anyway. DETACH PARTITION can't be CONCURRENTLY inside
+    a transaction, so the swap holds ACCESS EXCLUSIVE lock of the buildings table
+    (blocking readers of all areas) until commit. All heavy work is done before the swap
+    and the lock is requested with lock_timeout, so the import gives up waiting
+    instead of queueing all readers behind it. Changes are visible after session commit,
+    which should follow right after this function.
+    """
+    partition_name = _area_partition_name(teryt)
+    staging_name = f'{partition_name}_staging'
+
+    staging = _quote(db, staging_name)
+    teryt_check = _quote(db, f'{staging_name}_teryt_check')
+    teryt_param = {'teryt': teryt}
+
+    db.execute(text(f'DROP TABLE IF EXISTS {staging}'))
+    db.execute(
+        text(
+            f'CREATE TABLE {staging} (LIKE {_quote(db, Building.__tablename__)} INCLUDING DEFAULTS)'
+        )
+    )
+
+    load_buildings = copy_buildings if use_copy else insert_buildings
+    change_count = BuildingsChangeCount(inserted=load_buildings(db, buildings, staging_name))
+
+    db.execute(
+        text(
+            f'CREATE INDEX {_quote(db, f"{staging_name}_geometry_idx")}'
+            f' ON {staging} USING gist (geometry)'
+        )
+    )
+    db.execute(
+        text(
+            f'ALTER TABLE {staging} ADD CONSTRAINT {_quote(db, f"{staging_name}_pkey")}'
+            ' PRIMARY KEY (id, teryt)'
+        )
+    )
+    # lets ATTACH PARTITION skip validation scan of the whole table
+    db.execute(
+        text(f'ALTER TABLE {staging} ADD CONSTRAINT {teryt_check} CHECK (teryt = :teryt)'),
+        teryt_param,
+    )
+
+    # rows of the area could be added before it got own partition
+    change_count.deleted = db.execute(
+        text(f'DELETE FROM {_quote(db, BUILDINGS_DEFAULT_PARTITION)} WHERE teryt = :teryt'),
+        teryt_param,
+    ).rowcount
+    partition_exists = area_partition_exists(db, teryt)
+    if partition_exists:
+        change_count.deleted += db.execute(
+            text(f'SELECT count(*) FROM {_quote(db, partition_name)}')
+        ).scalar()
+
+    previous_lock_timeout = db.execute(text('SHOW lock_timeout')).scalar()
+    attempt = 1
+    while True:
+        try:
+            # savepoint keeps the loaded staging table if waiting for the lock timed out
+            with db.begin_nested():
+                db.execute(
+                    text("SELECT set_config('lock_timeout', :lock_timeout, true)"),
+                    {'lock_timeout': f'{settings.BUILDINGS_SWAP_LOCK_TIMEOUT_MS}ms'},
+                )
+                _swap_area_partition(db, teryt, partition_exists)
+            break
+        except OperationalError as e:
+            if (
+                not isinstance(e.orig, LockNotAvailable)
+                or attempt >= settings.BUILDINGS_SWAP_LOCK_ATTEMPTS
+            ):
+                raise
+
+            attempt += 1
+
+    db.execute(
+        text("SELECT set_config('lock_timeout', :lock_timeout, true)"),
+        {'lock_timeout': previous_lock_timeout},
+    )
+    return change_count
+
+
+def _swap_area_partition(db: Session, teryt: str, partition_exists: bool) -> None:
+    """
+    Replace partition of the area by its prepared staging table.
+    """
+    partition_name = _area_partition_name(teryt)
+    staging_name = f'{partition_name}_staging'
+
+    buildings_table = _quote(db, Building.__tablename__)
+    partition = _quote(db, partition_name)
+    staging = _quote(db, staging_name)
+
+    if partition_exists:
+        db.execute(text(f'ALTER TABLE {buildings_table} DETACH PARTITION {partition}'))
+        db.execute(text(f'DROP TABLE {partition}'))
+
+    db.execute(text(f'ALTER TABLE {staging} RENAME TO {partition}'))
+    db.execute(
+        text(
+            f'ALTER INDEX {_quote(db, f"{staging_name}_geometry_idx")}'
+            f' RENAME TO {_quote(db, f"{partition_name}_geometry_idx")}'
+        )
+    )
+    db.execute(
+        text(
+            f'ALTER TABLE {partition} RENAME CONSTRAINT {_quote(db, f"{staging_name}_pkey")}'
+            f' TO {_quote(db, f"{partition_name}_pkey")}'
+        )
+    )
+    db.execute(
+        text(f'ALTER TABLE {buildings_table} ATTACH PARTITION {partition} FOR VALUES IN (:teryt)'),
+        {'teryt': teryt},
+    )
+    db.execute(
+        text(f'ALTER TABLE {partition} DROP CONSTRAINT {_quote(db, f"{staging_name}_teryt_check")}')
+    )
+
+
+def apply_area_buildings_diff(
+    db: Session, teryt: str, buildings: Iterable[BuildingRow], use_copy: bool = True
+) -> BuildingsChangeCount:
+    """
+    Write only differences between stored and new buildings of the area.
+    Buildings are compared by content hash, buildings with changed tags only
+    are matched by geometry and updated in place. Duplicated buildings are counted.
+    Changes are visible after session commit.
+    """
+    new_buildings: Dict[bytes, List[BuildingRow]] = defaultdict(list)
+    for building in buildings:
+        new_buildings[building_content_hash(building[0], building[1])].append(building)
+
+    stale_ids = []
+    stored_buildings = db.execute(
+        select(Building.id, Building.content_hash)
+        .where(Building.teryt == teryt)
+        .order_by(Building.id)
+    )
+    for building_id, content_hash in stored_buildings:
+        if content_hash is not None and (same_buildings := new_buildings.get(bytes(content_hash))):
+            same_buildings.pop()
+        else:
+            stale_ids.append(building_id)
+
+    added_by_geometry: Dict[bytes, List[BuildingRow]] = defaultdict(list)
+    for same_buildings in new_buildings.values():
+        for building in same_buildings:
+            added_by_geometry[building[0]].append(building)
+
+    updated_buildings = []
+    if stale_ids and added_by_geometry:
+        stale_geometries = db.execute(
+            select(Building.id, func.ST_AsBinary(Building.geometry, 'NDR')).where(
+                Building.teryt == teryt,
+                Building.id == any_(bindparam('ids', stale_ids, ARRAY(BigInteger))),
+            )
+        )
+        for building_id, wkb in stale_geometries:
+            if same_geometry_buildings := added_by_geometry.get(bytes(wkb)):
+                _, tags, _ = same_geometry_buildings.pop()
+                updated_buildings.append(
+                    {
+                        'building_id': building_id,
+                        'tags': tags,
+                        'content_hash': building_content_hash(bytes(wkb), tags),
+                    }
+                )
+
+    buildings_table = Building.__table__
+    if updated_buildings:
+        db.execute(
+            update(buildings_table)
+            .where(
+                buildings_table.c.teryt == teryt,
+                buildings_table.c.id == bindparam('building_id'),
+            )
+            .values(tags=bindparam('tags'), content_hash=bindparam('content_hash')),
+            updated_buildings,
+        )
+        updated_ids = {building['building_id'] for building in updated_buildings}
+        stale_ids = [building_id for building_id in stale_ids if building_id not in updated_ids]
+
+    if stale_ids:
+        db.execute(
+            delete(buildings_table).where(
+                buildings_table.c.teryt == teryt,
+                buildings_table.c.id == any_(bindparam('ids', stale_ids, ARRAY(BigInteger))),
+            )
+        )
+
+    load_buildings = copy_buildings if use_copy else insert_buildings
+    inserted = load_buildings(
+        db,
+        (building for same_buildings in added_by_geometry.values() for building in same_buildings),
+    )
+
+    return BuildingsChangeCount(
+        inserted=inserted, updated=len(updated_buildings), deleted=len(stale_ids)
+    )
+
+
+def update_area_buildings(
+    db: Session,
+    teryt: str,
+    buildings: Iterable[BuildingRow],
+    use_copy: bool = True,
+    use_diff: bool = True,
+) -> BuildingsChangeCount:
+    """
+    Apply only changes if the area was already imported, otherwise load whole area.
+    Listeners (e.g. tile cache) are notified about changed area after commit.
+    """
+    if use_diff and area_partition_exists(db, teryt):
+        change_count = apply_area_buildings_diff(db, teryt, buildings, use_copy)
+    else:
+        change_count = replace_area_buildings(db, teryt, buildings, use_copy)
 
-    result = {'type': 'FeatureCollection', 'features': []}
-    if feature := db.execute(query).scalar():
-        result['features'].append(feature)
+    if change_count.inserted or change_count.updated or change_count.deleted:
+        notify_area_buildings_changed(db, teryt)
 
-    return result
+    return change_count
@@ -0,0 +1,83 @@
+import select
+import threading
+
+from typing import Callable, List
+
+import psycopg2
+
+from backend.core.config import settings
+from backend.core.logger import default_logger
+
+AREA_BUILDINGS_CHANNEL = 'area_buildings_changed'
+
+AreaBuildingsCallback = Callable[[str], None]
+
+
+class AreaBuildingsListener:
+    """
+    Background thread which listens for area buildings changes (teryt)
+    made by import process and calls callbacks e.g. to invalidate caches.
+    """
+
+    POLL_TIMEOUT = 1.0
+    RECONNECT_DELAY = 5.0
+
+    def __init__(self, dsn: str = settings.DATABASE_URL) -> None:
+        self._dsn = dsn
+        self._callbacks: List[AreaBuildingsCallback] = []
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add_callback(self, callback: AreaBuildingsCallback) -> None:
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: AreaBuildingsCallback) -> None:
+        self._callbacks.remove(callback)
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='area-buildings-listener', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except psycopg2.Error as e:
+                default_logger.warning(f'Area buildings listener error: {e}')
+                self._stop_event.wait(self.RECONNECT_DELAY)
+
+    def _listen(self) -> None:
+        connection = psycopg2.connect(self._dsn)
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {AREA_BUILDINGS_CHANNEL}')
+
+            while not self._stop_event.is_set():
+                if not select.select([connection], [], [], self.POLL_TIMEOUT)[0]:
+                    continue
+
+                connection.poll()
+                while connection.notifies:
+                    self._notify(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _notify(self, teryt: str) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(teryt)
+            except Exception as e:
+                default_logger.exception(f'Area buildings callback error for {teryt}: {e}')
+
+
+area_buildings_listener = AreaBuildingsListener()
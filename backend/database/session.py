@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from backend.core.config import settings
@@ -8,6 +9,17 @@ _SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=create_engine(settings.DATABASE_URL)
 )
 
+_async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    pool_pre_ping=True,
+    connect_args={'prepared_statement_cache_size': settings.DATABASE_STATEMENT_CACHE_SIZE},
+)
+_AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=_async_engine)
+
 
 def get_db():
     db = _SessionLocal()
@@ -15,3 +27,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    await _async_engine.dispose()
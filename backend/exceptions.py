@@ -12,3 +12,7 @@ class AreaNotFound(Exception):
 
 class AreaDataNotFound(Exception):
     pass
+
+
+class AreaStoreError(Exception):
+    pass
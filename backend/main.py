@@ -6,17 +6,38 @@ from pythonjsonlogger.json import JsonFormatter
 from starlette.requests import Request
 
 from backend.api.v1.api import api_router
+from backend.core.cache import invalidate_points, invalidate_tiles, tile_cache
 from backend.core.config import settings
 from backend.core.logger import access_logger
 from backend.areas.finder import area_finder
+from backend.database.notifications import area_buildings_listener
+from backend.database.session import dispose_async_engine
 from backend.pages.pages import pages_router, generate_manifest
 
 
+def invalidate_area_tiles(teryt: str) -> None:
+    if envelope := area_finder.area_envelope(teryt):
+        invalidate_tiles(envelope)
+    else:
+        tile_cache.clear()
+
+
 @asynccontextmanager
 async def lifespan(_):
     area_finder.load_data()
     generate_manifest()
-    yield
+    # listener outlives the app (e.g. many test clients), so callbacks are removed at shutdown
+    callbacks = (invalidate_area_tiles, invalidate_points)
+    for callback in callbacks:
+        area_buildings_listener.add_callback(callback)
+    area_buildings_listener.start()
+    try:
+        yield
+    finally:
+        area_buildings_listener.stop()
+        for callback in callbacks:
+            area_buildings_listener.remove_callback(callback)
+        await dispose_async_engine()
 
 
 app = FastAPI(lifespan=lifespan)
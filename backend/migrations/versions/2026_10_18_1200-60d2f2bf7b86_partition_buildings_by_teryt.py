@@ -0,0 +1,69 @@
+"""Partition buildings by teryt
+
+Revision ID: 60d2f2bf7b86
+Revises: 7c6e0a03b4af
+Create Date: 2026-10-18 12:00:41.204518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '60d2f2bf7b86'
+down_revision: Union[str, None] = '7c6e0a03b4af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_buildings_table(primary_key: str, partition_by: str = '') -> None:
+    op.execute(
+        f"""
+        CREATE TABLE buildings (
+            id BIGINT NOT NULL DEFAULT nextval('buildings_id_seq'),
+            geometry geometry(GEOMETRY, 4326) NOT NULL,
+            tags JSON NOT NULL,
+            teryt VARCHAR(8) NOT NULL,
+            CONSTRAINT buildings_pkey PRIMARY KEY ({primary_key})
+        ) {partition_by}
+        """
+    )
+    op.execute('ALTER SEQUENCE buildings_id_seq OWNED BY buildings.id')
+    op.execute('CREATE INDEX idx_buildings_geometry ON buildings USING gist (geometry)')
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE buildings RENAME TO buildings_old')
+    op.execute('ALTER TABLE buildings_old RENAME CONSTRAINT buildings_pkey TO buildings_old_pkey')
+    op.execute('DROP INDEX IF EXISTS idx_buildings_geometry')
+
+    _create_buildings_table('id, teryt', 'PARTITION BY LIST (teryt)')
+    op.execute('CREATE TABLE buildings_default PARTITION OF buildings DEFAULT')
+
+    teryt_ids = op.get_bind().execute(sa.text('SELECT DISTINCT teryt FROM buildings_old'))
+    for teryt in teryt_ids.scalars():
+        op.execute(
+            sa.text(
+                f'CREATE TABLE "buildings_{teryt}" PARTITION OF buildings FOR VALUES IN (:teryt)'
+            ).bindparams(teryt=teryt)
+        )
+
+    op.execute('INSERT INTO buildings SELECT id, geometry, tags, teryt FROM buildings_old')
+    op.execute('DROP TABLE buildings_old')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE buildings RENAME TO buildings_partitioned')
+    op.execute(
+        'ALTER TABLE buildings_partitioned RENAME CONSTRAINT buildings_pkey'
+        ' TO buildings_partitioned_pkey'
+    )
+    op.execute('DROP INDEX idx_buildings_geometry')
+
+    _create_buildings_table('id')
+
+    op.execute('INSERT INTO buildings SELECT id, geometry, tags, teryt FROM buildings_partitioned')
+    op.execute('DROP TABLE buildings_partitioned')
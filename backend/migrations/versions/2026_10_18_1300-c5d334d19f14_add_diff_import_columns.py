@@ -0,0 +1,33 @@
+"""Add diff import columns
+
+Revision ID: c5d334d19f14
+Revises: 60d2f2bf7b86
+Create Date: 2026-10-18 13:00:12.418307
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d334d19f14'
+down_revision: Union[str, None] = '60d2f2bf7b86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('buildings', sa.Column('content_hash', sa.LargeBinary(), nullable=True))
+    op.add_column('area_imports', sa.Column('inserted_count', sa.BigInteger(), nullable=True))
+    op.add_column('area_imports', sa.Column('updated_count', sa.BigInteger(), nullable=True))
+    op.add_column('area_imports', sa.Column('deleted_count', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('area_imports', 'deleted_count')
+    op.drop_column('area_imports', 'updated_count')
+    op.drop_column('area_imports', 'inserted_count')
+    op.drop_column('buildings', 'content_hash')
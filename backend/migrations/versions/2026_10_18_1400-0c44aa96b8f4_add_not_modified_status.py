@@ -0,0 +1,58 @@
+"""Add NOT_MODIFIED status and download validators
+
+Revision ID: 0c44aa96b8f4
+Revises: c5d334d19f14
+Create Date: 2026-10-18 14:00:27.761034
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c44aa96b8f4'
+down_revision: Union[str, None] = 'c5d334d19f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+table_name = 'area_imports'
+column_name = 'result_status'
+enum_type_name = 'resultstatus'
+enum_value = 'NOT_MODIFIED'
+
+
+def upgrade() -> None:
+    op.execute(f"ALTER TYPE {enum_type_name} ADD VALUE '{enum_value}'")
+
+    op.add_column(table_name, sa.Column('etag', sa.String(), nullable=True))
+    op.add_column(table_name, sa.Column('last_modified', sa.String(), nullable=True))
+    op.add_column(table_name, sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column(table_name, 'content_hash')
+    op.drop_column(table_name, 'last_modified')
+    op.drop_column(table_name, 'etag')
+
+    op.execute(
+        f'UPDATE {table_name}'
+        f" SET {column_name} = 'SUCCESS'"
+        f" WHERE {column_name} = '{enum_value}'"
+    )
+
+    enum_type_name_old = enum_type_name + '_old'
+    op.execute(f'ALTER TYPE {enum_type_name} RENAME to {enum_type_name_old}')
+    op.execute(
+        f'CREATE TYPE {enum_type_name} AS ENUM('
+        "'SUCCESS', 'DOWNLOADING_ERROR', 'PARSING_ERROR', 'EMPTY_DATA_ERROR', 'DATA_CHECK_ERROR')"
+    )
+    op.execute(
+        f'ALTER TABLE {table_name}'
+        f' ALTER COLUMN {column_name}'
+        f' TYPE {enum_type_name}'
+        f' USING {column_name}::text::{enum_type_name}'
+    )
+    op.execute(f'DROP TYPE {enum_type_name_old}')
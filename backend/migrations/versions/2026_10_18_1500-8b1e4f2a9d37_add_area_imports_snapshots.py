@@ -0,0 +1,42 @@
+"""Add area imports snapshots and latest import index
+
+Revision ID: 8b1e4f2a9d37
+Revises: 0c44aa96b8f4
+Create Date: 2026-10-18 15:00:12.402817
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e4f2a9d37'
+down_revision: Union[str, None] = '0c44aa96b8f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+index_name = 'ix_area_imports_teryt_end_at_id'
+
+
+def upgrade() -> None:
+    op.create_index(
+        index_name,
+        'area_imports',
+        ['teryt', sa.text('end_at DESC'), sa.text('id DESC')],
+    )
+    op.create_table(
+        'area_imports_snapshots',
+        sa.Column('name', sa.String(length=16), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('etag', sa.String(length=64), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('area_imports_snapshots')
+    op.drop_index(index_name, table_name='area_imports')
@@ -0,0 +1,32 @@
+"""Add parser fingerprint to area imports
+
+Revision ID: 5d7a3c9e1b42
+Revises: 8b1e4f2a9d37
+Create Date: 2026-10-18 16:00:41.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7a3c9e1b42'
+down_revision: Union[str, None] = '8b1e4f2a9d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+table_name = 'area_imports'
+
+
+def upgrade() -> None:
+    # previous imports without fingerprint are never treated as unchanged
+    op.add_column(
+        table_name, sa.Column('parser_fingerprint', sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column(table_name, 'parser_fingerprint')
@@ -7,10 +7,12 @@ from sqlalchemy import (
     JSON,
     String,
     DateTime,
+    Text,
     func,
     Boolean,
     Enum as ColEnum,
     CheckConstraint,
+    Index,
 )
 from sqlalchemy.ext.hybrid import hybrid_property
 
@@ -23,6 +25,13 @@ class ResultStatus(Enum):
     PARSING_ERROR = 'parsing_error'
     EMPTY_DATA_ERROR = 'empty_data_error'
     DATA_CHECK_ERROR = 'data_check_error'
+    NOT_MODIFIED = 'not_modified'  # data is the same as in the last successful import
+
+    def is_success(self) -> bool:
+        return self in SUCCESS_RESULT_STATUSES
+
+
+SUCCESS_RESULT_STATUSES = (ResultStatus.SUCCESS, ResultStatus.NOT_MODIFIED)
 
 
 class AreaImport(Base):
@@ -40,6 +49,9 @@ class AreaImport(Base):
     result_status = Column(ColEnum(ResultStatus), nullable=False)
 
     building_count = Column(BigInteger, nullable=False)
+    inserted_count = Column(BigInteger, nullable=True)
+    updated_count = Column(BigInteger, nullable=True)
+    deleted_count = Column(BigInteger, nullable=True)
 
     has_building_type = Column(Boolean, nullable=False)
     has_building_levels = Column(Boolean, nullable=False)
@@ -50,9 +62,40 @@ class AreaImport(Base):
     data_check_expected_tags = Column(JSON, nullable=True)
     data_check_result_tags = Column(JSON, nullable=True)
 
+    # validators of the downloaded data, used to skip import of unchanged data
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 hex digest
+    parser_fingerprint = Column(String(64), nullable=True)  # BaseAreaParser.fingerprint()
+
     @hybrid_property
     def data_check_has_expected_tags(self) -> bool:
         return (
             self.data_check_expected_tags is not None
             and self.data_check_expected_tags == self.data_check_result_tags
         )
+
+
+# latest and stable imports of every area are selected in this order
+Index(
+    'ix_area_imports_teryt_end_at_id',
+    AreaImport.teryt,
+    AreaImport.end_at.desc(),
+    AreaImport.id.desc(),
+)
+
+LATEST_AREA_IMPORTS_SNAPSHOT = 'latest'
+STABLE_AREA_IMPORTS_SNAPSHOT = 'stable'
+
+
+class AreaImportsSnapshot(Base):
+    """
+    Serialized responses of latest/stable area imports, refreshed after import.
+    """
+
+    __tablename__ = 'area_imports_snapshots'
+
+    name = Column(String(16), primary_key=True)
+    payload = Column(Text, nullable=False)  # JSON list of area imports
+    etag = Column(String(64), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
@@ -1,13 +1,33 @@
-from sqlalchemy import Column, BigInteger, String, JSON
+from sqlalchemy import Column, BigInteger, DDL, LargeBinary, String, JSON, event
 from geoalchemy2 import Geometry
 
 from backend.database.base import Base
 
 
 class Building(Base):
+    """
+    Buildings are partitioned by area (teryt), so area can be replaced by swapping partition.
+    Rows of areas without own partition (e.g. added manually) are stored in default partition.
+    """
+
     __tablename__ = 'buildings'
+    __table_args__ = {'postgresql_partition_by': 'LIST (teryt)'}
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     geometry = Column(Geometry(srid=4326, spatial_index=True), nullable=False)
     tags = Column(JSON, nullable=False)
-    teryt = Column(String(8), nullable=False)
+    # partition key must be a part of the primary key
+    teryt = Column(String(8), primary_key=True)
+    # hash of geometry and tags, used by diff import to skip unchanged buildings
+    content_hash = Column(LargeBinary, nullable=True)
+
+
+BUILDINGS_DEFAULT_PARTITION = f'{Building.__tablename__}_default'
+
+event.listen(
+    Building.__table__,
+    'after_create',
+    DDL(
+        f'CREATE TABLE {BUILDINGS_DEFAULT_PARTITION} PARTITION OF {Building.__tablename__} DEFAULT'
+    ),
+)
@@ -1,10 +1,11 @@
 from datetime import datetime
 
-from typing import Any
+from typing import Any, Iterable
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
-from backend.models.area_import import ResultStatus
+from backend.areas.config import all_areas
+from backend.models.area_import import AreaImport as AreaImportModel, ResultStatus
 
 
 class AreaImport(BaseModel):
@@ -17,6 +18,9 @@ class AreaImport(BaseModel):
     result_status: ResultStatus
 
     building_count: int
+    inserted_count: int | None
+    updated_count: int | None
+    deleted_count: int | None
 
     has_building_type: bool
     has_building_levels: bool
@@ -25,3 +29,37 @@ class AreaImport(BaseModel):
     data_check_has_expected_tags: bool
     data_check_expected_tags: dict[str, Any] | None
     data_check_result_tags: dict[str, Any] | None
+
+
+area_imports_adapter = TypeAdapter(list[AreaImport])
+
+
+def convert_to_area_import_schema(db_area_import: AreaImportModel) -> AreaImport:
+    return AreaImport(
+        id=db_area_import.id,
+        name=all_areas[db_area_import.teryt].name,
+        teryt=db_area_import.teryt,
+        start_at=db_area_import.start_at,
+        end_at=db_area_import.end_at,
+        result_status=db_area_import.result_status,
+        building_count=db_area_import.building_count,
+        inserted_count=db_area_import.inserted_count,
+        updated_count=db_area_import.updated_count,
+        deleted_count=db_area_import.deleted_count,
+        has_building_type=db_area_import.has_building_type,
+        has_building_levels=db_area_import.has_building_levels,
+        has_building_levels_undg=db_area_import.has_building_levels_undg,
+        data_check_has_expected_tags=db_area_import.data_check_has_expected_tags,  # noqa
+        data_check_expected_tags=db_area_import.data_check_expected_tags,
+        data_check_result_tags=db_area_import.data_check_result_tags,
+    )
+
+
+def serialize_area_imports(db_area_imports: Iterable[AreaImportModel]) -> str:
+    """
+    :return: JSON list of area imports, the same as returned by the API
+    """
+    area_imports = [
+        convert_to_area_import_schema(db_area_import) for db_area_import in db_area_imports
+    ]
+    return area_imports_adapter.dump_json(area_imports).decode()
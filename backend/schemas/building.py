@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class Point(BaseModel):
+    lat: float = Field(gt=-90, lt=90)
+    lon: float = Field(gt=-180, lt=180)
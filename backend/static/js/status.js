@@ -11,6 +11,7 @@ class AreaImport {
         PARSING_ERROR: 'parsing_error',
         EMPTY_DATA_ERROR: 'empty_data_error',
         DATA_CHECK_ERROR: 'data_check_error',
+        NOT_MODIFIED: 'not_modified',
     }
     static translationResultStatusPl = {
         success: 'Sukces',
@@ -18,6 +19,7 @@ class AreaImport {
         parsing_error: 'Błąd przetwarzania danych',
         data_check_error: 'Błąd walidacji danych',
         empty_data_error: 'Brak danych',
+        not_modified: 'Bez zmian',
     }
 
     constructor({
@@ -27,6 +29,9 @@ class AreaImport {
                     start_at,
                     end_at,
                     building_count,
+                    inserted_count,
+                    updated_count,
+                    deleted_count,
                     result_status,
                     has_building_type,
                     has_building_levels,
@@ -41,6 +46,9 @@ class AreaImport {
         this.startTs = Date.parse(start_at);
         this.endTs = Date.parse(end_at);
         this.buildingCount = building_count;
+        this.insertedCount = inserted_count;
+        this.updatedCount = updated_count;
+        this.deletedCount = deleted_count;
         this.hasBuildingType = has_building_type;
         this.hasBuildingLevels = has_building_levels;
         this.hasBuildingLevelsUnderground = has_building_levels_underground;
@@ -80,6 +88,14 @@ class AreaImport {
         return score;
     }
 
+    hasChangeCounts() {
+        return this.insertedCount !== null && this.updatedCount !== null && this.deletedCount !== null;
+    }
+
+    isSuccess() {
+        return [AreaImport.ResultStatus.SUCCESS, AreaImport.ResultStatus.NOT_MODIFIED].includes(this.resultStatus);
+    }
+
     getResultStatusDisplay() {
         return AreaImport.translationResultStatusPl[this.resultStatus];
     }
@@ -153,7 +169,7 @@ function updateSummarySection(areaImportData) {
             totalCommunesNumber++;
         }
 
-        if (areaImport.resultStatus === AreaImport.ResultStatus.SUCCESS) {
+        if (areaImport.isSuccess()) {
             if (areaImport.isCounty()) {
                 successCountiesNumber++;
             } else {
@@ -175,6 +191,7 @@ function updateSummarySection(areaImportData) {
 
 const RESULT_STATUS_COLORS = {
     [AreaImport.ResultStatus.SUCCESS]: '#00FF00',
+    [AreaImport.ResultStatus.NOT_MODIFIED]: '#7CFC00',
     [AreaImport.ResultStatus.DATA_CHECK_ERROR]: '#FFD700',
     [AreaImport.ResultStatus.DOWNLOADING_ERROR]: '#FF0000',
     [AreaImport.ResultStatus.PARSING_ERROR]: '#85002c',
@@ -199,7 +216,7 @@ function getBackgroundColorBy(visualization, areaImportData) {
         return areaImportData.map(function (areaImport) {
             const days = daysBetweenDates(new Date(areaImport.endTs), new Date());
             let color;
-            if (areaImport.resultStatus !== AreaImport.ResultStatus.SUCCESS || days > 28) {
+            if (!areaImport.isSuccess() || days > 28) {
                 color = UPDATED_DT_COLORS.MORE_THAN_28_DAYS_OR_ERROR;
             } else if (days > 14) {
                 color = UPDATED_DT_COLORS.MORE_THAN_14_DAYS;
@@ -265,7 +282,7 @@ function createTooltipHTMLContent(areaImport) {
     ulElement.appendChild(liImportDt);
     ulElement.appendChild(liScore);
 
-    if ([AreaImport.ResultStatus.SUCCESS, AreaImport.ResultStatus.DATA_CHECK_ERROR].includes(areaImport.resultStatus)) {
+    if (areaImport.isSuccess() || areaImport.resultStatus === AreaImport.ResultStatus.DATA_CHECK_ERROR) {
         const liBuildingCount = document.createElement('li');
         liBuildingCount.textContent = `Liczba budynków: ${areaImport.buildingCount}`;
 
@@ -279,6 +296,12 @@ function createTooltipHTMLContent(areaImport) {
         liHasBuildingUndergroundLevels.textContent = `Zawiera piętra (podziemne) budynku: ${areaImport.hasBuildingLevelsUnderground ? 'Tak' : 'Nie'}`;
 
         ulElement.appendChild(liBuildingCount);
+
+        if (areaImport.hasChangeCounts()) {
+            const liChangeCounts = document.createElement('li');
+            liChangeCounts.textContent = `Zmiany: +${areaImport.insertedCount} ~${areaImport.updatedCount} -${areaImport.deletedCount}`;
+            ulElement.appendChild(liChangeCounts);
+        }
         ulElement.appendChild(document.createElement('hr'));
         ulElement.appendChild(liHasBuildingType);
         ulElement.appendChild(liHasBuildingLevels);
@@ -347,6 +370,7 @@ function updateVisualizationInfo(visualizationType) {
             contentDiv.innerHTML = '<span>Raport przedstawia status zakończenia importu budynków dla poszczególnych obszarów.</span>' +
                 '<ul>' +
                 `<li><span class="tooltip-square" style="background: ${RESULT_STATUS_COLORS[AreaImport.ResultStatus.SUCCESS]}"></span><span>${AreaImport.translationResultStatusPl.success} – import zakończony pomyślnie.</li>` +
+                `<li><span class="tooltip-square" style="background: ${RESULT_STATUS_COLORS[AreaImport.ResultStatus.NOT_MODIFIED]}"></span><span>${AreaImport.translationResultStatusPl.not_modified} – dane nie zmieniły się od ostatniego importu.</li>` +
                 `<li><span class="tooltip-square" style="background: ${RESULT_STATUS_COLORS[AreaImport.ResultStatus.DATA_CHECK_ERROR]}"></span><span>${AreaImport.translationResultStatusPl.data_check_error} – obszar nie zawiera oczekiwanych danych testowych.</li>` +
                 `<li><span class="tooltip-square" style="background: ${RESULT_STATUS_COLORS[AreaImport.ResultStatus.DOWNLOADING_ERROR]}"></span><span>${AreaImport.translationResultStatusPl.downloading_error} – brak odpowiedzi z serwera WFS.</li>` +
                 `<li><span class="tooltip-square" style="background: ${RESULT_STATUS_COLORS[AreaImport.ResultStatus.PARSING_ERROR]}"></span><span>${AreaImport.translationResultStatusPl.parsing_error} – nieoczekiwana odpowiedź z serwera WFS.</li>` +
@@ -1,21 +1,39 @@
 import asyncio
 import datetime
 
+from asyncio import AbstractEventLoop
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from tempfile import NamedTemporaryFile
+from typing import BinaryIO, Dict, Set, Tuple
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
 
 from httpx import AsyncClient, HTTPError, Timeout
-from sqlalchemy import insert, bindparam
+from osgeo import ogr
 
+from backend.areas.batch import BuildingBatch
 from backend.areas.data.expected_building import all_areas_data
 from backend.areas.config import all_areas
-from backend.areas.finder import area_finder
+from backend.areas.finder import AreaFinder, area_finder
+from backend.areas.gml import (
+    NUMBER_RETURNED_HEADER_SIZE,
+    gml_number_matched,
+    gml_number_returned,
+)
 from backend.areas.parsers import BaseAreaParser
+from backend.core.config import settings
 from backend.core.logger import default_logger
-from backend.models.building import Building
+from backend.crud.area_import import (
+    get_latest_successful_area_import,
+    refresh_area_imports_snapshots,
+)
+from backend.crud.building import BuildingsChangeCount, update_area_buildings
 from backend.models.area_import import AreaImport, ResultStatus
 from backend.database.session import get_db
-from backend.exceptions import ParserError
+from backend.exceptions import AreaDataNotFound, ParserError
 
 
 @dataclass
@@ -23,6 +41,9 @@ class ImportResult:
     teryt: str
     status: ResultStatus
     building_count: int = 0
+    inserted_count: int | None = None
+    updated_count: int | None = None
+    deleted_count: int | None = None
     has_building_type: bool = False
     has_building_levels: bool = False
     has_building_levels_undg: bool = False
@@ -30,6 +51,10 @@ class ImportResult:
     data_check_lon: float | None = None
     data_check_expected_tags: dict | None = None
     data_check_result_tags: dict | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    content_hash: str | None = None
+    parser_fingerprint: str | None = None
 
     def is_data_check_error_with_improved_tags(self) -> bool:
         """
@@ -59,62 +84,543 @@ class ImportResult:
         return True
 
 
-async def area_import_attempt(area_parser: BaseAreaParser, teryt: str) -> ImportResult | None:
-    url = area_parser.build_buildings_url()
+@dataclass
+class DownloadResult:
+    not_modified: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+    content_hash: str | None = None  # SHA-256 hex digest of parsed buildings, see BuildingBatch
+
+
+async def download_to_file(
+    url: str, file: BinaryIO, headers: dict[str, str] | None = None
+) -> DownloadResult:
+    """
+    Stream response body as raw bytes to the file, without decoding it to text.
+    :param headers: extra request headers e.g. conditional If-None-Match/If-Modified-Since
+    :return: response validators, or not_modified=True if server responded 304 Not Modified
+    :raises HTTPError – if connection failed or response status code is not 200 or 304
+    """
+    async with AsyncClient(verify=False, timeout=Timeout(300, connect=30)) as client:
+        async with client.stream('GET', url, headers=headers or {}) as response:
+            if response.status_code == 304:
+                return DownloadResult(not_modified=True)
 
-    default_logger.debug(f'[IMPORT] [{teryt}] Downloading data from {url}')
-    try:
-        async with AsyncClient(verify=False, timeout=Timeout(300, connect=30)) as client:
-            response = await client.get(url)
-            gml_raw = response.text
             if response.status_code != 200:
                 raise HTTPError(f'Invalid status code: {response.status_code}')
 
+            async for chunk in response.aiter_bytes():
+                file.write(chunk)
+
+            return DownloadResult(
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
+
+
+# Semaphores are bound to the event loop on first use
+_host_semaphores: WeakKeyDictionary[AbstractEventLoop, Dict[str, asyncio.Semaphore]] = (
+    WeakKeyDictionary()
+)
+
+
+def host_semaphore(url: str) -> asyncio.Semaphore:
+    """
+    :return: semaphore limiting concurrent requests to the server of the url,
+    shared by all areas imported in the running event loop
+    """
+    semaphores = _host_semaphores.setdefault(asyncio.get_running_loop(), {})
+    host = urlparse(url).netloc
+    if (semaphore := semaphores.get(host)) is None:
+        semaphore = semaphores[host] = asyncio.Semaphore(settings.WFS_HOST_MAX_CONNECTIONS)
+
+    return semaphore
+
+
+def conditional_request_headers(previous_import: AreaImport | None) -> dict[str, str]:
+    headers = {}
+    if previous_import is None:
+        return headers
+
+    if previous_import.etag:
+        headers['If-None-Match'] = previous_import.etag
+    if previous_import.last_modified:
+        headers['If-Modified-Since'] = previous_import.last_modified
+
+    return headers
+
+
+def not_modified_import_result(
+    teryt: str, previous_import: AreaImport, download_result: DownloadResult
+) -> ImportResult:
+    """
+    Import result of unchanged data, which is copied from the previous successful import.
+    """
+    return ImportResult(
+        teryt=teryt,
+        status=ResultStatus.NOT_MODIFIED,
+        building_count=previous_import.building_count,
+        inserted_count=0,
+        updated_count=0,
+        deleted_count=0,
+        has_building_type=previous_import.has_building_type,
+        has_building_levels=previous_import.has_building_levels,
+        has_building_levels_undg=previous_import.has_building_levels_undg,
+        data_check_lat=previous_import.data_check_lat,
+        data_check_lon=previous_import.data_check_lon,
+        data_check_expected_tags=previous_import.data_check_expected_tags,
+        data_check_result_tags=previous_import.data_check_result_tags,
+        etag=download_result.etag or previous_import.etag,
+        last_modified=download_result.last_modified or previous_import.last_modified,
+        content_hash=previous_import.content_hash,
+        parser_fingerprint=previous_import.parser_fingerprint,
+    )
+
+
+@dataclass
+class ParsedAreaData:
+    """
+    Compact result of parsing, which is cheap to send back from worker process.
+    """
+
+    buildings: BuildingBatch = field(default_factory=BuildingBatch)  # WKB and OSM tags
+    data_check_result_tags: dict | None = None
+
+    def extend(self, other: 'ParsedAreaData', wkb_keys: Set[bytes] | None = None) -> None:
+        """
+        Append data parsed from the next page or tile, the first building at the data check
+        point wins.
+        :param wkb_keys: keys of already appended geometries, see BuildingBatch.extend
+        """
+        self.buildings.extend(other.buildings, wkb_keys)
+        if self.data_check_result_tags is None:
+            self.data_check_result_tags = other.data_check_result_tags
+
+
+@dataclass
+class AreaPart:
+    """
+    Parsed data of the page of area or of its tile.
+    """
+
+    parsed_area_data: ParsedAreaData
+    number_returned: int | None = None
+    number_matched: int | None = None  # None also if server responded 'unknown'
+
+    def is_last_page(self, start_index: int) -> bool:
+        """
+        Empty page is the last one, or the page with the last matched feature if server counts
+        them. Page with fewer features than requested isn't the last one, server can limit
+        number of features per response.
+        :raises ParserError – if numberReturned is unknown, the area would be silently truncated
+        """
+        if self.number_returned is None:
+            raise ParserError('numberReturned not found in WFS page')
+
+        if self.number_returned == 0:
+            return True
+
+        return (
+            self.number_matched is not None
+            and start_index + self.number_returned >= self.number_matched
+        )
+
+
+def parse_area_data(
+    teryt: str,
+    gml_path: str,
+    data_check_lat: float,
+    data_check_lon: float,
+    area_parser: BaseAreaParser | None = None,
+) -> ParsedAreaData:
+    """
+    CPU-heavy part of the import. It can be executed in a worker process, so the parser
+    is chosen by teryt from all_areas if it's not given.
+    :raises ParserError
+    """
+    if area_parser is None:
+        area_parser = all_areas[teryt]
+
+    data_check_point = ogr.Geometry(ogr.wkbPoint)
+    data_check_point.AddPoint(data_check_lon, data_check_lat)
+
+    to_osm_tags = area_parser.osm_tags_converter()
+    parsed_area_data = ParsedAreaData()
+    with open(gml_path, 'rb') as gml_file:
+        # buildings are streamed to the batch, so parsed geometries aren't kept in memory
+        for geometry, raw_properties in area_parser.iter_gml_geometries_and_properties(gml_file):
+            tags = to_osm_tags(raw_properties)
+            parsed_area_data.buildings.append(geometry.ExportToWkb(ogr.wkbNDR), tags)
+
+            # the first building which contains the point is flagged in the same pass
+            if (
+                parsed_area_data.data_check_result_tags is None
+                and raw_properties
+                and AreaFinder.building_contains_point(geometry, data_check_point)
+            ):
+                parsed_area_data.data_check_result_tags = tags
+
+    return parsed_area_data
+
+
+async def parse_gml_file(
+    teryt: str,
+    gml_path: str,
+    data_check_lat: float,
+    data_check_lon: float,
+    area_parser: BaseAreaParser,
+    executor: Executor | None = None,
+) -> ParsedAreaData:
+    """
+    :param executor: pool used to parse the data, if None data is parsed in current process
+    :raises ParserError
+    """
+    if executor is None:
+        return parse_area_data(teryt, gml_path, data_check_lat, data_check_lon, area_parser)
+
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, parse_area_data, teryt, gml_path, data_check_lat, data_check_lon
+    )
+
+
+async def download_and_parse_area(
+    area_parser: BaseAreaParser,
+    teryt: str,
+    data_check_lat: float,
+    data_check_lon: float,
+    previous_import: AreaImport | None,
+    executor: Executor | None = None,
+) -> Tuple[DownloadResult, ParsedAreaData | None]:
+    """
+    Download all features in one request.
+    :return: download result and parsed data, or None if server responded 304 Not Modified
+    :raises HTTPError, ParserError
+    """
+    url = area_parser.build_buildings_url()
+    with NamedTemporaryFile(suffix='.gml') as gml_file:
+        default_logger.debug(f'[IMPORT] [{teryt}] Downloading data from {url}')
+        download_result = await download_to_file(
+            url, gml_file, conditional_request_headers(previous_import)
+        )
+        gml_file.flush()
+
+        if download_result.not_modified:
+            return download_result, None
+
+        default_logger.debug(f'[IMPORT] [{teryt}] Parsing data')
+        parsed_area_data = await parse_gml_file(
+            teryt, gml_file.name, data_check_lat, data_check_lon, area_parser, executor
+        )
+
+    return download_result, parsed_area_data
+
+
+async def download_and_parse_part(
+    area_parser: BaseAreaParser,
+    teryt: str,
+    url: str,
+    part_name: str,
+    data_check_lat: float,
+    data_check_lon: float,
+    executor: Executor | None = None,
+) -> AreaPart:
+    """
+    Download the page under the per-host limit and parse it right after
+    it's downloaded. Only the failed download of the part is retried.
+    :param part_name: name of the part for logs e.g. page 1
+    :raises HTTPError – if all attempts failed
+    :raises ParserError
+    """
+    attempt = 1
+    while True:
+        with NamedTemporaryFile(suffix='.gml') as gml_file:
+            default_logger.debug(f'[IMPORT] [{teryt}] Downloading {part_name} from {url}')
+            try:
+                async with host_semaphore(url):
+                    await download_to_file(url, gml_file)
+                gml_file.flush()
+            except HTTPError as err_msg:
+                if attempt >= settings.WFS_PAGE_MAX_ATTEMPTS:
+                    raise
+
+                default_logger.debug(
+                    f'[IMPORT] [{teryt}] Error at downloading {part_name}: {err_msg}.'
+                    f' Waiting {settings.WFS_PAGE_RETRY_DELAY} seconds before next attempt'
+                )
+            else:
+                gml_file.seek(0)
+                header = gml_file.read(NUMBER_RETURNED_HEADER_SIZE)
+                parsed_area_data = await parse_gml_file(
+                    teryt, gml_file.name, data_check_lat, data_check_lon, area_parser, executor
+                )
+                return AreaPart(
+                    parsed_area_data, gml_number_returned(header), gml_number_matched(header)
+                )
+
+        attempt += 1
+        await asyncio.sleep(settings.WFS_PAGE_RETRY_DELAY)
+
+
+async def download_and_parse_pages(
+    area_parser: BaseAreaParser,
+    teryt: str,
+    url: str,
+    part_name: str,
+    data_check_lat: float,
+    data_check_lon: float,
+    executor: Executor | None = None,
+    window_size: int | None = None,
+) -> ParsedAreaData:
+    """
+    Download features of the URL using WFS 2.0 paging. Total number of features is unknown
+    upfront, so pages are requested in windows of concurrent requests until the last page
+    is found. Page with fewer features than requested before the last page means that server
+    limit is lower than page size and features between pages would be skipped.
+    :param part_name: name of paged features for logs e.g. tile 1
+    :param window_size: number of concurrent requests, WFS_HOST_MAX_CONNECTIONS by default
+    :raises HTTPError, ParserError
+    """
+    window_size = window_size or settings.WFS_HOST_MAX_CONNECTIONS
+    page_size = area_parser.page_size
+    parsed_area_data = ParsedAreaData()
+    first_page_index = 0
+    short_page_index = None
+    while True:
+        page_indexes = range(first_page_index, first_page_index + window_size)
+        pages = await asyncio.gather(
+            *[
+                download_and_parse_part(
+                    area_parser,
+                    teryt,
+                    area_parser.build_buildings_page_url(page_index * page_size, url),
+                    f'{part_name} page {page_index}',
+                    data_check_lat,
+                    data_check_lon,
+                    executor,
+                )
+                for page_index in page_indexes
+            ],
+            return_exceptions=True,
+        )
+        # pages after the last one are ignored, even if they failed
+        for page_index, page in zip(page_indexes, pages):
+            if isinstance(page, BaseException):
+                raise page
+
+            parsed_area_data.extend(page.parsed_area_data)
+            if page.is_last_page(page_index * page_size):
+                return parsed_area_data
+
+            if short_page_index is None and page.number_returned != page_size:
+                short_page_index = page_index
+            if short_page_index is not None and (
+                short_page_index < page_index or page.number_matched is not None
+            ):
+                raise ParserError(
+                    f'{part_name} page {short_page_index} has fewer features than {page_size}'
+                    ' and it is not the last page, page size exceeds the server limit'
+                )
+
+        first_page_index += window_size
+
+
+async def download_and_parse_area_pages(
+    area_parser: BaseAreaParser,
+    teryt: str,
+    data_check_lat: float,
+    data_check_lon: float,
+    executor: Executor | None = None,
+) -> Tuple[DownloadResult, ParsedAreaData]:
+    """
+    Download all features of the area using WFS 2.0 paging, conditional requests aren't used.
+    :raises HTTPError, ParserError
+    """
+    parsed_area_data = await download_and_parse_pages(
+        area_parser,
+        teryt,
+        area_parser.build_buildings_url(),
+        'area',
+        data_check_lat,
+        data_check_lon,
+        executor,
+    )
+    return DownloadResult(), parsed_area_data
+
+
+async def download_and_parse_area_tiles(
+    area_parser: BaseAreaParser,
+    teryt: str,
+    data_check_lat: float,
+    data_check_lon: float,
+    executor: Executor | None = None,
+) -> Tuple[DownloadResult, ParsedAreaData]:
+    """
+    Download features of the area envelope split into BBOX tiles, all tiles are requested
+    at once and limited by the per-host semaphore. Every tile is paged, so a dense tile
+    isn't truncated by the limit of features of the server. Its pages are requested one
+    by one, as tiles are already downloaded concurrently. Buildings at the edges are
+    returned with every tile they intersect, so they are deduplicated by the hash of geometry.
+    Conditional requests aren't used.
+    :raises HTTPError, ParserError
+    :raises AreaDataNotFound – if area data is not loaded
+    """
+    tiles = area_finder.area_tiles(teryt, area_parser.tile_size)
+    default_logger.debug(f'[IMPORT] [{teryt}] Downloading data in {len(tiles)} tiles')
+
+    tiles_parts = await asyncio.gather(
+        *[
+            download_and_parse_pages(
+                area_parser,
+                teryt,
+                area_parser.build_buildings_bbox_url(tile),
+                f'tile {tile_index}',
+                data_check_lat,
+                data_check_lon,
+                executor,
+                window_size=1,
+            )
+            for tile_index, tile in enumerate(tiles)
+        ],
+        return_exceptions=True,
+    )
+
+    parsed_area_data = ParsedAreaData()
+    wkb_keys: Set[bytes] = set()
+    for tile_part in tiles_parts:
+        if isinstance(tile_part, BaseException):
+            raise tile_part
+
+        parsed_area_data.extend(tile_part, wkb_keys)
+
+    return DownloadResult(), parsed_area_data
+
+
+def area_data_not_found_result(teryt: str) -> ImportResult:
+    """
+    Area geometry is required to check imported data and to split area into tiles,
+    import without it fails instead of breaking imports of other areas.
+    """
+    default_logger.warning(f'[IMPORT] [{teryt}] Area data not found.')
+    return ImportResult(teryt=teryt, status=ResultStatus.PARSING_ERROR)
+
+
+def buildings_in_area(teryt: str, buildings: BuildingBatch) -> bool:
+    """
+    :return: True if any building is within the area, False e.g. for misprojected data
+    :raises AreaDataNotFound – if area data is not loaded
+    """
+    return any(
+        area_finder.geometry_in_area(ogr.CreateGeometryFromWkb(wkb), teryt)
+        for wkb in buildings.wkbs()
+    )
+
+
+def save_area_buildings(teryt: str, buildings: BuildingBatch) -> BuildingsChangeCount:
+    """
+    Hashing and serialisation of every building and synchronous DB I/O, it's run in a thread,
+    so it doesn't block downloads of other areas.
+    """
+    with contextmanager(get_db)() as session:
+        change_count = update_area_buildings(
+            session,
+            teryt,
+            ((wkb, tags, teryt) for wkb, tags in buildings),
+            use_copy=settings.BUILDINGS_COPY_LOADER,
+            use_diff=settings.BUILDINGS_DIFF_IMPORT,
+        )
+        session.commit()
+
+    return change_count
+
+
+async def area_import_attempt(
+    area_parser: BaseAreaParser, teryt: str, executor: Executor | None = None
+) -> ImportResult | None:
+    """
+    :param executor: pool used to parse the data, if None data is parsed in current process
+    """
+    dc_expected = all_areas_data[teryt]
+    dc_lat = dc_expected.lat
+    dc_lon = dc_expected.lon
+    dc_expected_tags = dc_expected.expected_tags
+
+    with contextmanager(get_db)() as session:
+        previous_import = get_latest_successful_area_import(session, teryt)
+
+    # Unchanged data can be skipped only if it would be parsed and checked the same way
+    parser_fingerprint = area_parser.fingerprint()
+    if previous_import is not None and (
+        previous_import.parser_fingerprint,
+        previous_import.data_check_lat,
+        previous_import.data_check_lon,
+        previous_import.data_check_expected_tags,
+    ) != (parser_fingerprint, dc_lat, dc_lon, dc_expected_tags):
+        previous_import = None
+
+    try:
+        if area_parser.tile_size is not None:
+            download_result, parsed_area_data = await download_and_parse_area_tiles(
+                area_parser, teryt, dc_lat, dc_lon, executor
+            )
+        elif area_parser.page_size is None:
+            download_result, parsed_area_data = await download_and_parse_area(
+                area_parser, teryt, dc_lat, dc_lon, previous_import, executor
+            )
+        else:
+            download_result, parsed_area_data = await download_and_parse_area_pages(
+                area_parser, teryt, dc_lat, dc_lon, executor
+            )
     except HTTPError as err_msg:
         default_logger.debug(f'[IMPORT] [{teryt}] Error at downloading data: {err_msg}')
         return ImportResult(teryt=teryt, status=ResultStatus.DOWNLOADING_ERROR)
-
-    default_logger.debug(f'[IMPORT] [{teryt}] Parsing data')
-    try:
-        data = area_parser.parse_gml_to_geometries_and_properties(gml_raw)
     except ParserError as err_msg:
         default_logger.debug(f'[IMPORT] [{teryt}] Parsing error: {err_msg}')
         return ImportResult(teryt=teryt, status=ResultStatus.PARSING_ERROR)
-
-    if not data:
+    except AreaDataNotFound:
+        # tiles are computed from area geometry before downloading
+        return area_data_not_found_result(teryt)
+
+    if download_result.not_modified:
+        default_logger.debug(f'[IMPORT] [{teryt}] Data not modified since last import.')
+        return not_modified_import_result(teryt, previous_import, download_result)
+
+    # Servers which ignore conditional requests return the same data with different
+    # response body (e.g. timeStamp and generated gml:id), so parsed buildings are compared
+    download_result.content_hash = await asyncio.to_thread(parsed_area_data.buildings.content_hash)
+    if previous_import is not None and download_result.content_hash == previous_import.content_hash:
+        default_logger.debug(f'[IMPORT] [{teryt}] Data not modified since last import.')
+        return not_modified_import_result(teryt, previous_import, download_result)
+
+    if not parsed_area_data.buildings:
         default_logger.debug(f'[IMPORT] [{teryt}] No data found after parsing')
         return ImportResult(teryt=teryt, status=ResultStatus.EMPTY_DATA_ERROR)
 
+    buildings = parsed_area_data.buildings
+
     # Check for unexpected projection change from server
-    if not any(area_finder.geometry_in_area(building_geom, teryt) for building_geom, _ in data):
+    try:
+        in_area = await asyncio.to_thread(buildings_in_area, teryt, buildings)
+    except AreaDataNotFound:
+        return area_data_not_found_result(teryt)
+
+    if not in_area:
         default_logger.debug(f'[IMPORT] [{teryt}] Parsing error: Building data not in area.')
         return ImportResult(teryt=teryt, status=ResultStatus.PARSING_ERROR)
 
-    buildings_data = []
-    for geometry, raw_properties in data:
-        tags = area_parser.clean_tags(area_parser.parse_properties_to_osm_tags(raw_properties))
-        buildings_data.append({'wkt': geometry.ExportToWkt(), 'tags': tags, 'teryt': teryt})
-    default_logger.debug(f'[IMPORT] [{teryt}] Parsed {len(buildings_data)} buildings.')
+    default_logger.debug(
+        f'[IMPORT] [{teryt}] Parsed {len(buildings)} buildings'
+        f' ({len(buildings.tag_sets)} distinct tag sets, {buildings.nbytes} bytes).'
+    )
 
     # Data check section
-    dc_expected = all_areas_data[teryt]
-    dc_lat = dc_expected.lat
-    dc_lon = dc_expected.lon
-    dc_expected_tags = dc_expected.expected_tags
-
-    dc_result_tags = None
-    if properties := area_finder.find_properties_in_building_data_at(dc_lat, dc_lon, data):
-        dc_result_tags = area_parser.clean_tags(
-            area_parser.parse_properties_to_osm_tags(properties)
-        )
+    dc_result_tags = parsed_area_data.data_check_result_tags
+    change_count: BuildingsChangeCount | None = None
 
     if dc_result_tags == dc_expected_tags:
         status = ResultStatus.SUCCESS
-        default_logger.debug(f'[IMPORT] [{teryt}] Data check passed. Replacing buildings in db.')
-        with contextmanager(get_db)() as session:
-            session.query(Building).filter(Building.teryt == teryt).delete()
-            session.execute(insert(Building).values(geometry=bindparam('wkt')), buildings_data)
-            session.commit()
+        default_logger.debug(f'[IMPORT] [{teryt}] Data check passed. Updating buildings in db.')
+        change_count = await asyncio.to_thread(save_area_buildings, teryt, buildings)
+        default_logger.debug(f'[IMPORT] [{teryt}] Buildings changes: {change_count}.')
     else:
         status = ResultStatus.DATA_CHECK_ERROR
         default_logger.debug(
@@ -125,31 +631,72 @@ async def area_import_attempt(area_parser: BaseAreaParser, teryt: str) -> Import
     return ImportResult(
         teryt=teryt,
         status=status,
-        building_count=len(buildings_data),
-        has_building_type=any(d['tags'].get('building', 'yes') != 'yes' for d in buildings_data),
+        building_count=len(buildings),
+        inserted_count=change_count.inserted if change_count else None,
+        updated_count=change_count.updated if change_count else None,
+        deleted_count=change_count.deleted if change_count else None,
+        # every tag set belongs to at least one building
+        has_building_type=any(tags.get('building', 'yes') != 'yes' for tags in buildings.tag_sets),
         has_building_levels=any(
-            d['tags'].get('building:levels') is not None for d in buildings_data
+            tags.get('building:levels') is not None for tags in buildings.tag_sets
         ),
         has_building_levels_undg=any(
-            d['tags'].get('building:levels:underground') is not None for d in buildings_data
+            tags.get('building:levels:underground') is not None for tags in buildings.tag_sets
         ),
         data_check_lat=dc_lat,
         data_check_lon=dc_lon,
         data_check_expected_tags=dc_expected_tags,
         data_check_result_tags=dc_result_tags,
+        etag=download_result.etag,
+        last_modified=download_result.last_modified,
+        content_hash=download_result.content_hash,
+        parser_fingerprint=parser_fingerprint,
     )
 
 
+class ParsePool:
+    """
+    Process pool which is recreated after a crashed worker (e.g. segfault or OOM kill
+    in GDAL/lxml), otherwise every next parsing would fail with BrokenProcessPool.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._max_workers = max_workers
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def restart(self, broken_executor: Executor) -> None:
+        """
+        :param broken_executor: executor which raised BrokenProcessPool, pool is recreated only
+        once, even if many areas were parsed by the broken executor
+        """
+        if self.executor is not broken_executor:
+            return
+
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = ProcessPoolExecutor(max_workers=self._max_workers)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+
 async def area_import_in_parallel(
     teryt_ids: list[str],
     max_workers: int = 3,
     max_attempts_per_area: int = 5,
     delay_between_attempts: float = 10,
+    max_parse_workers: int | None = None,
 ):
+    """
+    :param max_workers: number of areas downloaded and imported at the same time
+    :param max_parse_workers: number of processes used to parse data,
+    None uses number of CPUs and 0 parses data in the current process
+    """
     default_logger.info(
         f'[IMPORT] Area import data started. Updating data from {len(teryt_ids)} areas.'
     )
 
+    parse_pool = None if max_parse_workers == 0 else ParsePool(max_parse_workers)
+
     semaphore = asyncio.Semaphore(max_workers)
 
     async def import_with_attempts_task(teryt: str) -> ImportResult:
@@ -159,8 +706,18 @@ async def area_import_in_parallel(
                 if attempts == 0:
                     start_at = datetime.datetime.now(datetime.UTC)
 
-                import_result = await area_import_attempt(all_areas[teryt], teryt)
-                if import_result.status == ResultStatus.SUCCESS:
+                executor = parse_pool.executor if parse_pool else None
+                try:
+                    import_result = await area_import_attempt(all_areas[teryt], teryt, executor)
+                except BrokenProcessPool as err_msg:
+                    default_logger.warning(
+                        f'[IMPORT] [{teryt}] Parsing process crashed: {err_msg}.'
+                        ' Restarting parsing processes.'
+                    )
+                    parse_pool.restart(executor)
+                    import_result = ImportResult(teryt=teryt, status=ResultStatus.PARSING_ERROR)
+
+                if import_result.status.is_success():
                     break
 
                 # Stop attempts if it's data improvement and expected data need to be updated
@@ -182,6 +739,9 @@ async def area_import_in_parallel(
             result_status=import_result.status,
             start_at=start_at,
             building_count=import_result.building_count,
+            inserted_count=import_result.inserted_count,
+            updated_count=import_result.updated_count,
+            deleted_count=import_result.deleted_count,
             has_building_type=import_result.has_building_type,
             has_building_levels=import_result.has_building_levels,
             has_building_levels_undg=import_result.has_building_levels_undg,
@@ -189,6 +749,10 @@ async def area_import_in_parallel(
             data_check_lon=import_result.data_check_lon,
             data_check_expected_tags=import_result.data_check_expected_tags,
             data_check_result_tags=import_result.data_check_result_tags,
+            etag=import_result.etag,
+            last_modified=import_result.last_modified,
+            content_hash=import_result.content_hash,
+            parser_fingerprint=import_result.parser_fingerprint,
         )
         with contextmanager(get_db)() as session:
             session.add(area_import)
@@ -196,13 +760,24 @@ async def area_import_in_parallel(
 
         return import_result
 
-    area_results = await asyncio.gather(*[import_with_attempts_task(teryt) for teryt in teryt_ids])
+    try:
+        area_results = await asyncio.gather(
+            *[import_with_attempts_task(teryt) for teryt in teryt_ids]
+        )
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+    with contextmanager(get_db)() as session:
+        refresh_area_imports_snapshots(session)
+        session.commit()
+
     success_areas = 0
     failed_teryt_areas = []
     total_building_count = 0
 
     for area_import_result in area_results:
-        if area_import_result.status == ResultStatus.SUCCESS:
+        if area_import_result.status.is_success():
             success_areas += 1
             total_building_count += area_import_result.building_count
         else:
@@ -240,6 +815,7 @@ if __name__ == '__main__':
         help='Comma-separated list of area teryt IDs',
     )
     parser.add_argument('-mapa', '--max_attempts_per_area', type=int)
+    parser.add_argument('-mpw', '--max_parse_workers', type=int)
 
     args = parser.parse_args()
 
@@ -253,4 +829,7 @@ if __name__ == '__main__':
     if args.max_attempts_per_area:
         kwargs['max_attempts_per_area'] = args.max_attempts_per_area
 
+    if args.max_parse_workers is not None:
+        kwargs['max_parse_workers'] = args.max_parse_workers
+
     asyncio.run(area_import_in_parallel(area_teryt_ids, **kwargs))
@@ -3,14 +3,17 @@ import pytest
 from fastapi.testclient import TestClient
 from httpx import ASGITransport
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from os import path, environ
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+from backend.core.cache import point_cache, tile_cache
 from backend.core.config import settings
 from backend.database.base import Base
-from backend.database.session import get_db
+from backend.database.session import get_async_db, get_db
 from backend.main import app
 
 
@@ -21,6 +24,7 @@ TEST_DB_URL = 'postgresql://{}:{}@{}/{}'.format(
     environ.get('POSTGRES_HOST'),
     TEST_DB_NAME,
 )
+TEST_ASYNC_DB_URL = TEST_DB_URL.replace('postgresql://', 'postgresql+asyncpg://', 1)
 
 transport = ASGITransport(app=app)
 
@@ -75,14 +79,29 @@ def db(setup_db):
     def override_get_db():
         yield db_session
 
+    # sync TestClient runs app in its own event loop, so connections can't be pooled
+    AsyncSession = async_sessionmaker(  # noqa
+        autoflush=False,
+        expire_on_commit=False,
+        bind=create_async_engine(TEST_ASYNC_DB_URL, poolclass=NullPool),
+    )
+
+    async def override_get_async_db():
+        async with AsyncSession() as async_db_session:
+            yield async_db_session
+
     # patching here, because import task use external process
     # it doesn't have access to app overridden instance, so it won't work
     with patch('backend.tasks.import_buildings.get_db', side_effect=lambda: override_get_db()):
         try:
             app.dependency_overrides[get_db] = override_get_db
+            app.dependency_overrides[get_async_db] = override_get_async_db
             yield db_session
 
         finally:
+            # cached responses are valid only for the data of this test
+            point_cache.clear()
+            tile_cache.clear()
             db_session.close()
             Base.metadata.drop_all(bind=engine)
             engine.dispose()
@@ -90,7 +109,7 @@ def db(setup_db):
 
 @pytest.fixture
 def anyio_backend():  # without it tests are executed twice
-    return 'trio'
+    return 'asyncio'
 
 
 @pytest.fixture(scope='session')
@@ -107,6 +126,32 @@ def load_gml(test_data_dir):
     return inner
 
 
+@pytest.fixture(scope='session')
+def mock_stream_response():
+    """
+    Mock of httpx AsyncClient.stream() context manager which returns content in chunks.
+    """
+
+    def inner(
+        status_code: int = 200,
+        content: bytes = b'',
+        chunk_size: int = 1024,
+        headers: dict[str, str] | None = None,
+    ) -> MagicMock:
+        async def aiter_bytes():
+            for i in range(0, len(content), chunk_size):
+                yield content[i : i + chunk_size]
+
+        response = MagicMock(status_code=status_code, headers=headers or {})
+        response.aiter_bytes.side_effect = aiter_bytes
+
+        stream_context = MagicMock()
+        stream_context.__aenter__.return_value = response
+        return stream_context
+
+    return inner
+
+
 @pytest.fixture(scope='session')
 def project_data_dir():
     return settings.DATA_DIR
@@ -4,6 +4,7 @@ import pytest
 
 from backend.areas.parsers import BaseAreaParser
 from backend.areas.config import all_areas
+from backend.crud.area_import import refresh_area_imports_snapshots
 from backend.models.area_import import AreaImport
 from backend.models.area_import import ResultStatus
 
@@ -172,3 +173,49 @@ async def test_list_stable_area_imports_returns_latest_success_or_latest_failed(
     assert teryt_result['0002']['building_count'] == 0
     assert teryt_result['0003']['building_count'] == 3
     assert teryt_result['0004']['building_count'] == 0
+
+
+@pytest.mark.anyio
+@patch.dict(all_areas, {teryt: BaseAreaParser(name=teryt) for teryt in ('0001', '0002')})
+async def test_area_imports_served_from_snapshot_with_etag(async_client, db):
+    params = {
+        'start_at': '2024-01-01T00:00:00',
+        'building_count': 0,
+        'has_building_type': True,
+        'has_building_levels': False,
+        'has_building_levels_undg': False,
+    }
+    db.add(
+        AreaImport(
+            teryt='0001', result_status=ResultStatus.SUCCESS, end_at='2024-01-01T00:01:01', **params
+        )
+    )
+    db.commit()
+    refresh_area_imports_snapshots(db)
+    db.commit()
+
+    # not visible until snapshots are refreshed
+    db.add(
+        AreaImport(
+            teryt='0002', result_status=ResultStatus.SUCCESS, end_at='2024-01-01T00:01:01', **params
+        )
+    )
+    db.commit()
+
+    for endpoint in ('area_imports/latest', 'area_imports/stable'):
+        response = await async_client.get(endpoint)
+        assert response.status_code == 200
+        assert response.headers['cache-control'] == 'no-cache'
+        assert [r['teryt'] for r in response.json()] == ['0001']
+
+        etag = response.headers['etag']
+        response = await async_client.get(endpoint, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['etag'] == etag
+
+    refresh_area_imports_snapshots(db)
+    db.commit()
+
+    response = await async_client.get('area_imports/latest', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [r['teryt'] for r in response.json()] == ['0001', '0002']
@@ -1,5 +1,11 @@
+from typing import Tuple
+
+from unittest.mock import patch
+
 import pytest
 
+from backend.core.cache import invalidate_points, point_cache, point_key
+from backend.core.config import settings
 from backend.models.building import Building
 
 
@@ -37,8 +43,10 @@ async def test_db_simple_building_data(async_client, db):
         'buildings/', params={'lat': lat_search, 'lon': lon_search, 'live': False}
     )
     assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/geo+json'
 
     result = response.json()
+    assert result['type'] == 'FeatureCollection'
     feature = result['features'][0]
     assert feature['geometry']['coordinates'][0][0] == [lon1, lat1]
     assert feature['properties'] == {'building': 'house', 'building:levels': 2}
@@ -86,4 +94,121 @@ async def test_db_no_building_data(async_client, db):
     assert response.status_code == 200
 
     result = response.json()
-    assert len(result['features']) == 0
+    assert result == {'type': 'FeatureCollection', 'features': []}
+
+
+@pytest.mark.anyio
+async def test_db_building_data_cached_until_area_invalidated(async_client, db):
+    lat1, lon1 = 52.2299575, 21.0078368
+    lat2, lon2 = 52.2300253, 21.0081468
+    lat3, lon3 = 52.2301984, 21.0080464
+    lat_search, lon_search = 52.2300062, 21.0079251
+    params = {'lat': lat_search, 'lon': lon_search}
+    hits, misses = point_cache.hits, point_cache.misses
+
+    with patch('backend.api.v1.buildings.area_finder.area_at', return_value=MOCK_AREA_TERYT_VALUE):
+        response = await async_client.get('buildings/', params=params)
+        assert response.json()['features'] == []
+
+        wkt_polygon = f'POLYGON(({lon1} {lat1}, {lon2} {lat2}, {lon3} {lat3}, {lon1} {lat1}))'
+        db.add(Building(geometry=wkt_polygon, tags={'building': 'house'}, teryt='123456'))
+        db.commit()
+
+        response = await async_client.get('buildings/', params=params)
+        assert response.json()['features'] == []  # cached negative result
+
+        invalidate_points(MOCK_AREA_TERYT_VALUE)
+        response = await async_client.get('buildings/', params=params)
+        assert len(response.json()['features']) == 1
+
+    stats = point_cache.stats()
+    assert (stats['hits'] - hits, stats['misses'] - misses) == (1, 2)
+    assert stats['size'] == 1
+
+    response = await async_client.get('buildings/cache')
+    assert response.status_code == 200
+    assert response.json()['points']['hits'] == stats['hits']
+
+
+@pytest.mark.anyio
+async def test_db_batch_building_data(async_client, db):
+    lat1, lon1 = 52.2299575, 21.0078368
+    lat2, lon2 = 52.2300253, 21.0081468
+    lat3, lon3 = 52.2301984, 21.0080464
+    lat_search, lon_search = 52.2300062, 21.0079251
+
+    wkt_polygon = f'POLYGON(({lon1} {lat1}, {lon2} {lat2}, {lon3} {lat3}, {lon1} {lat1}))'
+
+    db.add(Building(geometry=wkt_polygon, tags={'building': 'house'}, teryt='123456'))
+    db.commit()
+
+    points = [
+        {'lat': 50.0, 'lon': 20.0},
+        {'lat': lat_search, 'lon': lon_search},
+        {'lat': 50.0, 'lon': 20.0},
+        {'lat': lat_search, 'lon': lon_search},
+    ]
+    response = await async_client.post('buildings/batch', json=points)
+    assert response.status_code == 200
+
+    result = response.json()
+    assert result['type'] == 'FeatureCollection'
+    assert [feature['id'] for feature in result['features']] == [1, 3]
+    assert result['features'][0]['geometry']['coordinates'][0][0] == [lon1, lat1]
+    assert result['features'][0]['properties'] == {'building': 'house'}
+
+
+def test_batch_invalid_points(client):
+    response = client.post('buildings/batch', json=[{'lat': 91.0, 'lon': 50.0}])
+    assert response.status_code == 422
+
+    response = client.post('buildings/batch', json=[])
+    assert response.status_code == 422
+
+    points = [{'lat': 50.0, 'lon': 20.0}] * (settings.BUILDINGS_BATCH_MAX_POINTS + 1)
+    response = client.post('buildings/batch', json=points)
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_db_building_data_invalidated_during_query_not_cached(async_client, db):
+    params = {'lat': 52.2300062, 'lon': 21.0079251}
+
+    async def get_building_and_invalidate(*args) -> Tuple[str, str | None]:
+        invalidate_points(MOCK_AREA_TERYT_VALUE)  # area imported while the query was running
+        return '{"type":"FeatureCollection","features":[]}', None
+
+    with (
+        patch('backend.api.v1.buildings.area_finder.area_at', return_value=MOCK_AREA_TERYT_VALUE),
+        patch(
+            'backend.api.v1.buildings.building.get_building_at',
+            side_effect=get_building_and_invalidate,
+        ),
+    ):
+        response = await async_client.get('buildings/', params=params)
+
+    assert response.status_code == 200
+    assert point_cache.get(point_key(params['lat'], params['lon'])) is None
+
+
+@pytest.mark.anyio
+async def test_db_building_of_neighbouring_area_invalidated_with_its_area(async_client, db):
+    lat1, lon1 = 52.2299575, 21.0078368
+    lat2, lon2 = 52.2300253, 21.0081468
+    lat3, lon3 = 52.2301984, 21.0080464
+    params = {'lat': 52.2300062, 'lon': 21.0079251}
+    wkt_polygon = f'POLYGON(({lon1} {lat1}, {lon2} {lat2}, {lon3} {lat3}, {lon1} {lat1}))'
+    db.add(Building(geometry=wkt_polygon, tags={'building': 'house'}, teryt='654321'))
+    db.commit()
+
+    with patch('backend.api.v1.buildings.area_finder.area_at', return_value=MOCK_AREA_TERYT_VALUE):
+        response = await async_client.get('buildings/', params=params)
+        assert len(response.json()['features']) == 1
+
+        # building at the border was removed by import of the neighbouring area
+        db.query(Building).delete()
+        db.commit()
+        invalidate_points('654321')
+
+        response = await async_client.get('buildings/', params=params)
+        assert response.json()['features'] == []
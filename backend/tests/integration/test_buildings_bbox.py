@@ -0,0 +1,62 @@
+import pytest
+
+from backend.models.building import Building
+
+
+def square_wkt(lon: float, lat: float, size: float = 0.0001) -> str:
+    return (
+        f'POLYGON(({lon} {lat}, {lon + size} {lat}, {lon + size} {lat + size},'
+        f' {lon} {lat + size}, {lon} {lat}))'
+    )
+
+
+BBOX = {'minlon': 21.0, 'minlat': 52.0, 'maxlon': 21.1, 'maxlat': 52.1}
+
+
+@pytest.mark.parametrize(
+    'params',
+    [
+        {'minlon': 21.1, 'minlat': 52.0, 'maxlon': 21.0, 'maxlat': 52.1},
+        {'minlon': 21.0, 'minlat': 52.1, 'maxlon': 21.1, 'maxlat': 52.0},
+        {'minlon': 21.0, 'minlat': 52.0, 'maxlon': 181.0, 'maxlat': 52.1},
+        {'minlon': 21.0, 'minlat': 52.0, 'maxlon': 21.1},
+        BBOX | {'limit': 0},
+    ],
+)
+def test_bbox_invalid_params(client, params):
+    response = client.get('buildings/bbox', params=params)
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_db_bbox_building_data_paginated(async_client, db):
+    buildings = [
+        Building(geometry=square_wkt(21.01 + i * 0.01, 52.05), tags={'building': str(i)}, teryt='1')
+        for i in range(5)
+    ]
+    buildings.append(Building(geometry=square_wkt(22.0, 52.05), tags={'building': 'no'}, teryt='1'))
+    db.add_all(buildings)
+    db.commit()
+
+    response = await async_client.get('buildings/bbox', params=BBOX | {'limit': 3})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/geo+json'
+
+    result = response.json()
+    assert result['type'] == 'FeatureCollection'
+    assert [f['properties']['building'] for f in result['features']] == ['0', '1', '2']
+    assert result['next_after'] == result['features'][-1]['id']
+
+    response = await async_client.get(
+        'buildings/bbox', params=BBOX | {'limit': 3, 'after': result['next_after']}
+    )
+    result = response.json()
+    assert [f['properties']['building'] for f in result['features']] == ['3', '4']
+    assert result['next_after'] is None
+
+
+@pytest.mark.anyio
+async def test_db_bbox_no_building_data(async_client, db):
+    response = await async_client.get('buildings/bbox', params=BBOX)
+    assert response.status_code == 200
+    assert response.json() == {'type': 'FeatureCollection', 'features': [], 'next_after': None}
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+import pytest
+
+from backend.core.cache import invalidate_tiles, tile_cache, tile_envelope
+from backend.models.building import Building
+
+
+TILE = (16, 36590, 21569)  # Warsaw
+
+
+def tile_building_wkt(z: int, x: int, y: int) -> str:
+    min_lon, max_lon, min_lat, max_lat = tile_envelope(z, x, y)
+    lon = min_lon + (max_lon - min_lon) / 4
+    lat = min_lat + (max_lat - min_lat) / 4
+    size = (max_lon - min_lon) / 4
+    return (
+        f'POLYGON(({lon} {lat}, {lon + size} {lat}, {lon + size} {lat + size},'
+        f' {lon} {lat + size}, {lon} {lat}))'
+    )
+
+
+@pytest.mark.parametrize(
+    'path',
+    [
+        'buildings/tiles/1/0/0.mvt',  # below min zoom
+        'buildings/tiles/25/0/0.mvt',  # above max zoom
+        'buildings/tiles/16/65536/0.mvt',
+        'buildings/tiles/16/0/-1.mvt',
+    ],
+)
+def test_tile_invalid_params(client, path):
+    response = client.get(path)
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_db_tile_building_data(async_client, db):
+    db.add(Building(geometry=tile_building_wkt(*TILE), tags={'building': 'house'}, teryt='1'))
+    db.commit()
+
+    z, x, y = TILE
+    response = await async_client.get(f'buildings/tiles/{z}/{x}/{y}.mvt')
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/vnd.mapbox-vector-tile'
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert b'buildings' in response.content  # layer name
+    assert b'house' in response.content
+    assert tile_cache.get((z, x, y)) is not None
+
+
+@pytest.mark.anyio
+async def test_db_tile_cached_until_invalidated(async_client, db):
+    z, x, y = TILE
+    response = await async_client.get(f'buildings/tiles/{z}/{x}/{y}.mvt')
+    assert response.status_code == 200
+    assert response.content == b''
+
+    db.add(Building(geometry=tile_building_wkt(*TILE), tags={'building': 'house'}, teryt='1'))
+    db.commit()
+
+    response = await async_client.get(f'buildings/tiles/{z}/{x}/{y}.mvt')
+    assert response.content == b''
+
+    invalidate_tiles(tile_envelope(z, x, y))
+    response = await async_client.get(f'buildings/tiles/{z}/{x}/{y}.mvt')
+    assert b'house' in response.content
+
+
+@pytest.mark.anyio
+async def test_db_tile_invalidated_during_query_not_cached(async_client, db):
+    z, x, y = TILE
+
+    async def get_tile_and_invalidate(*args) -> bytes:
+        invalidate_tiles(tile_envelope(z, x, y))  # area imported while the tile was built
+        return b''
+
+    with patch(
+        'backend.api.v1.buildings.building.get_buildings_tile',
+        side_effect=get_tile_and_invalidate,
+    ):
+        response = await async_client.get(f'buildings/tiles/{z}/{x}/{y}.mvt')
+
+    assert response.status_code == 200
+    assert tile_cache.get((z, x, y)) is None
+
+
+@pytest.mark.anyio
+async def test_db_tile_not_compressed(async_client, db):
+    z, x, y = TILE
+    response = await async_client.get(
+        f'buildings/tiles/{z}/{x}/{y}.mvt', headers={'Accept-Encoding': 'identity'}
+    )
+    assert response.status_code == 200
+    assert 'content-encoding' not in response.headers
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.content == b''
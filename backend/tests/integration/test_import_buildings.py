@@ -1,19 +1,20 @@
-import asyncio
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
+from backend.areas.config import all_areas
 from backend.areas.data.expected_building import all_areas_data, AreaExpectedBuildingData
 from backend.areas.parsers import WarszawaAreaParser
+from backend.exceptions import AreaDataNotFound
 from backend.models.building import Building
 from backend.models.area_import import AreaImport, ResultStatus
 from backend.tasks.import_buildings import area_import_in_parallel
 
 
 @pytest.mark.anyio
-async def test_area_import_in_parallel_success(db, load_gml):
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.text = load_gml('warszawa', 'gml_multiple_polygons.xml')
+async def test_area_import_in_parallel_success(db, load_gml, mock_stream_response):
+    mock_response = mock_stream_response(
+        content=load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8')
+    )
 
     patched_all_areas_data = {
         '1465': AreaExpectedBuildingData(
@@ -25,18 +26,20 @@ async def test_area_import_in_parallel_success(db, load_gml):
         )
     }
 
+    # configured Warszawa parser splits area into tiles, area data isn't loaded in tests
+    area_parser = WarszawaAreaParser(name='test')
+
     with (
         patch(
-            'backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response
-        ) as mock_get,
+            'backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response
+        ) as mock_stream,
         patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
         patch.dict(all_areas_data, patched_all_areas_data, clear=True),
+        patch.dict(all_areas, {'1465': area_parser}),
     ):
-        area_parser = WarszawaAreaParser(name='test')
-
-        asyncio.run(area_import_in_parallel(teryt_ids=['1465']))
+        await area_import_in_parallel(teryt_ids=['1465'])
 
-        mock_get.assert_called_once_with(area_parser.build_buildings_url())
+        mock_stream.assert_called_once_with('GET', area_parser.build_buildings_url(), headers={})
 
     area_import = db.query(AreaImport).first()
     expected_data = patched_all_areas_data['1465']
@@ -56,10 +59,12 @@ async def test_area_import_in_parallel_success(db, load_gml):
 
 
 @pytest.mark.anyio
-async def test_area_import_in_parallel_data_check_failed_building_not_found(db, load_gml):
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.text = load_gml('warszawa', 'gml_multiple_polygons.xml')
+async def test_area_import_in_parallel_data_check_failed_building_not_found(
+    db, load_gml, mock_stream_response
+):
+    mock_response = mock_stream_response(
+        content=load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8')
+    )
 
     patched_all_areas_data = {
         '1465': AreaExpectedBuildingData(
@@ -71,17 +76,19 @@ async def test_area_import_in_parallel_data_check_failed_building_not_found(db,
         )
     }
 
+    area_parser = WarszawaAreaParser(name='test')
+
     with (
         patch(
-            'backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response
-        ) as mock_get,
+            'backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response
+        ) as mock_stream,
         patch.dict(all_areas_data, patched_all_areas_data, clear=True),
         patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
+        patch.dict(all_areas, {'1465': area_parser}),
     ):
-        area_parser = WarszawaAreaParser(name='test')
-        asyncio.run(area_import_in_parallel(teryt_ids=['1465'], delay_between_attempts=0.0001))
-        mock_get.assert_called_with(area_parser.build_buildings_url())
-        assert mock_get.call_count == 5
+        await area_import_in_parallel(teryt_ids=['1465'], delay_between_attempts=0.0001)
+        mock_stream.assert_called_with('GET', area_parser.build_buildings_url(), headers={})
+        assert mock_stream.call_count == 5
 
     area_import = db.query(AreaImport).first()
     expected_data = patched_all_areas_data['1465']
@@ -98,3 +105,23 @@ async def test_area_import_in_parallel_data_check_failed_building_not_found(db,
     assert not area_import.data_check_has_expected_tags
     assert area_import.building_count == 10
     assert db.query(Building).count() == 0
+
+
+@pytest.mark.anyio
+async def test_area_import_in_parallel_area_data_not_found(db):
+    area_parser = WarszawaAreaParser(name='test', tile_size=0.1, page_size=10)
+
+    with (
+        patch('backend.tasks.import_buildings.AsyncClient.stream') as mock_stream,
+        patch(
+            'backend.tasks.import_buildings.area_finder.area_tiles', side_effect=AreaDataNotFound
+        ),
+        patch.dict(all_areas, {'1465': area_parser}),
+    ):
+        await area_import_in_parallel(teryt_ids=['1465'], delay_between_attempts=0.0001)
+        mock_stream.assert_not_called()
+
+    area_import = db.query(AreaImport).first()
+    assert area_import.teryt == '1465'
+    assert area_import.result_status == ResultStatus.PARSING_ERROR
+    assert db.query(Building).count() == 0
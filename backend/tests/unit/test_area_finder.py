@@ -0,0 +1,133 @@
+import json
+
+from unittest.mock import patch
+
+import pytest
+
+from osgeo import ogr
+
+from backend.areas.finder import (
+    AREA_CHECK_SIMPLIFY_TOLERANCE,
+    AreaEnvelopeIndex,
+    AreaFinder,
+    envelope_grid,
+)
+from backend.exceptions import AreaDataNotFound
+
+
+def square(min_x: float, min_y: float, size: float) -> ogr.Geometry:
+    coordinates = [
+        [min_x, min_y],
+        [min_x + size, min_y],
+        [min_x + size, min_y + size],
+        [min_x, min_y + size],
+        [min_x, min_y],
+    ]
+    geometry = {'type': 'Polygon', 'coordinates': [coordinates]}
+    return ogr.CreateGeometryFromJson(json.dumps(geometry))
+
+
+def test_area_envelope_index_candidates_at():
+    index = AreaEnvelopeIndex.from_geometries(
+        {
+            '0001': square(14, 49, 2),
+            '0002': square(15, 50, 2),
+            '0003': square(20, 52, 1),
+        }
+    )
+
+    assert index.candidates_at(14.5, 49.5) == ['0001']
+    assert index.candidates_at(15.5, 50.5) == ['0001', '0002']
+    assert index.candidates_at(21, 53) == ['0003']  # envelope boundary
+    assert index.candidates_at(18, 50) == []
+
+
+def test_area_envelope_index_empty():
+    assert AreaEnvelopeIndex.from_geometries({}).candidates_at(14.5, 49.5) == []
+
+
+def test_area_envelope_index_envelope_contains():
+    index = AreaEnvelopeIndex.from_geometries({'0001': square(14, 49, 2)})
+
+    assert index.envelope_contains('0001', (14.5, 15, 49.5, 50))
+    assert not index.envelope_contains('0001', (15.5, 16.5, 49.5, 50))
+    assert not index.envelope_contains('0002', (14.5, 15, 49.5, 50))
+
+
+def test_geometry_in_area_rejects_geometry_outside_envelope():
+    area_finder = AreaFinder()
+    area_finder._county_geoms = {'0001': square(14, 49, 2)}
+    area_finder._county_index = AreaEnvelopeIndex.from_geometries(area_finder._county_geoms)
+
+    assert area_finder.geometry_in_area(square(14.5, 49.5, 0.1), '0001')
+    with patch.object(ogr.Geometry, 'Within') as mock_within:
+        assert not area_finder.geometry_in_area(square(500_000, 300_000, 10), '0001')
+        mock_within.assert_not_called()
+
+    with pytest.raises(AreaDataNotFound):
+        area_finder.geometry_in_area(square(14.5, 49.5, 0.1), '0002')
+
+
+def test_geometry_in_area_uses_cached_simplified_area():
+    area_finder = AreaFinder()
+    area_finder._county_geoms = {'0001': square(14, 49, 2)}
+    area_finder._county_index = AreaEnvelopeIndex.from_geometries(area_finder._county_geoms)
+
+    with patch.object(
+        ogr.Geometry, 'SimplifyPreserveTopology', return_value=square(14, 49, 2)
+    ) as mock_simplify:
+        assert area_finder.geometry_in_area(square(14.5, 49.5, 0.1), '0001')
+        assert area_finder.geometry_in_area(square(15.5, 50.5, 0.1), '0001')
+
+    mock_simplify.assert_called_once_with(AREA_CHECK_SIMPLIFY_TOLERANCE)
+
+
+def test_area_envelope_index_envelope():
+    index = AreaEnvelopeIndex.from_geometries({'0001': square(14, 49, 2)})
+
+    assert index.envelope('0001') == (14, 16, 49, 51)
+    assert index.envelope('0002') is None
+
+
+def point(lat: float, lon: float) -> ogr.Geometry:
+    geometry = ogr.Geometry(ogr.wkbPoint)
+    geometry.AddPoint(lon, lat)
+    return geometry
+
+
+def test_building_contains_point():
+    building = square(21.0, 52.0, 0.001)
+
+    assert AreaFinder.building_contains_point(building, point(52.0005, 21.0005))
+    assert not AreaFinder.building_contains_point(building, point(52.0005, 21.005))
+    with patch.object(ogr.Geometry, 'Contains') as mock_contains:
+        assert not AreaFinder.building_contains_point(building, point(50.0, 20.0))
+        mock_contains.assert_not_called()
+
+
+def test_envelope_grid():
+    assert envelope_grid((14, 15, 49, 50), 2) == [(14, 15, 49, 50)]
+    assert envelope_grid((14, 15.5, 49, 50), 1) == [(14, 15, 49, 50), (15, 15.5, 49, 50)]
+    assert envelope_grid((14, 16, 49, 51), 1) == [
+        (14, 15, 49, 50),
+        (15, 16, 49, 50),
+        (14, 15, 50, 51),
+        (15, 16, 50, 51),
+    ]
+
+
+def test_area_tiles_skips_tiles_outside_area():
+    triangle = ogr.CreateGeometryFromJson(
+        json.dumps({'type': 'Polygon', 'coordinates': [[[14, 49], [16, 49], [14, 50.9], [14, 49]]]})
+    )
+    area_finder = AreaFinder()
+    area_finder._county_geoms = {'0001': triangle}
+    area_finder._county_index = AreaEnvelopeIndex.from_geometries(area_finder._county_geoms)
+
+    assert area_finder.area_tiles('0001', 1) == [
+        (14, 15, 49, 50),
+        (15, 16, 49, 50),
+        (14, 15, 50, 50.9),
+    ]
+    with pytest.raises(AreaDataNotFound):
+        area_finder.area_tiles('0002', 1)
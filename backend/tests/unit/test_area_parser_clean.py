@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 
 from backend.areas.parsers import WroclawAreaParser
@@ -26,3 +28,61 @@ class TestBuildingIncorrectLevelsValues:
         }
         cleaned_tags = area.clean_tags(osm_tags)
         assert cleaned_tags == {'building': 'office'}
+
+
+class TestOsmTagsConverter:
+    def test_converted_once_per_distinct_tag_properties(self):
+        to_osm_tags = area.osm_tags_converter()
+
+        tags1 = to_osm_tags({'RODZAJ': 'b', 'KONDYGNACJE_NADZIEMNE': '3', 'ID_BUDYNKU': '1'})
+        tags2 = to_osm_tags({'RODZAJ': 'b', 'KONDYGNACJE_NADZIEMNE': '3', 'ID_BUDYNKU': '2'})
+        tags3 = to_osm_tags({'RODZAJ': 'b', 'KONDYGNACJE_NADZIEMNE': '4', 'ID_BUDYNKU': '3'})
+
+        assert tags1 == {'building': 'office', 'building:levels': 3}
+        assert tags2 is tags1
+        assert tags3 == {'building': 'office', 'building:levels': 4}
+
+    def test_missing_property_differs_from_empty_property(self):
+        to_osm_tags = area.osm_tags_converter()
+
+        tags1 = to_osm_tags({'RODZAJ': 'm'})
+        tags2 = to_osm_tags({'RODZAJ': 'm', 'KONDYGNACJE_NADZIEMNE': None})
+
+        assert tags1 == {'building': 'residential'}
+        assert tags2 == {'building': 'residential'}
+        assert tags2 is not tags1
+
+
+class TestParserFingerprint:
+    def test_fingerprint_is_stable(self):
+        assert area.fingerprint() == WroclawAreaParser('test_area', 'test_url_code').fingerprint()
+
+    def test_fingerprint_depends_on_parser_config_and_version(self):
+        fingerprint = area.fingerprint()
+
+        assert fingerprint != WroclawAreaParser('test_area', 'other_code').fingerprint()
+        with patch('backend.areas.parsers.PARSER_VERSION', 0):
+            assert fingerprint != area.fingerprint()
+
+
+class TestPagingUrls:
+    def test_tile_size_requires_page_size(self):
+        with pytest.raises(ValueError):
+            WroclawAreaParser('test_area', 'test_url_code', tile_size=0.1)
+
+    def test_tile_page_url(self):
+        tiled_area = WroclawAreaParser('test_area', 'test_url_code', page_size=10, tile_size=0.1)
+        tile_url = tiled_area.build_buildings_bbox_url((17.0, 17.1, 51.0, 51.1))
+
+        page_url = tiled_area.build_buildings_page_url(20, tile_url)
+
+        assert page_url.startswith(tiled_area.build_buildings_url().split('?')[0])
+        assert 'BBOX=51.0%2C17.0%2C51.1%2C17.1%2Curn' in page_url
+        assert page_url.endswith('count=10&startIndex=20')
+
+    def test_page_url_sorted_only_by_configured_property(self):
+        sorted_area = WroclawAreaParser(
+            'test_area', 'test_url_code', page_size=10, page_sort_by='ID_BUDYNKU'
+        )
+
+        assert sorted_area.build_buildings_page_url(0).endswith('startIndex=0&sortBy=ID_BUDYNKU')
@@ -0,0 +1,60 @@
+import mmap
+
+import numpy as np
+import pytest
+
+from osgeo import ogr
+
+from backend.areas.store import AreaStore
+from backend.exceptions import AreaStoreError
+from backend.tests.unit.test_area_finder import square
+
+
+@pytest.fixture
+def geometries():
+    return {'0001': square(14, 49, 2), '0002': square(15, 50, 2), '0201011': square(20, 52, 1)}
+
+
+def test_area_store_round_trip(tmp_path, geometries):
+    store_file = tmp_path / 'areas.bin'
+    store_file.write_bytes(AreaStore.dumps(geometries))
+
+    store = AreaStore.open(str(store_file))
+
+    assert isinstance(store._buffer, mmap.mmap)
+    assert store.teryts == list(geometries.keys())
+    assert '0002' in store and '0003' not in store
+    np.testing.assert_array_equal(
+        store.envelopes, [geometry.GetEnvelope() for geometry in geometries.values()]
+    )
+    for teryt, geometry in geometries.items():
+        assert store[teryt].ExportToWkb(ogr.wkbNDR) == geometry.ExportToWkb(ogr.wkbNDR)
+
+
+def test_area_store_creates_geometries_lazily(geometries):
+    store = AreaStore(AreaStore.dumps(geometries))
+
+    assert store._geometries == {}
+    assert store['0001'] is store['0001']
+    assert list(store._geometries.keys()) == ['0001']
+
+
+def test_area_store_empty():
+    store = AreaStore(AreaStore.dumps({}))
+
+    assert len(store) == 0
+    assert store.envelopes.shape == (0, 4)
+
+
+@pytest.mark.parametrize(
+    'data',
+    [b'', b'invalid', b'EGIBAREA\x01\x00\x00\x00\x05\x00\x00\x00', b'EGIBAREA' + b'\x00' * 8],
+)
+def test_area_store_invalid_data(data):
+    with pytest.raises(AreaStoreError):
+        AreaStore(data)
+
+
+def test_area_store_truncated_data(geometries):
+    with pytest.raises(AreaStoreError):
+        AreaStore(AreaStore.dumps(geometries)[:-10])
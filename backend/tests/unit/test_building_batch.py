@@ -0,0 +1,113 @@
+import pickle
+
+from backend.areas.batch import BuildingBatch
+
+
+def test_building_batch_empty():
+    batch = BuildingBatch()
+
+    assert not batch
+    assert len(batch) == 0
+    assert list(batch) == []
+    assert batch.tag_sets == []
+
+
+def test_building_batch_append():
+    batch = BuildingBatch()
+    batch.append(b'\x01\x02', {'building': 'house'})
+    batch.append(b'\x03', {'building': 'yes'})
+    batch.append(b'\x04\x05\x06', {'building': 'house'})
+
+    assert batch
+    assert len(batch) == 3
+    assert list(batch) == [
+        (b'\x01\x02', {'building': 'house'}),
+        (b'\x03', {'building': 'yes'}),
+        (b'\x04\x05\x06', {'building': 'house'}),
+    ]
+    assert list(batch.wkbs()) == [b'\x01\x02', b'\x03', b'\x04\x05\x06']
+    assert batch.wkb(2) == b'\x04\x05\x06'
+    assert batch.tags(1) == {'building': 'yes'}
+
+
+def test_building_batch_shares_tag_sets():
+    batch = BuildingBatch()
+    batch.append(b'\x01', {'building': 'house', 'building:levels': 2})
+    batch.append(b'\x02', {'building:levels': 2, 'building': 'house'})
+
+    assert batch.tag_sets == [{'building': 'house', 'building:levels': 2}]
+    assert batch.tags(0) is batch.tags(1)
+
+
+def test_building_batch_pickle():
+    batch = BuildingBatch()
+    batch.append(b'\x01\x02', {'building': 'house'})
+    batch.append(b'\x03', {'building': 'house'})
+
+    unpickled_batch = pickle.loads(pickle.dumps(batch))
+
+    assert list(unpickled_batch) == list(batch)
+    assert unpickled_batch.tags(0) is unpickled_batch.tags(1)
+
+
+def test_building_batch_append_after_pickle():
+    batch = pickle.loads(pickle.dumps(BuildingBatch()))
+    batch.append(b'\x01', {'building': 'house'})
+    batch.append(b'\x02', {'building': 'house'})
+
+    assert batch.tag_sets == [{'building': 'house'}]
+
+
+def test_building_batch_extend():
+    batch = BuildingBatch()
+    batch.append(b'\x01\x02', {'building': 'house'})
+    other_batch = BuildingBatch()
+    other_batch.append(b'\x03', {'building': 'yes'})
+    other_batch.append(b'\x04\x05', {'building': 'house'})
+
+    batch.extend(pickle.loads(pickle.dumps(other_batch)))
+
+    assert list(batch) == [
+        (b'\x01\x02', {'building': 'house'}),
+        (b'\x03', {'building': 'yes'}),
+        (b'\x04\x05', {'building': 'house'}),
+    ]
+    assert batch.tag_sets == [{'building': 'house'}, {'building': 'yes'}]
+    assert batch.tags(0) is batch.tags(2)
+
+
+def test_building_batch_extend_skips_known_geometries():
+    batch = BuildingBatch()
+    wkb_keys = set()
+    tile_batch = BuildingBatch()
+    tile_batch.append(b'\x01', {'building': 'house'})
+    tile_batch.append(b'\x02', {'building': 'yes'})
+    batch.extend(tile_batch, wkb_keys)
+
+    next_tile_batch = BuildingBatch()
+    next_tile_batch.append(b'\x02', {'building': 'yes'})  # at the edge of both tiles
+    next_tile_batch.append(b'\x03', {'building': 'yes'})
+    next_tile_batch.append(b'\x03', {'building': 'yes'})  # duplicated by the server
+    batch.extend(next_tile_batch, wkb_keys)
+
+    assert list(batch.wkbs()) == [b'\x01', b'\x02', b'\x03', b'\x03']
+    assert wkb_keys == {BuildingBatch.wkb_key(wkb) for wkb in (b'\x01', b'\x02', b'\x03')}
+
+
+def test_building_batch_content_hash():
+    def batch_of(*buildings):
+        batch = BuildingBatch()
+        for wkb, tags in buildings:
+            batch.append(wkb, dict(tags))
+
+        return batch
+
+    house, shed = (b'\x01\x02', {'building': 'house'}), (b'\x03', {'building': 'shed'})
+    content_hash = batch_of(house, shed).content_hash()
+
+    assert content_hash == batch_of(house, shed).content_hash()
+    assert content_hash == pickle.loads(pickle.dumps(batch_of(house, shed))).content_hash()
+    assert content_hash != batch_of(house).content_hash()
+    assert content_hash != batch_of(house, (b'\x03', {'building': 'house'})).content_hash()
+    # buffers alone are the same, buildings are split differently
+    assert content_hash != batch_of((b'\x01', house[1]), (b'\x02\x03', shed[1])).content_hash()
@@ -0,0 +1,141 @@
+import csv
+import json
+import struct
+
+import pytest
+
+from sqlalchemy import func, select, text
+
+from backend.crud.building import (
+    _buildings_to_csv_lines,
+    _IteratorFile,
+    BuildingsChangeCount,
+    building_content_hash,
+    copy_buildings,
+    insert_buildings,
+    replace_area_buildings,
+    update_area_buildings,
+    wkb_to_hex_ewkb,
+)
+from backend.models.building import Building
+
+# POLYGON ((21 52, 21.1 52, 21.1 52.1, 21 52))
+POLYGON_WKB = struct.pack('<BIII8d', 1, 3, 1, 4, 21, 52, 21.1, 52, 21.1, 52.1, 21, 52)
+# POLYGON ((22 52, 22.1 52, 22.1 52.1, 22 52))
+OTHER_POLYGON_WKB = struct.pack('<BIII8d', 1, 3, 1, 4, 22, 52, 22.1, 52, 22.1, 52.1, 22, 52)
+
+
+def test_wkb_to_hex_ewkb():
+    ewkb = bytes.fromhex(wkb_to_hex_ewkb(POLYGON_WKB))
+
+    assert struct.unpack_from('<BII', ewkb) == (1, 3 | 0x20000000, 4326)
+    assert ewkb[9:] == POLYGON_WKB[5:]
+
+
+def test_buildings_to_csv_lines_escapes_tags():
+    tags = {'building': 'house', 'addr:street': 'ul. "Nowa", 1\\2'}
+    lines = list(_buildings_to_csv_lines([(POLYGON_WKB, tags, '1465')]))
+
+    assert len(lines) == 1
+    assert next(csv.reader(lines)) == [
+        wkb_to_hex_ewkb(POLYGON_WKB),
+        json.dumps(tags),
+        '1465',
+        f'\\x{building_content_hash(POLYGON_WKB, tags).hex()}',
+    ]
+
+
+def test_building_content_hash():
+    tags = {'building': 'house', 'building:levels': 2}
+    content_hash = building_content_hash(POLYGON_WKB, tags)
+
+    assert content_hash == building_content_hash(POLYGON_WKB, dict(reversed(tags.items())))
+    assert content_hash != building_content_hash(POLYGON_WKB, {'building': 'house'})
+    assert content_hash != building_content_hash(OTHER_POLYGON_WKB, tags)
+
+
+def test_iterator_file_read():
+    iterator_file = _IteratorFile(iter(['ab', 'cde', 'f']))
+
+    assert iterator_file.read(4) == 'abcd'
+    assert iterator_file.read(4) == 'ef'
+    assert iterator_file.read(4) == ''
+
+
+@pytest.mark.parametrize('load_buildings', [copy_buildings, insert_buildings])
+def test_load_buildings(db, load_buildings):
+    tags = {'building': 'house', 'building:levels': 2}
+
+    load_buildings(db, iter([(POLYGON_WKB, tags, '1465'), (POLYGON_WKB, tags, '1465')]))
+    db.commit()
+
+    buildings = db.execute(
+        select(func.ST_AsText(Building.geometry), func.ST_SRID(Building.geometry), Building.tags)
+    ).all()
+    assert len(buildings) == 2
+    assert buildings[0] == ('POLYGON((21 52,21.1 52,21.1 52.1,21 52))', 4326, tags)
+
+
+@pytest.mark.parametrize('use_copy', [True, False])
+def test_replace_area_buildings(db, use_copy):
+    other_area_tags = {'building': 'yes'}
+    tags = {'building': 'house', 'building:levels': 2}
+
+    insert_buildings(db, [(POLYGON_WKB, other_area_tags, '1261')])
+    insert_buildings(db, [(POLYGON_WKB, other_area_tags, '1465')])  # default partition
+    db.commit()
+
+    for _ in range(2):
+        replace_area_buildings(
+            db, '1465', iter([(POLYGON_WKB, tags, '1465')] * 3), use_copy=use_copy
+        )
+        db.commit()
+
+    area_tags = db.execute(select(Building.tags).where(Building.teryt == '1465')).scalars().all()
+    assert area_tags == [tags] * 3
+    assert db.execute(select(func.count()).select_from(text('buildings_1465'))).scalar() == 3
+    assert (
+        db.execute(
+            text("SELECT relpersistence FROM pg_class WHERE relname = 'buildings_1465'")
+        ).scalar()
+        == 'p'
+    )
+    assert db.execute(select(Building.tags).where(Building.teryt == '1261')).scalar() == (
+        other_area_tags
+    )
+
+
+@pytest.mark.parametrize('use_copy', [True, False])
+def test_update_area_buildings_diff(db, use_copy):
+    house = {'building': 'house'}
+    garage = {'building': 'garage'}
+
+    change_count = update_area_buildings(
+        db, '1465', [(POLYGON_WKB, house, '1465'), (POLYGON_WKB, house, '1465')], use_copy
+    )
+    db.commit()
+    assert change_count == BuildingsChangeCount(inserted=2)
+    unchanged_id, updated_id = db.execute(select(Building.id).order_by(Building.id)).scalars()
+
+    change_count = update_area_buildings(
+        db,
+        '1465',
+        [
+            (POLYGON_WKB, house, '1465'),
+            (POLYGON_WKB, garage, '1465'),
+            (OTHER_POLYGON_WKB, house, '1465'),
+        ],
+        use_copy,
+    )
+    db.commit()
+
+    assert change_count == BuildingsChangeCount(inserted=1, updated=1, deleted=0)
+    buildings = db.execute(select(Building.id, Building.tags).order_by(Building.id)).all()
+    assert buildings[:2] == [(unchanged_id, house), (updated_id, garage)]
+    assert buildings[2][1] == house
+
+    change_count = update_area_buildings(db, '1465', [(POLYGON_WKB, house, '1465')], use_copy)
+    db.commit()
+
+    assert change_count == BuildingsChangeCount(inserted=0, updated=0, deleted=2)
+    assert db.execute(select(Building.id)).scalars().all() == [unchanged_id]
@@ -0,0 +1,129 @@
+from unittest.mock import patch
+
+import pytest
+
+from backend.core.cache import (
+    LRUCache,
+    invalidate_points,
+    invalidate_tiles,
+    point_key,
+    point_scope,
+    tile_envelope,
+)
+
+
+def test_tile_envelope():
+    assert tile_envelope(0, 0, 0) == pytest.approx((-180, 180, -85.0511287, 85.0511287))
+    assert tile_envelope(1, 1, 0) == pytest.approx((0, 180, 0, 85.0511287))
+
+
+def test_lru_cache():
+    cache = LRUCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    cache.set('c', 3)  # least recently used 'b' is removed
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_disabled():
+    cache = LRUCache(max_size=0)
+    cache.set('a', 1)
+    assert cache.get('a') is None
+
+
+def test_lru_cache_stats():
+    cache = LRUCache(max_size=10)
+    assert cache.stats()['hit_ratio'] is None
+
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('a')
+    cache.get('b')
+
+    assert cache.stats() == {'size': 1, 'max_size': 10, 'hits': 2, 'misses': 1, 'hit_ratio': 2 / 3}
+
+
+def test_lru_cache_remove_if():
+    cache = LRUCache(max_size=10)
+    for key in range(5):
+        cache.set(key, key)
+
+    assert cache.remove_if(lambda key, value: key % 2 == 0) == 3
+    assert [cache.get(key) for key in range(5)] == [None, 1, None, 3, None]
+
+
+def test_lru_cache_value_computed_before_invalidation_not_stored():
+    cache = LRUCache(max_size=10)
+    generation = cache.generation()
+    cache.remove_if(lambda key: True)
+    cache.set('a', 1, generation)
+    assert cache.get('a') is None
+
+    generation = cache.generation()
+    cache.clear()
+    cache.set('a', 1, generation)
+    assert cache.get('a') is None
+
+    generation = cache.generation()
+    cache.set('a', 1, generation)
+    assert cache.get('a') == 1
+
+
+def test_invalidate_tiles():
+    cache = LRUCache(max_size=10)
+    cache.set((1, 0, 0), b'west')
+    cache.set((1, 1, 0), b'east')
+
+    with patch('backend.core.cache.tile_cache', cache):
+        assert invalidate_tiles((10, 20, 40, 50)) == 1
+
+    assert cache.get((1, 0, 0)) == b'west'
+    assert cache.get((1, 1, 0)) is None
+
+
+def test_point_key_snapped():
+    assert point_key(52.2283901, 21.0118801) == point_key(52.22839, 21.01188)
+    assert point_key(52.22839, 21.01188) != point_key(52.22849, 21.01188)
+
+
+def test_invalidate_points():
+    cache = LRUCache(max_size=10)
+    for lat, teryts in enumerate(
+        (('1465',), ('1465011',), ('1466',), ('1261011',), ('1432', '1418'))
+    ):
+        cache.set(point_key(lat, 21), (teryts, '{}'))
+
+    with patch('backend.core.cache.point_cache', cache):
+        assert invalidate_points('1465') == 2
+        assert invalidate_points('1261011') == 1
+        # building found at the point was imported by the neighbouring county
+        assert invalidate_points('1418') == 1
+
+    assert cache.get(point_key(2, 21)) == (('1466',), '{}')
+    assert len(cache) == 1
+
+
+def test_invalidate_points_generation_per_county():
+    cache = LRUCache(max_size=10)
+    generation = cache.generation()
+
+    with patch('backend.core.cache.point_cache', cache):
+        invalidate_points('1465')
+
+    cache.set(point_key(52, 21), (('1465011',), '{}'), generation, {point_scope('1465011')})
+    cache.set(point_key(53, 21), (('1466',), '{}'), generation, {point_scope('1466')})
+    # scope of the building is known only after the query
+    cache.set(
+        point_key(54, 21),
+        (('1466', '1465'), '{}'),
+        generation,
+        {point_scope('1466'), point_scope('1465')},
+    )
+    assert cache.get(point_key(52, 21)) is None
+    assert cache.get(point_key(53, 21)) == (('1466',), '{}')
+    assert cache.get(point_key(54, 21)) is None
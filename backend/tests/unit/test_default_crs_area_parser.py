@@ -1,4 +1,5 @@
 from math import floor
+from unittest.mock import patch
 
 import pytest
 
@@ -36,3 +37,12 @@ class TestBasicBuilding:
         geojson = area.parse_gml_to_geojson(gml_content)
 
         assert len(geojson['features']) != 0
+
+    def test_batch_reprojection_equal_to_gdal_geometry_reprojection(self, gml_content):
+        geometries = area.parse_gml_to_geometries_and_properties(gml_content)
+        with patch('backend.areas.parsers.gml_polygon_to_rings', return_value=None):
+            gdal_geometries = area.parse_gml_to_geometries_and_properties(gml_content)
+
+        assert [g.ExportToWkt() for g, _ in geometries] == [
+            g.ExportToWkt() for g, _ in gdal_geometries
+        ]
@@ -0,0 +1,97 @@
+import pytest
+from lxml import etree
+from osgeo import ogr
+
+from backend.areas.gml import (
+    gml_number_matched,
+    gml_number_returned,
+    gml_polygon_to_rings,
+    rings_to_geometry,
+)
+
+NAMESPACES = {'gml': 'http://www.opengis.net/gml/3.2'}
+
+
+def parse_polygon(polygon_xml: str) -> etree.Element:
+    return etree.fromstring(
+        f'<gml:Polygon xmlns:gml="{NAMESPACES["gml"]}">{polygon_xml}</gml:Polygon>'
+    )
+
+
+@pytest.mark.parametrize(
+    'subdir,filename',
+    [
+        ('epodgik', 'gml_basic_building.xml'),
+        ('geoportal', 'gml_building_2180_crs.xml'),
+        ('katowice', 'gml_basic_building_3d.xml'),
+        ('warszawa', 'gml_multiple_polygons.xml'),
+    ],
+)
+def test_rings_equal_to_gdal_gml_parser(load_gml, subdir, filename):
+    root = etree.fromstring(load_gml(subdir, filename).encode('utf-8'))
+    polygons = root.findall('.//gml:Polygon', namespaces=root.nsmap)
+    assert polygons
+
+    for polygon in polygons:
+        rings = gml_polygon_to_rings(polygon)
+        assert rings is not None
+
+        geometry = rings_to_geometry(rings)
+        gdal_geometry = ogr.CreateGeometryFromGML(etree.tostring(polygon).decode('utf-8'))
+        gdal_geometry.FlattenTo2D()
+        assert geometry.ExportToWkt() == gdal_geometry.ExportToWkt()
+
+
+def test_pos_elements():
+    polygon = parse_polygon(
+        '<gml:exterior><gml:LinearRing>'
+        '<gml:pos>21.0 52.0</gml:pos><gml:pos>21.1 52.0</gml:pos>'
+        '<gml:pos>21.1 52.1</gml:pos><gml:pos>21.0 52.0</gml:pos>'
+        '</gml:LinearRing></gml:exterior>'
+    )
+    rings = gml_polygon_to_rings(polygon)
+    assert rings[0].tolist() == [[21.0, 52.0], [21.1, 52.0], [21.1, 52.1], [21.0, 52.0]]
+
+
+@pytest.mark.parametrize(
+    'polygon_xml',
+    [
+        '<gml:exterior><gml:LinearRing>'
+        '<gml:coordinates>21.0,52.0 21.1,52.0 21.1,52.1 21.0,52.0</gml:coordinates>'
+        '</gml:LinearRing></gml:exterior>',
+        '<gml:exterior><gml:Ring><gml:curveMember/></gml:Ring></gml:exterior>',
+        '<gml:exterior><gml:LinearRing>'
+        '<gml:posList>21.0 52.0 21.1</gml:posList>'
+        '</gml:LinearRing></gml:exterior>',
+        '<gml:interior><gml:LinearRing>'
+        '<gml:posList>21.0 52.0 21.1 52.0 21.1 52.1 21.0 52.0</gml:posList>'
+        '</gml:LinearRing></gml:interior>',
+    ],
+)
+def test_unsupported_polygon_falls_back(polygon_xml):
+    assert gml_polygon_to_rings(parse_polygon(polygon_xml)) is None
+
+
+@pytest.mark.parametrize(
+    'header,number_returned',
+    [
+        (b'<wfs:FeatureCollection numberMatched="25" numberReturned="10">', 10),
+        (b"<wfs:FeatureCollection\n numberReturned='0'>", 0),
+        (b'<wfs:FeatureCollection numberMatched="unknown" numberReturned="unknown">', None),
+        (b'<wfs:FeatureCollection numberOfFeatures="10">', None),
+    ],
+)
+def test_gml_number_returned(header, number_returned):
+    assert gml_number_returned(header) == number_returned
+
+
+@pytest.mark.parametrize(
+    'header,number_matched',
+    [
+        (b'<wfs:FeatureCollection numberMatched="25" numberReturned="10">', 25),
+        (b'<wfs:FeatureCollection numberMatched="unknown" numberReturned="10">', None),
+        (b'<wfs:FeatureCollection numberReturned="10">', None),
+    ],
+)
+def test_gml_number_matched(header, number_matched):
+    assert gml_number_matched(header) == number_matched
@@ -1,3 +1,6 @@
+from io import BytesIO
+from unittest.mock import patch
+
 from backend.areas.parsers import WarszawaAreaParser
 from backend.areas.config import all_areas
 
@@ -12,3 +15,27 @@ class TestGmlToGeojsonParser:
         gml_content = load_gml('katowice', 'gml_basic_building_3d.xml')
         geojson = all_areas['2469'].parse_gml_to_geojson(gml_content)
         assert len(geojson['features'][0]['geometry']['coordinates'][0][0]) == 2
+
+    def test_parse_gml_from_binary_file(self, load_gml):
+        gml_content = load_gml('warszawa', 'gml_multiple_polygons.xml')
+        area = WarszawaAreaParser(name='test')
+
+        geojson_from_str = area.parse_gml_to_geojson(gml_content)
+        geojson_from_file = area.parse_gml_to_geojson(BytesIO(gml_content.encode('utf-8')))
+        assert geojson_from_file == geojson_from_str
+
+    def test_iter_gml_yields_buildings_lazily(self, load_gml):
+        gml_content = load_gml('warszawa', 'gml_multiple_polygons.xml')
+        buildings = WarszawaAreaParser(name='test').iter_gml_geometries_and_properties(gml_content)
+
+        geometry, properties = next(buildings)
+        assert properties['ID_BUDYNKU'] == '146510_8.0501.173_BUD'
+        assert len(list(buildings)) == 9
+
+    def test_reprojection_batches_keep_buildings_order(self, load_gml):
+        gml_content = load_gml('warszawa', 'gml_multiple_polygons.xml')
+        area = WarszawaAreaParser(name='test')
+
+        geojson = area.parse_gml_to_geojson(gml_content)
+        with patch('backend.areas.parsers.REPROJECTION_BATCH_SIZE', 3):
+            assert area.parse_gml_to_geojson(gml_content) == geojson
@@ -1,24 +1,28 @@
-import asyncio
+import threading
 
-from unittest.mock import AsyncMock, patch
-from urllib.error import HTTPError
+from tempfile import NamedTemporaryFile
+from urllib.parse import parse_qs, urlparse
+from unittest.mock import patch
 
 import pytest
 
-from httpx import TimeoutException
+from httpx import HTTPError, TimeoutException
 
 from backend.areas.data.expected_building import AreaExpectedBuildingData, all_areas_data
 from backend.areas.parsers import WarszawaAreaParser
+from backend.core.config import settings
+from backend.crud.building import BuildingsChangeCount
 from backend.models.building import Building
-from backend.models.area_import import ResultStatus
-from backend.tasks.import_buildings import area_import_attempt, ImportResult
+from backend.models.area_import import AreaImport, ResultStatus
+from backend.exceptions import AreaDataNotFound, ParserError
+from backend.tasks.import_buildings import area_import_attempt, ImportResult, parse_area_data
 
 
 @pytest.mark.anyio
-async def test_area_import_attempt_success(db, load_gml):
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.text = load_gml('warszawa', 'gml_multiple_polygons.xml')
+async def test_area_import_attempt_success(db, load_gml, mock_stream_response):
+    mock_response = mock_stream_response(
+        content=load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8')
+    )
 
     patched_all_areas_data = {
         '1465': AreaExpectedBuildingData(
@@ -32,16 +36,16 @@ async def test_area_import_attempt_success(db, load_gml):
 
     with (
         patch(
-            'backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response
-        ) as mock_get,
+            'backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response
+        ) as mock_stream,
         patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
         patch.dict(all_areas_data, patched_all_areas_data, clear=True),
     ):
         area_parser = WarszawaAreaParser(name='test')
 
-        import_result: ImportResult = asyncio.run(area_import_attempt(area_parser, '1465'))
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
 
-        mock_get.assert_called_once_with(area_parser.build_buildings_url())
+        mock_stream.assert_called_once_with('GET', area_parser.build_buildings_url(), headers={})
 
     assert import_result.status == ResultStatus.SUCCESS
     assert import_result.building_count == 10
@@ -64,11 +68,12 @@ def assert_failed(import_result: ImportResult, db):
 
 @pytest.mark.anyio
 async def test_area_import_attempt_connection_error_http_error(db):
-    mock_response = AsyncMock(side_effect=HTTPError)
-
-    with patch('backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response):
+    with patch(
+        'backend.tasks.import_buildings.AsyncClient.stream',
+        side_effect=HTTPError('Connection refused'),
+    ):
         area_parser = WarszawaAreaParser(name='test')
-        import_result: ImportResult = asyncio.run(area_import_attempt(area_parser, '1465'))
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
 
     assert import_result.status == ResultStatus.DOWNLOADING_ERROR
     assert_failed(import_result, db)
@@ -76,11 +81,12 @@ async def test_area_import_attempt_connection_error_http_error(db):
 
 @pytest.mark.anyio
 async def test_area_import_attempt_connection_error_timeout(db):
-    mock_response = AsyncMock(side_effect=TimeoutException)
-
-    with patch('backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response):
+    with patch(
+        'backend.tasks.import_buildings.AsyncClient.stream',
+        side_effect=TimeoutException('Read timeout'),
+    ):
         area_parser = WarszawaAreaParser(name='test')
-        import_result: ImportResult = asyncio.run(area_import_attempt(area_parser, '1465'))
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
 
     assert import_result.status == ResultStatus.DOWNLOADING_ERROR
     assert_failed(import_result, db)
@@ -88,69 +94,70 @@ async def test_area_import_attempt_connection_error_timeout(db):
 
 @pytest.mark.anyio
 @pytest.mark.parametrize('status_code', [400, 404, 500, 501])
-async def test_area_import_attempt_connection_error_invalid_status_code(db, status_code):
-    mock_response = AsyncMock()
-    mock_response.status_code = status_code
+async def test_area_import_attempt_connection_error_invalid_status_code(
+    db, mock_stream_response, status_code
+):
+    mock_response = mock_stream_response(status_code=status_code)
 
-    with patch('backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response):
+    with patch('backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response):
         area_parser = WarszawaAreaParser(name='test')
-        import_result: ImportResult = asyncio.run(area_import_attempt(area_parser, '1465'))
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
 
     assert import_result.status == ResultStatus.DOWNLOADING_ERROR
     assert_failed(import_result, db)
 
 
 @pytest.mark.anyio
-async def test_area_import_attempt_parsing_error_invalid_gml(db):
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.text = '<invalid GML>'
+async def test_area_import_attempt_parsing_error_invalid_gml(db, mock_stream_response):
+    mock_response = mock_stream_response(content=b'<invalid GML>')
 
-    with patch('backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response):
+    with patch('backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response):
         area_parser = WarszawaAreaParser(name='test')
-        import_result: ImportResult = asyncio.run(area_import_attempt(area_parser, '1465'))
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
 
     assert import_result.status == ResultStatus.PARSING_ERROR
     assert_failed(import_result, db)
 
 
 @pytest.mark.anyio
-async def test_area_import_attempt_parsing_error_no_building_in_area(db, load_gml):
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.text = load_gml('warszawa', 'gml_multiple_polygons.xml')
+async def test_area_import_attempt_parsing_error_no_building_in_area(
+    db, load_gml, mock_stream_response
+):
+    mock_response = mock_stream_response(
+        content=load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8')
+    )
 
     with (
-        patch('backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response),
+        patch('backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response),
         patch('backend.tasks.import_buildings.area_finder') as mock_area_finder,
     ):
         mock_area_finder.geometry_in_area.return_value = False
         area_parser = WarszawaAreaParser(name='test')
-        import_result: ImportResult = asyncio.run(area_import_attempt(area_parser, '1465'))
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
 
     assert import_result.status == ResultStatus.PARSING_ERROR
     assert_failed(import_result, db)
 
 
 @pytest.mark.anyio
-async def test_area_import_attempt_empty_data_error(db, load_gml):
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.text = load_gml('warszawa', 'gml_no_building.xml')
+async def test_area_import_attempt_empty_data_error(db, load_gml, mock_stream_response):
+    mock_response = mock_stream_response(
+        content=load_gml('warszawa', 'gml_no_building.xml').encode('utf-8')
+    )
 
-    with patch('backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response):
+    with patch('backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response):
         area_parser = WarszawaAreaParser(name='test')
-        import_result: ImportResult = asyncio.run(area_import_attempt(area_parser, '1465'))
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
 
     assert import_result.status == ResultStatus.EMPTY_DATA_ERROR
     assert_failed(import_result, db)
 
 
 @pytest.mark.anyio
-async def test_area_import_attempt_data_check_error(db, load_gml):
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.text = load_gml('warszawa', 'gml_multiple_polygons.xml')
+async def test_area_import_attempt_data_check_error(db, load_gml, mock_stream_response):
+    mock_response = mock_stream_response(
+        content=load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8')
+    )
 
     patched_all_areas_data = {
         '1465': AreaExpectedBuildingData(
@@ -164,16 +171,16 @@ async def test_area_import_attempt_data_check_error(db, load_gml):
 
     with (
         patch(
-            'backend.tasks.import_buildings.AsyncClient.get', return_value=mock_response
-        ) as mock_get,
+            'backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response
+        ) as mock_stream,
         patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
         patch.dict(all_areas_data, patched_all_areas_data, clear=True),
     ):
         area_parser = WarszawaAreaParser(name='test')
 
-        import_result: ImportResult = asyncio.run(area_import_attempt(area_parser, '1465'))
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
 
-        mock_get.assert_called_once_with(area_parser.build_buildings_url())
+        mock_stream.assert_called_once_with('GET', area_parser.build_buildings_url(), headers={})
 
     assert import_result.status == ResultStatus.DATA_CHECK_ERROR
     assert import_result.building_count == 10
@@ -219,3 +226,416 @@ def test_import_result_is_data_check_error_with_improved_tags(
         data_check_result_tags=result_tags,
     )
     assert import_result.is_data_check_error_with_improved_tags() == return_value
+
+
+def test_parse_area_data(load_gml):
+    with NamedTemporaryFile(suffix='.gml') as gml_file:
+        gml_file.write(load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8'))
+        gml_file.flush()
+
+        parsed_area_data = parse_area_data('1465', gml_file.name, 52.22839, 21.01188)
+
+    assert len(parsed_area_data.buildings) == 10
+    assert all(isinstance(wkb, bytes) for wkb, _ in parsed_area_data.buildings)
+    assert parsed_area_data.data_check_result_tags == {'building': 'office', 'building:levels': 12}
+
+
+def test_parse_area_data_no_data_check_building(load_gml):
+    with NamedTemporaryFile(suffix='.gml') as gml_file:
+        gml_file.write(load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8'))
+        gml_file.flush()
+
+        parsed_area_data = parse_area_data('1465', gml_file.name, 50.0, 20.0)
+
+    assert len(parsed_area_data.buildings) == 10
+    assert parsed_area_data.data_check_result_tags is None
+
+
+def test_parse_area_data_parsing_error():
+    with NamedTemporaryFile(suffix='.gml') as gml_file:
+        gml_file.write(b'<invalid GML>')
+        gml_file.flush()
+
+        with pytest.raises(ParserError):
+            parse_area_data('1465', gml_file.name, 52.22839, 21.01188, WarszawaAreaParser('test'))
+
+
+@pytest.fixture
+def warszawa_data_check():
+    patched_all_areas_data = {
+        '1465': AreaExpectedBuildingData(
+            name='miasto Warszawa',
+            teryt='1465',
+            lat=52.22839,
+            lon=21.01188,
+            expected_tags={'building': 'office', 'building:levels': 12},
+        )
+    }
+    with patch.dict(all_areas_data, patched_all_areas_data, clear=True):
+        yield patched_all_areas_data['1465']
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_saves_buildings_outside_event_loop(
+    db, load_gml, mock_stream_response, warszawa_data_check
+):
+    mock_response = mock_stream_response(
+        content=load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8')
+    )
+    save_thread_ids = []
+
+    def mock_update_area_buildings(session, teryt, buildings, **kwargs):
+        save_thread_ids.append(threading.get_ident())
+        return BuildingsChangeCount(inserted=len(list(buildings)))
+
+    with (
+        patch('backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response),
+        patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
+        patch(
+            'backend.tasks.import_buildings.update_area_buildings',
+            side_effect=mock_update_area_buildings,
+        ),
+    ):
+        area_parser = WarszawaAreaParser(name='test')
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+    assert import_result.status == ResultStatus.SUCCESS
+    assert import_result.inserted_count == 10
+    assert save_thread_ids and save_thread_ids[0] != threading.get_ident()
+
+
+def parsed_content_hash(content: bytes) -> str:
+    with NamedTemporaryFile(suffix='.gml') as gml_file:
+        gml_file.write(content)
+        gml_file.flush()
+
+        parsed_area_data = parse_area_data('1465', gml_file.name, 52.22839, 21.01188)
+
+    return parsed_area_data.buildings.content_hash()
+
+
+def add_previous_import(db, data_check: AreaExpectedBuildingData, **kwargs) -> None:
+    params = {
+        'teryt': '1465',
+        'result_status': ResultStatus.SUCCESS,
+        'start_at': '2024-01-01T00:00:00',
+        'end_at': '2024-01-01T00:01:00',
+        'building_count': 10,
+        'has_building_type': True,
+        'has_building_levels': True,
+        'has_building_levels_undg': False,
+        'data_check_lat': data_check.lat,
+        'data_check_lon': data_check.lon,
+        'data_check_expected_tags': data_check.expected_tags,
+        'data_check_result_tags': data_check.expected_tags,
+        'parser_fingerprint': WarszawaAreaParser(name='test').fingerprint(),
+    }
+    db.add(AreaImport(**(params | kwargs)))
+    db.commit()
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_not_modified_status_code(
+    db, mock_stream_response, warszawa_data_check
+):
+    add_previous_import(db, warszawa_data_check, etag='"v1"', content_hash='0' * 64)
+    mock_response = mock_stream_response(status_code=304)
+
+    with patch(
+        'backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response
+    ) as mock_stream:
+        area_parser = WarszawaAreaParser(name='test')
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+        mock_stream.assert_called_once_with(
+            'GET', area_parser.build_buildings_url(), headers={'If-None-Match': '"v1"'}
+        )
+
+    assert import_result.status == ResultStatus.NOT_MODIFIED
+    assert import_result.building_count == 10
+    assert import_result.etag == '"v1"'
+    assert import_result.content_hash == '0' * 64
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_not_modified_content_hash(
+    db, load_gml, mock_stream_response, warszawa_data_check
+):
+    content = load_gml('warszawa', 'gml_multiple_polygons.xml')
+    add_previous_import(
+        db, warszawa_data_check, content_hash=parsed_content_hash(content.encode('utf-8'))
+    )
+    # server ignores conditional requests and the response body differs in timeStamp
+    # and in gml:id generated for every request
+    assert 'timeStamp="2024-10-31T00:14:27.720Z"' in content
+    new_content = content.replace('2024-10-31T00:14:27.720Z', '2024-11-01T00:14:27.720Z').replace(
+        'fid--d0b66bf_192dfe255fe', 'fid-5e2a1c07_193a0e4b2c1'
+    )
+    mock_response = mock_stream_response(
+        content=new_content.encode('utf-8'), headers={'ETag': '"v2"'}
+    )
+
+    with (
+        patch('backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response),
+        patch('backend.tasks.import_buildings.update_area_buildings') as mock_update_area_buildings,
+    ):
+        area_parser = WarszawaAreaParser(name='test')
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+    mock_update_area_buildings.assert_not_called()
+    assert import_result.status == ResultStatus.NOT_MODIFIED
+    assert import_result.etag == '"v2"'
+    assert db.query(Building).count() == 0
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_changed_parser_ignores_previous_import(
+    db, load_gml, mock_stream_response, warszawa_data_check
+):
+    content = load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8')
+    add_previous_import(
+        db,
+        warszawa_data_check,
+        etag='"v1"',
+        content_hash=parsed_content_hash(content),
+        parser_fingerprint='0' * 64,
+    )
+    mock_response = mock_stream_response(content=content)
+
+    with (
+        patch(
+            'backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response
+        ) as mock_stream,
+        patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
+    ):
+        area_parser = WarszawaAreaParser(name='test')
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+        mock_stream.assert_called_once_with('GET', area_parser.build_buildings_url(), headers={})
+
+    assert import_result.status == ResultStatus.SUCCESS
+    assert import_result.parser_fingerprint == area_parser.fingerprint()
+    assert db.query(Building).count() == 10
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_changed_data_check_ignores_previous_import(
+    db, load_gml, mock_stream_response, warszawa_data_check
+):
+    content = load_gml('warszawa', 'gml_multiple_polygons.xml').encode('utf-8')
+    add_previous_import(
+        db,
+        warszawa_data_check,
+        content_hash=parsed_content_hash(content),
+        data_check_expected_tags={'building': 'office'},
+    )
+    mock_response = mock_stream_response(content=content)
+
+    with (
+        patch('backend.tasks.import_buildings.AsyncClient.stream', return_value=mock_response),
+        patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
+    ):
+        area_parser = WarszawaAreaParser(name='test')
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+    assert import_result.status == ResultStatus.SUCCESS
+    assert db.query(Building).count() == 10
+
+
+@pytest.fixture
+def mock_paged_stream(load_gml, mock_stream_response):
+    """
+    Mock of paged WFS server with 10 buildings at the first page, next pages are empty.
+    :param failures: number of failed requests per start index
+    :param number_matched: numberMatched of responses, 'unknown' by default
+    :param full_pages: start indexes of pages with 10 buildings
+    """
+
+    def inner(
+        failures: dict[int, int] | None = None,
+        number_matched: str = 'unknown',
+        full_pages: tuple[int, ...] = (0,),
+    ):
+        failures = dict(failures or {})
+        full_page = (
+            load_gml('warszawa', 'gml_multiple_polygons.xml')
+            .replace('numberMatched="10"', f'numberMatched="{number_matched}"')
+            .encode('utf-8')
+        )
+        pages = {start_index: full_page for start_index in full_pages}
+        empty_page = load_gml('warszawa', 'gml_no_building.xml').encode('utf-8')
+
+        def stream(method, url, headers):
+            start_index = int(parse_qs(urlparse(url).query)['startIndex'][0])
+            if failures.get(start_index):
+                failures[start_index] -= 1
+                raise TimeoutException('Read timeout')
+
+            return mock_stream_response(content=pages.get(start_index, empty_page))
+
+        return stream
+
+    return inner
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_paged(db, mock_paged_stream, warszawa_data_check):
+    with (
+        patch(
+            'backend.tasks.import_buildings.AsyncClient.stream', side_effect=mock_paged_stream()
+        ) as mock_stream,
+        patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
+    ):
+        area_parser = WarszawaAreaParser(name='test', page_size=10, page_sort_by='ID_BUDYNKU')
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+        requested_urls = {call.args[1] for call in mock_stream.call_args_list}
+        assert area_parser.build_buildings_page_url(0) in requested_urls
+        assert area_parser.build_buildings_page_url(10) in requested_urls
+        assert area_parser.build_buildings_url() not in requested_urls
+        assert all(
+            parse_qs(urlparse(url).query)['sortBy'] == ['ID_BUDYNKU'] for url in requested_urls
+        )
+
+    assert import_result.status == ResultStatus.SUCCESS
+    assert import_result.building_count == 10
+    assert import_result.etag is None
+    assert import_result.content_hash is not None
+    assert db.query(Building).count() == 10
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    'number_matched,full_pages,status',
+    [
+        # the last page has fewer features than requested
+        ('unknown', (0,), ResultStatus.SUCCESS),
+        ('10', (0,), ResultStatus.SUCCESS),
+        # server limit (10) is lower than page size, features between pages are skipped
+        ('unknown', (0, 20), ResultStatus.PARSING_ERROR),
+        ('25', (0,), ResultStatus.PARSING_ERROR),
+    ],
+)
+async def test_area_import_attempt_paged_short_page(
+    db, mock_paged_stream, warszawa_data_check, number_matched, full_pages, status
+):
+    with (
+        patch(
+            'backend.tasks.import_buildings.AsyncClient.stream',
+            side_effect=mock_paged_stream(number_matched=number_matched, full_pages=full_pages),
+        ),
+        patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
+    ):
+        area_parser = WarszawaAreaParser(name='test', page_size=20)
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+    assert import_result.status == status
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_paged_retries_failed_page(
+    db, mock_paged_stream, warszawa_data_check
+):
+    with (
+        patch(
+            'backend.tasks.import_buildings.AsyncClient.stream',
+            side_effect=mock_paged_stream({10: settings.WFS_PAGE_MAX_ATTEMPTS - 1}),
+        ) as mock_stream,
+        patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
+        patch.object(settings, 'WFS_PAGE_RETRY_DELAY', 0),
+    ):
+        area_parser = WarszawaAreaParser(name='test', page_size=10)
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+        requested_urls = [call.args[1] for call in mock_stream.call_args_list]
+        assert requested_urls.count(area_parser.build_buildings_page_url(0)) == 1
+        assert (
+            requested_urls.count(area_parser.build_buildings_page_url(10))
+            == settings.WFS_PAGE_MAX_ATTEMPTS
+        )
+
+    assert import_result.status == ResultStatus.SUCCESS
+    assert db.query(Building).count() == 10
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_paged_downloading_error(
+    db, mock_paged_stream, warszawa_data_check
+):
+    with (
+        patch(
+            'backend.tasks.import_buildings.AsyncClient.stream',
+            side_effect=mock_paged_stream({10: settings.WFS_PAGE_MAX_ATTEMPTS}),
+        ),
+        patch.object(settings, 'WFS_PAGE_RETRY_DELAY', 0),
+    ):
+        area_parser = WarszawaAreaParser(name='test', page_size=10)
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+    assert import_result.status == ResultStatus.DOWNLOADING_ERROR
+    assert_failed(import_result, db)
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_paged_without_number_returned(
+    db, load_gml, mock_stream_response, warszawa_data_check
+):
+    content = load_gml('warszawa', 'gml_multiple_polygons.xml').replace('numberReturned="10"', '')
+
+    with patch(
+        'backend.tasks.import_buildings.AsyncClient.stream',
+        side_effect=lambda *args, **kwargs: mock_stream_response(content=content.encode('utf-8')),
+    ):
+        area_parser = WarszawaAreaParser(name='test', page_size=10)
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+    # the page can't be treated as the last one, it would truncate the area
+    assert import_result.status == ResultStatus.PARSING_ERROR
+    assert_failed(import_result, db)
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_tiled(db, mock_paged_stream, warszawa_data_check):
+    tiles = [(21.0, 21.011, 52.2, 52.3), (21.011, 21.1, 52.2, 52.3)]
+
+    with (
+        patch(
+            'backend.tasks.import_buildings.AsyncClient.stream', side_effect=mock_paged_stream()
+        ) as mock_stream,
+        patch('backend.tasks.import_buildings.area_finder.area_tiles', return_value=tiles),
+        patch('backend.tasks.import_buildings.area_finder.geometry_in_area', return_value=True),
+    ):
+        area_parser = WarszawaAreaParser(name='test', tile_size=0.1, page_size=10)
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+        # every tile is paged until its last page
+        requested_urls = sorted(call.args[1] for call in mock_stream.call_args_list)
+        assert requested_urls == sorted(
+            area_parser.build_buildings_page_url(
+                start_index, area_parser.build_buildings_bbox_url(tile)
+            )
+            for tile in tiles
+            for start_index in (0, 10)
+        )
+
+    # buildings at the edge are returned with both tiles
+    assert import_result.status == ResultStatus.SUCCESS
+    assert import_result.building_count == 10
+    assert db.query(Building).count() == 10
+
+
+@pytest.mark.anyio
+async def test_area_import_attempt_tiled_area_data_not_found(db, warszawa_data_check):
+    with (
+        patch('backend.tasks.import_buildings.AsyncClient.stream') as mock_stream,
+        patch(
+            'backend.tasks.import_buildings.area_finder.area_tiles', side_effect=AreaDataNotFound
+        ),
+    ):
+        area_parser = WarszawaAreaParser(name='test', tile_size=0.1, page_size=10)
+        import_result: ImportResult = await area_import_attempt(area_parser, '1465')
+
+        mock_stream.assert_not_called()
+
+    assert import_result.status == ResultStatus.PARSING_ERROR
+    assert_failed(import_result, db)
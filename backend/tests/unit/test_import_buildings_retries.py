@@ -1,5 +1,6 @@
 import asyncio
 
+from concurrent.futures.process import BrokenProcessPool
 from unittest.mock import patch
 
 import pytest
@@ -76,3 +77,23 @@ def test_failed_data_check_error_one_attempt_tags_improvement(db):
             area_import_in_parallel([list(all_counties.keys())[0]], delay_between_attempts=0.001)
         )
         assert mock_area_attempt_func.call_count == 1
+
+
+def test_broken_parse_pool_is_restarted(db):
+    with patch(
+        'backend.tasks.import_buildings.area_import_attempt',
+        side_effect=[
+            BrokenProcessPool('A process in the process pool was terminated abruptly'),
+            ImportResult(teryt='123', status=ResultStatus.SUCCESS),
+        ],
+    ) as mock_area_attempt_func:
+        asyncio.run(
+            area_import_in_parallel(
+                [list(all_counties.keys())[0]],
+                delay_between_attempts=0.001,
+                max_parse_workers=1,
+            )
+        )
+        assert mock_area_attempt_func.call_count == 2
+        broken_executor = mock_area_attempt_func.call_args_list[0].args[2]
+        assert mock_area_attempt_func.call_args_list[1].args[2] is not broken_executor
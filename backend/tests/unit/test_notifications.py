@@ -0,0 +1,23 @@
+from unittest.mock import patch
+
+import pytest
+
+from backend.database.notifications import area_buildings_listener
+from backend.main import app, lifespan
+
+
+@pytest.mark.anyio
+async def test_lifespan_restart_does_not_stack_callbacks():
+    with (
+        patch('backend.main.area_finder.load_data'),
+        patch('backend.main.generate_manifest'),
+        patch('backend.main.dispose_async_engine'),
+        patch.object(area_buildings_listener, 'start'),
+        patch.object(area_buildings_listener, 'stop'),
+        patch.object(area_buildings_listener, '_callbacks', []),
+    ):
+        for _ in range(2):
+            async with lifespan(app):
+                assert len(area_buildings_listener._callbacks) == 2
+
+        assert area_buildings_listener._callbacks == []
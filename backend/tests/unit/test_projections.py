@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from osgeo import osr
+
+from backend.areas.projections import get_coordinate_transformation, transform_coordinates
+
+
+def test_coordinate_transformation_is_reused():
+    assert get_coordinate_transformation(2180) is get_coordinate_transformation(2180, 4326)
+
+
+def test_coordinate_transformation_is_not_shared_between_threads():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_thread_transformation = executor.submit(get_coordinate_transformation, 2180).result()
+
+    assert other_thread_transformation is not get_coordinate_transformation(2180)
+
+
+def test_coordinate_transformation_depends_on_axis_mapping_strategy():
+    authority_order = get_coordinate_transformation(4326, 4326)
+    traditional_order = get_coordinate_transformation(4326, 4326, osr.OAMS_TRADITIONAL_GIS_ORDER)
+    assert authority_order is not traditional_order
+
+
+def test_transform_coordinates():
+    # point in Warsaw, both projections use authority axis order: (northing, easting) and (lat, lon)
+    coordinates = np.array([[487_000.0, 637_000.0], [487_000.0, 637_000.0]])
+
+    transformed = transform_coordinates(coordinates, get_coordinate_transformation(2180))
+
+    assert transformed.shape == (2, 2)
+    assert np.allclose(transformed[0], [52.22, 21.01], atol=0.01)